@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from query_library import load_library
+from schema import read_sales_frame
+from tracing import trace
+
+# Named queries in sql/dashboard_queries.sql, in the order the dashboard unpacks them
+ROLLUP_NAMES = ['kpis', 'monthly', 'cat_metrics', 'regional', 'categories', 'channels']
+SALES_SCAN_NAME = 'sales_scan'
+
+# Optional filters every cube rollup accepts (unset filters are bound as NULL)
+ROLLUP_FILTERS = ['date_from', 'date_to', 'state', 'category']
+
+def load_cube_rollups(conn, filters=None):
+    """Read every dashboard rollup from the materialized daily cube, optionally filtered."""
+    library = load_library()
+    return tuple(library.run(conn, name, filters) for name in ROLLUP_NAMES)
+
+def load_cube_rollups_concurrently(pool, filters=None, executor=None):
+    """The same rollups with the six queries running concurrently on a read-only pool."""
+    return load_library().run_many(pool, ROLLUP_NAMES, filters, executor)
+
+def load_sales_columns(conn):
+    """
+    Read the columns needed for every dashboard rollup in a single table scan,
+    as a compact frame (categorical text, downcast integers; see schema.py).
+    """
+    library = load_library()
+    with trace(f"query: {SALES_SCAN_NAME}") as span:
+        sales = read_sales_frame(library.sql(SALES_SCAN_NAME), conn, library.bind(SALES_SCAN_NAME))
+        span.rows = len(sales)
+    return sales
+
+def _group_codes(values):
+    """Factorize a key column into sorted integer group codes (NULL keeps its own group)."""
+    codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=False)
+    return codes, uniques
+
+def _distinct_count(group_codes, n_groups, value_codes, n_values):
+    """COUNT(DISTINCT value) per group from integer codes, ignoring NULL values (code -1)."""
+    valid = value_codes >= 0
+    pairs = group_codes[valid].astype(np.int64) * max(n_values, 1) + value_codes[valid]
+    unique_groups = pd.unique(pairs) // max(n_values, 1)
+    return np.bincount(unique_groups, minlength=n_groups)
+
+def _grouped_sums(group_codes, n_groups, amount, orders):
+    """Revenue, row count and distinct orders per group in vectorized passes."""
+    amount_valid = ~np.isnan(amount)
+    revenue = np.bincount(group_codes, weights=np.where(amount_valid, amount, 0.0), minlength=n_groups)
+    amount_rows = np.bincount(group_codes, weights=amount_valid, minlength=n_groups)
+    order_codes, n_orders = orders
+    distinct_orders = _distinct_count(group_codes, n_groups, order_codes, n_orders)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_amount = revenue / amount_rows
+    return revenue, avg_amount, distinct_orders
+
+def _rollup(sales, key, column_name, orders, amount):
+    """Group the scanned rows by one key column and return orders/revenue/average per key."""
+    codes, uniques = _group_codes(sales[key].to_numpy())
+    revenue, avg_amount, distinct_orders = _grouped_sums(codes, len(uniques), amount, orders)
+    return pd.DataFrame({
+        column_name: np.asarray(uniques, dtype=object),
+        'orders': distinct_orders.astype(np.int64),
+        'revenue': np.round(revenue, 2),
+        'avg_revenue': np.round(avg_amount, 2),
+    })
+
+def compute_rollups(sales):
+    """
+    Compute every dashboard rollup from one columnar load of the sales rows.
+
+    Returns the same (kpis, monthly, cat_metrics, regional, categories, channels)
+    frames the six per-chart queries used to produce, before derived columns
+    such as the year-over-year comparison are added.
+    """
+    amount = sales['amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Factorize order_id once and reuse the codes for every distinct count
+    order_codes, order_uniques = pd.factorize(sales['order_id'].to_numpy())
+    orders = (order_codes, len(order_uniques))
+    _, sku_uniques = pd.factorize(sales['sku'].to_numpy())
+
+    # KPIs
+    kpis = pd.DataFrame({
+        'total_orders': [len(order_uniques)],
+        'total_products': [len(sku_uniques)],
+        'total_units': [sales['qty'].sum()],
+        'total_revenue': [round(float(np.nansum(amount)), 2)],
+        'avg_order_value': [round(float(np.nanmean(amount)), 2) if len(amount) else np.nan],
+    })
+
+    # Monthly trend
+    monthly = _rollup(sales, 'month', 'month', orders, amount)
+    monthly = monthly[['month', 'orders', 'revenue']]
+
+    # Category metrics for scatter plot
+    by_category = _rollup(sales, 'category', 'category', orders, amount)
+    cat_metrics = by_category[['category', 'orders', 'revenue', 'avg_revenue']]
+
+    # Regional data (unknown states are excluded, like the SQL `!= 'Unknown'` filter)
+    known_state = sales['state'].notna() & (sales['state'] != 'Unknown')
+    state_mask = known_state.to_numpy()
+    regional = _rollup(
+        sales[state_mask], 'state', 'state', (order_codes[state_mask], len(order_uniques)), amount[state_mask]
+    )
+    regional = regional[['state', 'orders', 'revenue']].sort_values('revenue', ascending=False, kind='stable')
+
+    # Category performance
+    categories = by_category[['category', 'revenue']].sort_values('revenue', ascending=False, kind='stable')
+
+    # Sales channel
+    by_channel = _rollup(sales, 'sales_channel', 'sales_channel', orders, amount)
+    channels = by_channel[['sales_channel', 'revenue']]
+
+    frames = [kpis, monthly, cat_metrics, regional, categories, channels]
+    return tuple(frame.reset_index(drop=True) for frame in frames)
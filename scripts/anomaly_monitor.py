@@ -0,0 +1,292 @@
+"""
+Online anomaly alerts on the daily sales, maintained by load_to_sql.py --monitor.
+
+The monitor watches the rows of each load as they stream through the loader.
+For every day it sums revenue, orders, rows and cancelled rows per series:
+overall, per category and per ship-state. Each series keeps running
+statistics of its daily revenue, orders and cancellation rate in
+`monitor_state`:
+
+* an exponentially weighted mean and variance (EWMA), the recent baseline a
+  new day is scored against;
+* Welford's running mean and variance over the whole history, reported
+  alongside for context.
+
+Both update in O(1) per day, so a load scores its new days without
+re-reading earlier ones. A day is flagged when it lies more than `threshold`
+EWMA standard deviations from the baseline, once the series has
+`min_history` days behind it. A cancellation rate above `max_cancel_rate`
+is flagged even when it is not unusual for the series. Days on or before the
+last day already monitored are skipped: a day is scored once, when it first
+arrives.
+
+Alerts are appended to monitoring/alerts.jsonl, one JSON object per line,
+and the dashboard marks them on its revenue trend.
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+ALERTS_FILE = os.path.join(PROJECT_ROOT, 'monitoring', 'alerts.jsonl')
+
+STATE_TABLE = 'monitor_state'
+
+# Series scopes and the column each one splits the rows by (None = all rows)
+SCOPES = {'overall': None, 'category': 'category', 'state': 'ship-state'}
+METRICS = ['revenue', 'orders', 'cancel_rate']
+
+# EWMA weight of the newest day (about a two-week memory), alerting bound in
+# standard deviations, days of history before a series is scored, and the
+# fewest rows a day needs before its values are scored
+DEFAULT_ALPHA = 0.1
+DEFAULT_THRESHOLD = 4.0
+DEFAULT_MIN_HISTORY = 14
+DEFAULT_MIN_ROWS = 20
+
+_CREATE_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+    scope TEXT,
+    segment TEXT,
+    metric TEXT,
+    last_date TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    ewma REAL NOT NULL,
+    ewm_var REAL NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    PRIMARY KEY (scope, segment, metric)
+) WITHOUT ROWID
+"""
+
+def monitor_tables_exist(conn):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (STATE_TABLE,)).fetchone()
+    return row is not None
+
+class SeriesStats:
+    """EWMA and Welford statistics of one daily series."""
+
+    __slots__ = ('last_date', 'days', 'ewma', 'ewm_var', 'mean', 'm2')
+
+    def __init__(self, last_date=None, days=0, ewma=0.0, ewm_var=0.0, mean=0.0, m2=0.0):
+        self.last_date = last_date
+        self.days = days
+        self.ewma = ewma
+        self.ewm_var = ewm_var
+        self.mean = mean
+        self.m2 = m2
+
+    @property
+    def std(self):
+        """Welford standard deviation over every day seen."""
+        return math.sqrt(self.m2 / (self.days - 1)) if self.days > 1 else 0.0
+
+    def zscore(self, value):
+        """Distance of `value` from the EWMA baseline, in EWMA standard deviations (None if undefined)."""
+        std = math.sqrt(self.ewm_var)
+        if self.days == 0 or std == 0:
+            return None
+        return (value - self.ewma) / std
+
+    def update(self, date, value, alpha):
+        self.last_date = date
+        self.days += 1
+        if self.days == 1:
+            self.ewma = self.mean = value
+            return
+        # Incremental EWMA mean / variance (Finch, 2009)
+        diff = value - self.ewma
+        increment = alpha * diff
+        self.ewma += increment
+        self.ewm_var = (1 - alpha) * (self.ewm_var + diff * increment)
+        # Welford
+        delta = value - self.mean
+        self.mean += delta / self.days
+        self.m2 += delta * (value - self.mean)
+
+class AnomalyMonitor:
+    """
+    Per-day statistics of the rows passing through a load, scored as each load finishes.
+
+    Feed it the load's chunks with observe() (or wrap the chunk iterator in
+    watch()), then call finish() inside the load's transaction to score the
+    new days and store the updated statistics. finish() returns the alerts;
+    write them with write_alerts() once the load has committed.
+    """
+
+    def __init__(self, conn, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA, min_history=DEFAULT_MIN_HISTORY,
+                 min_rows=DEFAULT_MIN_ROWS, max_cancel_rate=None):
+        self.conn = conn
+        self.threshold = threshold
+        self.alpha = alpha
+        self.min_history = min_history
+        self.min_rows = min_rows
+        self.max_cancel_rate = max_cancel_rate
+        conn.execute(_CREATE_TABLE)
+        self.series = {}
+        for scope, segment, metric, *stats in conn.execute(f"SELECT * FROM {STATE_TABLE}"):
+            self.series[(scope, segment, metric)] = SeriesStats(*stats)
+        self.last_date = max((stats.last_date for stats in self.series.values()), default=None)
+        # (date, scope, segment) -> [rows, cancelled rows, revenue, orders] of the rows seen so far
+        self.days = {}
+
+    def observe(self, chunk):
+        """Add a chunk's rows to the running per-day sums."""
+        if self.last_date is not None:
+            chunk = chunk[chunk['date'].astype(str) > self.last_date]
+        if chunk.empty:
+            return
+        cancelled = chunk['is_cancelled'].fillna(0).astype(int)
+        kept = cancelled == 0
+        frame = pd.DataFrame({
+            'date': chunk['date'].astype(str),
+            'cancelled': cancelled,
+            'revenue': chunk['amount'].where(kept, 0).fillna(0).astype(float),
+            'order_id': chunk['order_id'].where(kept),
+        })
+        for scope, column in SCOPES.items():
+            keys = ['date'] if column is None else ['date', chunk[column].fillna('Unknown').astype(str).rename('segment')]
+            # Orders split across two chunks are counted in both; chunks follow the file, so this is rare
+            sums = frame.groupby(keys, sort=False).agg(
+                rows=('cancelled', 'size'), cancelled=('cancelled', 'sum'),
+                revenue=('revenue', 'sum'), orders=('order_id', 'nunique'))
+            for key, values in zip(sums.index, sums.to_numpy(dtype=float)):
+                date, segment = (key, scope) if column is None else key
+                totals = self.days.get((date, scope, segment))
+                if totals is None:
+                    self.days[(date, scope, segment)] = values.copy()
+                else:
+                    totals += values
+
+    def watch(self, chunks):
+        """Yield the chunks unchanged, observing each one on the way through."""
+        for chunk in chunks:
+            self.observe(chunk)
+            yield chunk
+
+    def _alert(self, date, scope, segment, metric, value, stats, kind, zscore=None):
+        return {
+            'date': date, 'scope': scope, 'segment': segment, 'metric': metric, 'kind': kind,
+            'value': round(value, 4),
+            'direction': 'spike' if value > stats.ewma else 'drop',
+            'zscore': None if zscore is None else round(zscore, 2),
+            'baseline': round(stats.ewma, 4),
+            'mean': round(stats.mean, 4),
+            'std': round(stats.std, 4),
+            'history_days': stats.days,
+        }
+
+    def _score(self, date, scope, segment, metric, value, rows, stats):
+        if rows < self.min_rows:
+            return []
+        zscore = stats.zscore(value)
+        if stats.days >= self.min_history and zscore is not None and abs(zscore) > self.threshold:
+            return [self._alert(date, scope, segment, metric, value, stats, 'anomaly', zscore)]
+        if metric == 'cancel_rate' and self.max_cancel_rate is not None and value > self.max_cancel_rate:
+            return [self._alert(date, scope, segment, metric, value, stats, 'threshold')]
+        return []
+
+    def finish(self):
+        """
+        Score the observed days in date order against each series' statistics,
+        then fold them in and store the statistics. Returns the alerts.
+        """
+        alerts = []
+        for (date, scope, segment), (rows, cancelled, revenue, orders) in sorted(self.days.items()):
+            values = {'revenue': revenue, 'orders': orders, 'cancel_rate': cancelled / rows}
+            for metric in METRICS:
+                stats = self.series.setdefault((scope, segment, metric), SeriesStats())
+                alerts.extend(self._score(date, scope, segment, metric, float(values[metric]), rows, stats))
+                stats.update(date, float(values[metric]), self.alpha)
+        if self.days:
+            self.last_date = max(date for date, _, _ in self.days)
+        self.days = {}
+
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((*key, stats.last_date, stats.days, stats.ewma, stats.ewm_var, stats.mean, stats.m2)
+             for key, stats in self.series.items() if stats.days),
+        )
+        return alerts
+
+def write_alerts(alerts, path=ALERTS_FILE):
+    """Append alerts to the JSONL file, stamped with the time they were raised."""
+    if not alerts:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    raised_at = datetime.now().isoformat(timespec='seconds')
+    with open(path, 'a', encoding='utf-8') as f:
+        for alert in alerts:
+            f.write(json.dumps(dict(alert, raised_at=raised_at)) + '\n')
+
+def read_alerts(path=ALERTS_FILE, scopes=None):
+    """Alerts from the JSONL file as a DataFrame (empty if there are none), optionally only some scopes."""
+    columns = ['date', 'scope', 'segment', 'metric', 'kind', 'value', 'direction', 'zscore', 'baseline']
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    with open(path, encoding='utf-8') as f:
+        alerts = pd.DataFrame([json.loads(line) for line in f if line.strip()])
+    if alerts.empty:
+        return pd.DataFrame(columns=columns)
+    if scopes is not None:
+        alerts = alerts[alerts['scope'].isin(scopes)]
+    return alerts.sort_values(['date', 'scope', 'segment', 'metric']).reset_index(drop=True)
+
+def describe_alert(alert):
+    """One-line summary of an alert, e.g. 'state Kerala revenue drop: 1,204 vs 5,610 (z -4.3)'."""
+    label = alert['metric'] if alert['scope'] == 'overall' else f"{alert['scope']} {alert['segment']} {alert['metric']}"
+    value_format = '{:.1%}' if alert['metric'] == 'cancel_rate' else '{:,.0f}'
+    text = (f"{label} {alert['direction']}: {value_format.format(alert['value'])} "
+            f"vs {value_format.format(alert['baseline'])}")
+    if alert['kind'] == 'threshold':
+        return text + " (above the limit)"
+    return text + f" (z {alert['zscore']:+.1f})"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the anomaly alerts raised by load_to_sql.py --monitor.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database built by load_to_sql.py")
+    parser.add_argument('--alerts', default=ALERTS_FILE, help="Alerts JSONL file")
+    parser.add_argument('--scope', choices=list(SCOPES), action='append', default=None,
+                        help="Only alerts of this scope (repeatable)")
+    parser.add_argument('--last', type=int, default=20, help="Number of most recent alerts to show")
+    parser.add_argument('--reset', action='store_true',
+                        help="Forget the running statistics; the next monitored load starts over")
+    args = parser.parse_args()
+
+    if args.reset:
+        if os.path.exists(args.db):
+            conn = sqlite3.connect(args.db)
+            with conn:
+                conn.execute(f"DROP TABLE IF EXISTS {STATE_TABLE}")
+            conn.close()
+        print(f"Monitor statistics reset in {args.db}.")
+        raise SystemExit(0)
+
+    if os.path.exists(args.db):
+        conn = sqlite3.connect(args.db)
+        try:
+            if monitor_tables_exist(conn):
+                series, last_date = conn.execute(
+                    f"SELECT COUNT(DISTINCT scope || segment), MAX(last_date) FROM {STATE_TABLE}").fetchone()
+                print(f"Monitoring {series} series, through {last_date}.")
+            else:
+                print("No monitor statistics yet (load with --monitor).")
+        finally:
+            conn.close()
+    try:
+        alerts = read_alerts(args.alerts, args.scope)
+    except Exception as e:
+        print(f"Error reading alerts: {e}")
+        raise SystemExit(1)
+    print(f"{len(alerts):,} alerts in {args.alerts}")
+    for alert in alerts.tail(args.last).to_dict('records'):
+        print(f"  {alert['date']}  {describe_alert(alert)}")
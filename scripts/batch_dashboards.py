@@ -0,0 +1,102 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from aggregations import compute_rollups
+from storage import BACKENDS, open_storage
+from generate_dashboard import (
+    DB_FILE, DASHBOARD_DIR, ASSETS_DIR, PLOTLY_CDN, add_derived_metrics, asset_src, build_dashboard_html, write_page,
+    write_plotly_asset,
+)
+
+SEGMENTS_DIR = os.path.join(DASHBOARD_DIR, 'segments')
+
+# Segment dimension -> (rollup column, label shown on the dashboard)
+SEGMENT_DIMENSIONS = {
+    'state': ('state', 'State'),
+    'channel': ('sales_channel', 'Channel'),
+    'month': ('month', 'Month'),
+}
+
+def _slug(value):
+    """File-name-safe form of a segment value."""
+    return re.sub(r'[^a-z0-9]+', '-', str(value).lower()).strip('-') or 'unknown'
+
+def segment_rollups(sales, dimensions):
+    """
+    Yield (dimension, value, rollups) for every segment of the loaded rows.
+
+    Each segment's rollups come from the same in-memory frame, so the storage
+    is read once however many dashboards are produced.
+    """
+    for dimension in dimensions:
+        column, _ = SEGMENT_DIMENSIONS[dimension]
+        groups = sales.groupby(column, sort=True, dropna=False).indices
+        for value, positions in groups.items():
+            yield dimension, value, compute_rollups(sales.take(positions))
+
+def render_segment(output_file, segment, rollups, plotly_src=PLOTLY_CDN, compact=False, precompress=False):
+    """Render one segment dashboard and write it; runs in a worker process."""
+    kpis, monthly, cat_metrics, regional, categories, channels = rollups
+    add_derived_metrics(monthly, cat_metrics)
+    html_content, _ = build_dashboard_html(
+        kpis, monthly, cat_metrics, regional, categories, channels,
+        segment=segment, plotly_src=plotly_src, compact=compact,
+    )
+    write_page(output_file, html_content, precompress)
+    return output_file
+
+def render_batch(dimensions, backend='sqlite', workers=None, output_dir=SEGMENTS_DIR, offline=False,
+                 precompress=False, assets_dir=ASSETS_DIR):
+    """
+    Load the data once and render one dashboard per segment on a process pool.
+
+    With `offline`, every page loads the same local plotly.js copy in `assets_dir`.
+    """
+    start = time.perf_counter()
+    print(f"Loading sales rows from {backend}...")
+    try:
+        sales = open_storage(backend, DB_FILE if backend == 'sqlite' else None).sales_columns()
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return []
+    print(f"Loaded {len(sales):,} rows in {time.perf_counter() - start:.2f}s")
+
+    os.makedirs(output_dir, exist_ok=True)
+    asset = write_plotly_asset(assets_dir, precompress) if offline else None
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for dimension, value, rollups in segment_rollups(sales, dimensions):
+            _, label = SEGMENT_DIMENSIONS[dimension]
+            name = 'Unknown' if pd.isna(value) else value
+            output_file = os.path.join(output_dir, f"{dimension}-{_slug(name)}.html")
+            plotly_src = asset_src(asset, output_file) if offline else PLOTLY_CDN
+            futures.append(executor.submit(
+                render_segment, output_file, f"{label}: {name}", rollups, plotly_src, offline, precompress,
+            ))
+        written = [future.result() for future in futures]
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Rendered {len(written)} segment dashboards to {output_dir} with {workers} workers")
+    print(f"⏱️ {elapsed:.1f}s total, {len(written) / elapsed * 60:,.0f} dashboards/min")
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render one dashboard per state, channel and/or month.")
+    parser.add_argument('--segments', nargs='+', choices=list(SEGMENT_DIMENSIONS), default=['state', 'channel'],
+                        help="Dimensions to split the dashboard by")
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlite',
+                        help="Storage to read from (parquet needs pyarrow)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--output-dir', default=SEGMENTS_DIR, help="Directory for the segment dashboards")
+    parser.add_argument('--offline', action='store_true',
+                        help="Load plotly.js from one shared local asset instead of the CDN and write compact chart JSON")
+    parser.add_argument('--precompress', action='store_true',
+                        help="Also write .gz (and .br, with the brotli package) copies of each page")
+    args = parser.parse_args()
+    render_batch(args.segments, args.backend, args.workers, args.output_dir, args.offline, args.precompress)
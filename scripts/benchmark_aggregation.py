@@ -0,0 +1,142 @@
+import argparse
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from aggregations import load_sales_columns, compute_rollups, load_cube_rollups
+from summary_tables import summary_tables_exist
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+
+FRAME_NAMES = ['kpis', 'monthly', 'cat_metrics', 'regional', 'categories', 'channels']
+
+# The six per-chart queries get_comprehensive_data() used to send, kept as the baseline
+SIX_QUERIES = [
+    """
+    SELECT
+        COUNT(DISTINCT order_id) as total_orders,
+        COUNT(DISTINCT sku) as total_products,
+        SUM(qty) as total_units,
+        ROUND(SUM(amount), 2) as total_revenue,
+        ROUND(AVG(amount), 2) as avg_order_value
+    FROM sales
+    WHERE status NOT LIKE '%Cancelled%'
+    """,
+    """
+    SELECT
+        strftime('%Y-%m', date) as month,
+        COUNT(DISTINCT order_id) as orders,
+        ROUND(SUM(amount), 2) as revenue
+    FROM sales
+    WHERE status NOT LIKE '%Cancelled%'
+    GROUP BY month
+    ORDER BY month
+    """,
+    """
+    SELECT
+        category,
+        COUNT(DISTINCT order_id) as orders,
+        ROUND(SUM(amount), 2) as revenue,
+        ROUND(AVG(amount), 2) as avg_revenue
+    FROM sales
+    WHERE status NOT LIKE '%Cancelled%'
+    GROUP BY category
+    """,
+    """
+    SELECT
+        "ship-state" as state,
+        COUNT(DISTINCT order_id) as orders,
+        ROUND(SUM(amount), 2) as revenue
+    FROM sales
+    WHERE status NOT LIKE '%Cancelled%'
+        AND "ship-state" != 'Unknown'
+    GROUP BY state
+    ORDER BY revenue DESC
+    """,
+    """
+    SELECT
+        category,
+        ROUND(SUM(amount), 2) as revenue
+    FROM sales
+    WHERE status NOT LIKE '%Cancelled%'
+    GROUP BY category
+    ORDER BY revenue DESC
+    """,
+    """
+    SELECT
+        sales_channel,
+        ROUND(SUM(amount), 2) as revenue
+    FROM sales
+    WHERE status NOT LIKE '%Cancelled%'
+    GROUP BY sales_channel
+    """,
+]
+
+def six_query_rollups(conn):
+    """Baseline: one full scan of `sales` per dashboard rollup."""
+    return tuple(pd.read_sql_query(query, conn) for query in SIX_QUERIES)
+
+def single_scan_rollups(conn):
+    """Single scan of `sales`, rollups computed in memory."""
+    return compute_rollups(load_sales_columns(conn))
+
+def cube_rollups(conn):
+    """Rollups read from the materialized daily cube."""
+    return load_cube_rollups(conn)
+
+def time_path(func, conn, repeat):
+    """Return (best seconds, last result) over `repeat` runs."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(conn)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def check_same_frames(expected, actual):
+    """Verify both paths return matching DataFrames (rows compared in key order)."""
+    for name, left, right in zip(FRAME_NAMES, expected, actual):
+        key = left.columns[0]
+        if name != 'kpis':
+            left = left.sort_values(key).reset_index(drop=True)
+            right = right.sort_values(key).reset_index(drop=True)
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, rtol=1e-9, atol=0.011)
+
+def run_benchmark(db_file=DB_FILE, repeat=5):
+    """Compare the six-query path with the single-scan engine (and the cube, if built)."""
+    if not os.path.exists(db_file):
+        print(f"Error: database not found at {db_file}")
+        return
+
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute("SELECT count(*) FROM sales").fetchone()[0]
+    print(f"Benchmarking dashboard rollups over {rows:,} rows (best of {repeat})...")
+
+    six_time, six_result = time_path(six_query_rollups, conn, repeat)
+    scan_time, scan_result = time_path(single_scan_rollups, conn, repeat)
+    check_same_frames(six_result, scan_result)
+
+    print(f"Six-query path:   {six_time * 1000:8.1f} ms")
+    print(f"Single-scan path: {scan_time * 1000:8.1f} ms")
+    print(f"Speedup:          {six_time / scan_time:8.2f}x (results match)")
+
+    if summary_tables_exist(conn):
+        cube_time, cube_result = time_path(cube_rollups, conn, repeat)
+        check_same_frames(six_result, cube_result)
+        print(f"Summary cube:     {cube_time * 1000:8.1f} ms")
+        print(f"Speedup:          {six_time / cube_time:8.2f}x (results match)")
+    conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard aggregation paths.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database to benchmark against")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per path (best time is reported)")
+    args = parser.parse_args()
+    run_benchmark(args.db, args.repeat)
@@ -0,0 +1,142 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmark_pipeline import environment
+from generate_synthetic_data import BASE_ROWS, DEFAULT_SEED, generate
+from storage import SQLiteStorage
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+
+DEFAULT_LOADS = 4
+DEFAULT_READERS = 2
+
+def _load(db_file, csv_file, incremental=False):
+    """One load_to_sql load of `csv_file` into `db_file`; returns its wall time."""
+    import load_to_sql
+
+    load_to_sql.CSV_FILE = csv_file
+    load_to_sql.SQL_DIR = os.path.dirname(db_file)
+    load_to_sql.DB_FILE = db_file
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        load_to_sql.load_data(incremental=incremental)
+    if 'Error' in output.getvalue():
+        raise RuntimeError(output.getvalue().strip().splitlines()[-1])
+    return time.perf_counter() - start
+
+def _revenue_by_month(rollups):
+    _, monthly, *_ = rollups
+    return round(float(monthly['revenue'].sum()), 2)
+
+def _reader(db_file, expected, stop):
+    """Regenerate the dashboard rollups until `stop` is set; returns latencies, errors and torn reads."""
+    storage = SQLiteStorage(db_file)
+    latencies, errors, torn = [], [], 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            rollups = storage.rollups()
+        except Exception as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+        # A read mixing two loads shows up as KPIs and months that disagree, or match neither file
+        total = round(float(rollups[0]['total_revenue'].iloc[0]), 2)
+        if total not in expected or abs(_revenue_by_month(rollups) - total) > 1:
+            torn += 1
+    return latencies, errors, torn
+
+def _percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(fraction * len(values)))] if values else None
+
+def run_benchmark(rows=BASE_ROWS, loads=DEFAULT_LOADS, readers=DEFAULT_READERS, incremental=False, workdir=None,
+                  output_file=None, seed=DEFAULT_SEED):
+    """
+    Regenerate the dashboard rollups continuously on `readers` processes while
+    `loads` loads run, alternating between two versions of the data. Reports
+    load times, read latency, errors and reads that mixed two loads.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix='concurrency-')
+    db_file = os.path.join(workdir, 'ecommerce.db')
+    versions = [os.path.join(workdir, 'cleaned_a.csv'), os.path.join(workdir, 'cleaned_b.csv')]
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(versions[0], rows, raw=False, seed=seed)
+    # The second version drops a tenth of the rows, so the two loads have different totals
+    full = pd.read_csv(versions[0])
+    full.iloc[: len(full) * 9 // 10].to_csv(versions[1], index=False)
+
+    expected = set()
+    for csv_file in versions:
+        _load(db_file, csv_file)
+        expected.add(round(float(SQLiteStorage(db_file).rollups()[0]['total_revenue'].iloc[0]), 2))
+    print(f"{rows:,} rows in {workdir}; {readers} readers during {loads} "
+          f"{'incremental' if incremental else 'full'} loads")
+
+    solo = [_load(db_file, versions[i % 2], incremental) for i in range(2)]
+
+    context = multiprocessing.get_context('spawn')
+    with context.Manager() as manager, context.Pool(readers) as pool:
+        stop = manager.Event()
+        pending = [pool.apply_async(_reader, (db_file, expected, stop)) for _ in range(readers)]
+        time.sleep(1)
+        concurrent = [_load(db_file, versions[i % 2], incremental) for i in range(loads)]
+        stop.set()
+        outcomes = [result.get() for result in pending]
+
+    latencies = [latency for outcome in outcomes for latency in outcome[0]]
+    errors = [error for outcome in outcomes for error in outcome[1]]
+    results = {
+        'environment': environment(),
+        'rows': rows,
+        'readers': readers,
+        'incremental': incremental,
+        'load_seconds_alone': [round(seconds, 3) for seconds in solo],
+        'load_seconds_with_readers': [round(seconds, 3) for seconds in concurrent],
+        'reads': len(latencies),
+        'read_ms_median': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'read_ms_p95': round(_percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        'read_ms_max': round(max(latencies) * 1000, 1) if latencies else None,
+        'read_errors': len(errors),
+        'error_messages': sorted(set(errors))[:5],
+        'torn_reads': sum(outcome[2] for outcome in outcomes),
+    }
+    print(f"Load alone:        {' '.join(f'{s:.2f}s' for s in solo)}")
+    print(f"Load with readers: {' '.join(f'{s:.2f}s' for s in concurrent)}")
+    print(f"Reads: {results['reads']:,} (median {results['read_ms_median']} ms, p95 {results['read_ms_p95']} ms, "
+          f"max {results['read_ms_max']} ms); errors: {results['read_errors']}; torn reads: {results['torn_reads']}")
+    for message in results['error_messages']:
+        print(f"  error: {message}")
+
+    if output_file is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = os.path.join(RESULTS_DIR, f"concurrency-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output_file}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard reads running while the database is loaded.")
+    parser.add_argument('--rows', type=int, default=BASE_ROWS, help="Synthetic rows per load")
+    parser.add_argument('--loads', type=int, default=DEFAULT_LOADS, help="Loads run while the readers read")
+    parser.add_argument('--readers', type=int, default=DEFAULT_READERS, help="Reader processes")
+    parser.add_argument('--incremental', action='store_true', help="Use incremental loads instead of full ones")
+    parser.add_argument('--workdir', default=None, help="Directory for the synthetic data and database")
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmarks/concurrency-<time>.json)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Synthetic data seed")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.loads, args.readers, args.incremental, args.workdir, args.output, args.seed)
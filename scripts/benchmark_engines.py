@@ -0,0 +1,112 @@
+import argparse
+import json
+import math
+import os
+import time
+
+from benchmark_pipeline import environment
+from query_engines import DB_FILE, PLAN_FILE, SOURCES, DuckDBEngine, SQLiteEngine
+from query_library import QueryLibrary
+from summary_tables import CUBE_TABLE, SKU_TABLE
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+QUERIES_FILE = os.path.join(SQL_DIR, 'analysis_queries.sql')
+
+def time_query(engine, name, repeat):
+    """Best-of-`repeat` wall time to get one query's result as a DataFrame; returns (seconds, result)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = engine.run(name)
+        best = min(best, time.perf_counter() - start)
+    return best, df
+
+def _value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+def _rows(df):
+    """Result rows as plain Python values, rounded and sorted, so both engines' results compare."""
+    rows = [tuple(_value(value) for value in row) for row in df.astype(object).itertuples(index=False)]
+    return sorted(rows, key=repr)
+
+def run_benchmark(db_file=DB_FILE, source='parquet', path=None, repeat=5, plan_file=PLAN_FILE):
+    """
+    Time every shipped analysis query on SQLite and on DuckDB, check that both
+    return the same rows, and write the faster engine per query to `plan_file`.
+
+    DuckDB has no stored summary tables, so a query that reads them is charged
+    the time to build them in memory: SQLite keeps those queries unless DuckDB
+    wins even after paying that once.
+    """
+    if not os.path.exists(db_file):
+        print(f"Error: database not found at {db_file}")
+        return None
+    try:
+        duck = DuckDBEngine(source, path)
+    except (ImportError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        return None
+    sqlite = SQLiteEngine(db_file)
+
+    results = {'environment': environment(), 'source': source, 'path': duck.path, 'repeat': repeat,
+               'queries': [], 'choice': {}}
+    try:
+        import duckdb
+
+        results['environment']['duckdb'] = duckdb.__version__
+        # One-time cost of the in-memory summary tables, kept out of the per-query times
+        results['duckdb_summary_seconds'] = round(duck.build_summary_tables(), 4)
+        print(f"DuckDB over {source} ({duck.path}); summary tables built in "
+              f"{results['duckdb_summary_seconds'] * 1000:.0f} ms")
+        print(f"Best of {repeat} runs, result as a DataFrame:")
+        print(f"{'Query':<28} {'SQLite (ms)':>11} {'DuckDB (ms)':>11} {'speedup':>8}  Choice")
+
+        library = QueryLibrary([QUERIES_FILE])
+        for name in library.names():
+            sqlite_seconds, expected = time_query(sqlite, name, repeat)
+            duck_seconds, actual = time_query(duck, name, repeat)
+            matches = _rows(expected) == _rows(actual)
+            summary = CUBE_TABLE in library.sql(name) or SKU_TABLE in library.sql(name)
+            duck_cost = duck_seconds + (results['duckdb_summary_seconds'] if summary else 0)
+            # DuckDB is chosen only when it is faster and returns the same rows
+            choice = 'duckdb' if matches and duck_cost < sqlite_seconds else 'sqlite'
+            results['choice'][name] = choice
+            results['queries'].append({
+                'query': name,
+                'rows': len(expected),
+                'sqlite_ms': round(sqlite_seconds * 1000, 2),
+                'duckdb_ms': round(duck_seconds * 1000, 2),
+                'reads_summary_tables': summary,
+                'results_match': matches,
+                'choice': choice,
+            })
+            note = '  (results differ)' if not matches else '  (summary tables)' if summary else ''
+            print(f"{name[:28]:<28} {sqlite_seconds * 1000:>11.1f} {duck_seconds * 1000:>11.1f} "
+                  f"{sqlite_seconds / duck_seconds:>7.2f}x  {choice}{note}")
+    finally:
+        sqlite.close()
+        duck.close()
+
+    os.makedirs(os.path.dirname(os.path.abspath(plan_file)), exist_ok=True)
+    with open(plan_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nEngine plan written to {plan_file} (used by query_engines.py --engine auto)")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare SQLite and DuckDB per analysis query and pick the faster.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database built by load_to_sql.py")
+    parser.add_argument('--source', choices=SOURCES, default='parquet',
+                        help="Files DuckDB reads (parquet: load_to_sql.py --backend parquet)")
+    parser.add_argument('--path', default=None, help="CSV file or Parquet directory for DuckDB")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per query (best time is reported)")
+    parser.add_argument('--plan', default=PLAN_FILE, help="Where to write the per-query engine choice")
+    args = parser.parse_args()
+    run_benchmark(args.db, args.source, args.path, args.repeat, args.plan)
@@ -0,0 +1,79 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+import generate_dashboard
+from generate_dashboard import DB_FILE, build_dashboard_html, get_comprehensive_data, write_plotly_asset
+
+# Runs one page's inline chart script under V8 with a stubbed Plotly and prints the best
+# compile+run time, which is dominated by parsing the embedded figure JSON
+NODE_PARSE_SCRIPT = """
+const vm = require('vm');
+const source = require('fs').readFileSync(process.argv[1], 'utf8');
+const repeat = parseInt(process.argv[2]);
+let best = Infinity;
+for (let i = 0; i < repeat; i++) {
+    const context = vm.createContext({Plotly: {newPlot: () => null}});
+    const start = process.hrtime.bigint();
+    new vm.Script(source).runInContext(context);
+    best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e6);
+}
+console.log(JSON.stringify({ms: best}));
+"""
+
+def _chart_script(page):
+    """The inline <script> body holding the chart JSON."""
+    return re.findall(r'<script>(.*?)</script>', page, flags=re.S)[-1]
+
+def _parse_ms(script, workdir, repeat):
+    """Best-of-`repeat` V8 parse+run time for a chart script, or None without node."""
+    node = shutil.which('node')
+    if node is None:
+        return None
+    script_file = os.path.join(workdir, 'chart_script.js')
+    with open(script_file, 'w', encoding='utf-8') as f:
+        f.write(script)
+    result = subprocess.run([node, '-e', NODE_PARSE_SCRIPT, script_file, str(repeat)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)['ms']
+
+def run_benchmark(db_file=DB_FILE, repeat=50):
+    """Compare the default CDN page with the offline compact page: bytes on disk and parse time."""
+    if not os.path.exists(db_file):
+        print(f"Error: database not found at {db_file}")
+        return
+
+    generate_dashboard.DB_FILE = db_file
+    rollups = get_comprehensive_data()
+    workdir = tempfile.mkdtemp(prefix='html_bench_')
+    try:
+        asset = write_plotly_asset(os.path.join(workdir, 'assets'), precompress=True)
+        pages = {
+            'default (CDN)': build_dashboard_html(*[frame.copy() for frame in rollups])[0],
+            'offline compact': build_dashboard_html(*[frame.copy() for frame in rollups], plotly_src='assets/plotly.min.js',
+                                                    compact=True)[0],
+        }
+
+        print(f"{'Page':<18} {'HTML (KB)':>10} {'gzip (KB)':>10} {'Chart parse (ms)':>17}")
+        for label, page in pages.items():
+            raw = page.encode('utf-8')
+            parse_ms = _parse_ms(_chart_script(page), workdir, repeat)
+            parse = f"{parse_ms:>17.2f}" if parse_ms is not None else f"{'n/a (no node)':>17}"
+            print(f"{label:<18} {len(raw) / 1024:>10.1f} {len(gzip.compress(raw, 9)) / 1024:>10.1f} {parse}")
+
+        print(f"Shared plotly.js asset: {os.path.getsize(asset) / 1024:,.0f} KB "
+              f"({os.path.getsize(asset + '.gz') / 1024:,.0f} KB gzip), written once for every offline page")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure dashboard HTML size and chart parse time.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database to build the dashboard from")
+    parser.add_argument('--repeat', type=int, default=50, help="Parse runs per page (best time is reported)")
+    args = parser.parse_args()
+    run_benchmark(args.db, args.repeat)
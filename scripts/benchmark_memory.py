@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from schema import CSV_DTYPES, read_sales_csv, read_sales_frame
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+CSV_FILE = os.path.join(PROJECT_ROOT, 'data', 'cleaned_data.csv')
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+
+def _measure(func):
+    start = time.perf_counter()
+    frame = func()
+    return frame, time.perf_counter() - start
+
+def compare_frames(label, default, compact, default_seconds, compact_seconds):
+    """Print df.memory_usage(deep=True) per column for both frames; returns the rows."""
+    before = default.memory_usage(deep=True, index=False)
+    after = compact.memory_usage(deep=True, index=False)
+    print(f"\n{label}: {len(default):,} rows")
+    print(f"{'Column':<20} {'Default dtype':<14} {'Compact dtype':<14} {'Before (MB)':>11} {'After (MB)':>10} {'Ratio':>6}")
+    rows = []
+    for col in default.columns:
+        ratio = before[col] / after[col] if after[col] else float('nan')
+        rows.append({'column': col, 'default_dtype': str(default[col].dtype), 'compact_dtype': str(compact[col].dtype),
+                     'before_bytes': int(before[col]), 'after_bytes': int(after[col])})
+        print(f"{col:<20} {str(default[col].dtype)[:14]:<14} {str(compact[col].dtype)[:14]:<14} "
+              f"{before[col] / 1024 ** 2:>11.2f} {after[col] / 1024 ** 2:>10.2f} {ratio:>5.1f}x")
+    total_before, total_after = before.sum(), after.sum()
+    print(f"{'Total':<50} {total_before / 1024 ** 2:>11.2f} {total_after / 1024 ** 2:>10.2f} "
+          f"{total_before / total_after:>5.1f}x")
+    print(f"Read time: {default_seconds:.2f}s default, {compact_seconds:.2f}s compact")
+    return {
+        'source': label,
+        'rows': len(default),
+        'before_bytes': int(total_before),
+        'after_bytes': int(total_after),
+        'default_seconds': round(default_seconds, 3),
+        'compact_seconds': round(compact_seconds, 3),
+        'columns': rows,
+    }
+
+def run_report(csv_file=CSV_FILE, db_file=DB_FILE, output_file=None):
+    """Compare default and compact reads of the cleaned CSV and of the `sales` table."""
+    report = {'pandas': pd.__version__, 'sources': []}
+    if os.path.exists(csv_file):
+        default, default_seconds = _measure(lambda: pd.read_csv(csv_file, dtype=CSV_DTYPES))
+        compact, compact_seconds = _measure(lambda: read_sales_csv(csv_file))
+        report['sources'].append(compare_frames(csv_file, default, compact, default_seconds, compact_seconds))
+    else:
+        print(f"Skipping CSV: not found at {csv_file}")
+
+    if os.path.exists(db_file):
+        conn = sqlite3.connect(db_file)
+        try:
+            default, default_seconds = _measure(lambda: pd.read_sql_query("SELECT * FROM sales", conn))
+            compact, compact_seconds = _measure(lambda: read_sales_frame("SELECT * FROM sales", conn))
+        finally:
+            conn.close()
+        report['sources'].append(compare_frames(f"{db_file} (sales)", default, compact, default_seconds,
+                                                compact_seconds))
+    else:
+        print(f"Skipping database: not found at {db_file}")
+
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {output_file}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare default and compact in-memory sizes of the sales data.")
+    parser.add_argument('--csv', default=CSV_FILE, help="Cleaned CSV to read")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database whose `sales` table to read")
+    parser.add_argument('--output', default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+    run_report(args.csv, args.db, args.output)
@@ -0,0 +1,206 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from clean_data import peak_rss_mb
+from generate_synthetic_data import BASE_ROWS, DEFAULT_SEED, generate
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+
+# Multiples of the real export's row count
+DEFAULT_SCALES = [1, 10]
+
+STAGES = ['clean', 'load', 'query', 'render']
+
+def _clean(paths):
+    from clean_data import clean_data
+
+    if clean_data(paths['raw'], paths['cleaned']) is None:
+        raise RuntimeError("clean_data failed")
+
+def _load(paths):
+    import load_to_sql
+
+    load_to_sql.CSV_FILE = paths['cleaned']
+    load_to_sql.SQL_DIR = os.path.dirname(paths['db'])
+    load_to_sql.DB_FILE = paths['db']
+    load_to_sql.load_data()
+    with contextlib.closing(sqlite3.connect(paths['db'])) as conn:
+        if not conn.execute("SELECT count(*) FROM sales").fetchone()[0]:
+            raise RuntimeError("load_data wrote no rows")
+
+def _query(paths):
+    import generate_dashboard
+
+    generate_dashboard.DB_FILE = paths['db']
+    generate_dashboard.get_comprehensive_data()
+
+def _render(paths):
+    import generate_dashboard
+
+    generate_dashboard.DB_FILE = paths['db']
+    generate_dashboard.OUTPUT_HTML = paths['html']
+    generate_dashboard.create_comprehensive_dashboard()
+    if not os.path.exists(paths['html']):
+        raise RuntimeError("dashboard was not written")
+
+STAGE_FUNCTIONS = {'clean': _clean, 'load': _load, 'query': _query, 'render': _render}
+
+def run_stage(stage, paths, verbose=False):
+    """
+    Run one pipeline stage in this (fresh) process and return its wall time and
+    the process's peak RSS, which includes the interpreter and imported libraries.
+    Peak RSS is read from VmHWM, which, unlike ru_maxrss, does not carry over the
+    parent's peak into a spawned child.
+    """
+    output = None if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output) if output is not None else contextlib.nullcontext():
+        start = time.perf_counter()
+        STAGE_FUNCTIONS[stage](paths)
+        seconds = time.perf_counter() - start
+    return {'seconds': round(seconds, 4), 'peak_rss_mb': round(peak_rss_mb(), 1)}
+
+def _in_fresh_process(stage, paths, verbose):
+    # A new interpreter per stage, so peak RSS is the stage's own and imports are not shared
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_stage, stage, paths, verbose).result()
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    """What the numbers depend on, recorded next to them."""
+    import numpy
+    import pandas
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def benchmark_scale(scale, workdir, seed=DEFAULT_SEED, stages=STAGES, verbose=False):
+    """Generate a raw export at `scale` x the real one and time each pipeline stage on it."""
+    paths = {
+        'raw': os.path.join(workdir, 'raw.csv'),
+        'cleaned': os.path.join(workdir, 'cleaned_data.csv'),
+        'db': os.path.join(workdir, 'ecommerce.db'),
+        'html': os.path.join(workdir, 'index.html'),
+    }
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = generate(paths['raw'], int(BASE_ROWS * scale), raw=True, seed=seed)
+    result = {
+        'scale': scale,
+        'rows': rows,
+        'generate_seconds': round(time.perf_counter() - start, 2),
+        'raw_csv_mb': round(os.path.getsize(paths['raw']) / 1024 ** 2, 1),
+        'stages': {},
+    }
+    print(f"Scale {scale:g}x: {rows:,} raw rows ({result['raw_csv_mb']:,.0f} MB)")
+
+    for stage in stages:
+        try:
+            timing = _in_fresh_process(stage, paths, verbose)
+        except Exception as e:
+            print(f"Error in stage '{stage}' at scale {scale:g}x: {e}")
+            result['stages'][stage] = {'error': str(e)}
+            break
+        timing['rows_per_sec'] = round(rows / timing['seconds']) if timing['seconds'] else None
+        result['stages'][stage] = timing
+        print(f"  {stage:<8} {timing['seconds']:>9.2f}s {timing['peak_rss_mb']:>9.0f} MB peak RSS "
+              f"{timing['rows_per_sec'] or 0:>12,} rows/s")
+
+    if os.path.exists(paths['db']):
+        result['db_mb'] = round(os.path.getsize(paths['db']) / 1024 ** 2, 1)
+    return result
+
+def compare(results, baseline_file):
+    """Print each stage's time and peak RSS relative to an earlier results file."""
+    with open(baseline_file, encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {run['scale']: run for run in previous['runs']}
+    print(f"\nCompared with {baseline_file} (commit {previous['environment'].get('commit')}):")
+    print(f"{'Scale':>6} {'Stage':<8} {'Time':>16} {'Peak RSS':>18}")
+    for run in results['runs']:
+        before = baseline.get(run['scale'])
+        if before is None:
+            continue
+        for stage, timing in run['stages'].items():
+            old = before['stages'].get(stage, {})
+            if 'seconds' not in timing or 'seconds' not in old:
+                continue
+            print(f"{run['scale']:>5g}x {stage:<8} {old['seconds']:>6.2f}s→{timing['seconds']:>6.2f}s "
+                  f"{old['peak_rss_mb']:>7.0f}→{timing['peak_rss_mb']:>5.0f} MB "
+                  f"({timing['seconds'] / old['seconds']:.2f}x time)")
+
+def run_benchmark(scales=DEFAULT_SCALES, output_file=None, workdir=None, seed=DEFAULT_SEED, stages=STAGES,
+                  keep=False, baseline=None, verbose=False):
+    """
+    Time clean -> load -> query -> render on synthetic data at each scale and
+    write the results, with the environment they were measured in, as JSON.
+    """
+    results = {'environment': environment(), 'seed': seed, 'base_rows': BASE_ROWS, 'runs': []}
+    root = workdir or tempfile.mkdtemp(prefix='pipeline_bench_')
+    try:
+        for scale in scales:
+            scale_dir = os.path.join(root, f"x{scale:g}")
+            os.makedirs(scale_dir, exist_ok=True)
+            results['runs'].append(benchmark_scale(scale, scale_dir, seed, stages, verbose))
+            if not keep:
+                shutil.rmtree(scale_dir, ignore_errors=True)
+    finally:
+        if not keep and workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if output_file is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = os.path.join(RESULTS_DIR, f"pipeline-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output_file}")
+
+    if baseline:
+        compare(results, baseline)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data at several scales.")
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES,
+                        help=f"Multiples of the real export's {BASE_ROWS:,} rows (e.g. 1 10 100 1000)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help="Stages to run, in pipeline order (each needs the ones before it)")
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmarks/pipeline-<time>.json)")
+    parser.add_argument('--compare', default=None, help="Earlier results file to compare against")
+    parser.add_argument('--workdir', default=None, help="Where to write the generated data (default: a temp dir)")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated CSVs, database and dashboard")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed of the synthetic data")
+    parser.add_argument('--verbose', action='store_true', help="Show each stage's own output")
+    args = parser.parse_args()
+    run_benchmark(args.scales, args.output, args.workdir, args.seed, args.stages, args.keep, args.compare,
+                  args.verbose)
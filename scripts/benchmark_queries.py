@@ -0,0 +1,79 @@
+import argparse
+import os
+import sqlite3
+import time
+
+from query_library import QueryLibrary
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+QUERIES_FILE = os.path.join(SQL_DIR, 'analysis_queries.sql')
+# Frozen copies of the queries before the is_cancelled flag and the summary cube
+LEGACY_FILE = os.path.join(SQL_DIR, 'legacy_queries.sql')
+
+# Rounded sums computed in a different order (raw rows vs. the cube) may differ by a cent
+CENT = 0.011
+
+def time_query(conn, sql, params, repeat):
+    """Best-of-`repeat` wall time for fetching all rows of one query."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def same_rows(before, after):
+    """Whether two result sets match, in any order, with numbers equal to the cent."""
+    if len(before) != len(after):
+        return False
+    for old, new in zip(sorted(before, key=repr), sorted(after, key=repr)):
+        for a, b in zip(old, new):
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                if abs(a - b) > CENT:
+                    return False
+            elif a != b:
+                return False
+    return True
+
+def run_benchmark(db_file=DB_FILE, repeat=5):
+    """Time every shipped analysis query against its frozen pre-flag, pre-cube version."""
+    if not os.path.exists(db_file):
+        print(f"Error: database not found at {db_file}")
+        return
+
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute("SELECT count(*) FROM sales").fetchone()[0]
+    print(f"Benchmarking analysis queries over {rows:,} rows (best of {repeat})...")
+    print(f"{'Query':<34} {'legacy (ms)':>11} {'now (ms)':>10} {'speedup':>8}")
+
+    total_before = total_after = 0.0
+    library = QueryLibrary([QUERIES_FILE])
+    legacy = QueryLibrary([LEGACY_FILE])
+    for title in library.names():
+        if title not in legacy.names():
+            print(f"{title[:34]:<34} {'-':>11} (no legacy version)")
+            continue
+        sql = library.sql(title)
+        params = library.bind(title)
+        legacy_sql = legacy.sql(title)
+        if not same_rows(conn.execute(legacy_sql).fetchall(), conn.execute(sql, params).fetchall()):
+            print(f"Warning: results differ for '{title}'")
+        before = time_query(conn, legacy_sql, (), repeat)
+        after = time_query(conn, sql, params, repeat)
+        total_before += before
+        total_after += after
+        print(f"{title[:34]:<34} {before * 1000:>11.1f} {after * 1000:>10.1f} {before / after:>7.2f}x")
+
+    conn.close()
+    print(f"{'Total':<34} {total_before * 1000:>11.1f} {total_after * 1000:>10.1f} {total_before / total_after:>7.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the shipped analysis queries.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database to benchmark against")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per query (best time is reported)")
+    args = parser.parse_args()
+    run_benchmark(args.db, args.repeat)
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmark_pipeline import environment
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+
+# Modules the scheduled jobs import, directly or through each other
+DEFAULT_MODULES = ['generate_dashboard', 'batch_dashboards', 'dashboard_server', 'load_to_sql', 'storage']
+
+# Whole-process commands that need no data: argument parsing and the pre-flight check
+DEFAULT_COMMANDS = [['generate_dashboard.py', '--help'], ['generate_dashboard.py', '--check']]
+
+DEFAULT_RUNS = 5
+HEAVIEST_IMPORTS = 5
+
+def parse_importtime(stderr):
+    """[(depth, module, self_us, cumulative_us)] from `python -X importtime` output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def import_time(module, scripts_dir=SCRIPT_DIR, runs=DEFAULT_RUNS):
+    """
+    Cold import time of `module` in fresh interpreters, from -X importtime.
+    Returns the median cumulative time and the heaviest imports it triggers directly.
+    """
+    totals = []
+    children = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=scripts_dir,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        entries = parse_importtime(result.stderr)
+        totals.append(next(cumulative for depth, name, _, cumulative in entries if depth == 0 and name == module))
+        for depth, name, _, cumulative in entries:
+            if depth == 1:
+                children.setdefault(name, []).append(cumulative)
+    # An import shared with an earlier sibling is charged to that sibling only
+    heaviest = sorted(((name, statistics.median(times)) for name, times in children.items()), key=lambda pair: -pair[1])
+    return {
+        'module': module,
+        'import_ms': round(statistics.median(totals) / 1000, 1),
+        'heaviest_imports': [{'module': name, 'ms': round(us / 1000, 1)} for name, us in heaviest[:HEAVIEST_IMPORTS]],
+    }
+
+def command_time(command, scripts_dir=SCRIPT_DIR, runs=DEFAULT_RUNS):
+    """Median wall time of a whole script run, interpreter start-up included."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + command, cwd=scripts_dir, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return {'command': ' '.join(command), 'wall_ms': round(statistics.median(times) * 1000, 1)}
+
+def compare(results, baseline_file):
+    """Print each module's import time and each command's wall time relative to an earlier results file."""
+    with open(baseline_file, encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nCompared with {baseline_file} (commit {previous['environment'].get('commit')}):")
+    before = {entry['module']: entry['import_ms'] for entry in previous['imports']}
+    for entry in results['imports']:
+        if entry['module'] in before:
+            old = before[entry['module']]
+            print(f"  import {entry['module']:<24} {old:>7.1f}→{entry['import_ms']:>7.1f} ms "
+                  f"({entry['import_ms'] / old:.2f}x)")
+    before = {entry['command']: entry['wall_ms'] for entry in previous['commands']}
+    for entry in results['commands']:
+        if entry['command'] in before:
+            old = before[entry['command']]
+            print(f"  {entry['command']:<31} {old:>7.1f}→{entry['wall_ms']:>7.1f} ms ({entry['wall_ms'] / old:.2f}x)")
+
+def run_benchmark(modules=DEFAULT_MODULES, commands=DEFAULT_COMMANDS, scripts_dir=SCRIPT_DIR, runs=DEFAULT_RUNS,
+                  output_file=None, baseline=None):
+    """
+    Measure cold-start cost: each module's import time and each command's wall
+    time, every run in a fresh interpreter. `scripts_dir` may point at another
+    checkout's scripts/ (e.g. a `git worktree` of an older commit) to compare.
+    """
+    results = {'environment': environment(), 'scripts_dir': scripts_dir, 'runs': runs, 'imports': [], 'commands': []}
+    interpreter = command_time(['-c', 'pass'], scripts_dir, runs)
+    results['interpreter_ms'] = interpreter['wall_ms']
+    print(f"Interpreter start-up: {interpreter['wall_ms']:.1f} ms (median of {runs})")
+
+    print(f"\n{'Module':<24} {'Import (ms)':>11}  Heaviest direct imports")
+    for module in modules:
+        try:
+            entry = import_time(module, scripts_dir, runs)
+        except Exception as e:
+            print(f"Error importing {module}: {e}")
+            continue
+        results['imports'].append(entry)
+        heaviest = ', '.join(f"{child['module']} {child['ms']:.0f}" for child in entry['heaviest_imports'])
+        print(f"{module:<24} {entry['import_ms']:>11.1f}  {heaviest}")
+
+    print(f"\n{'Command':<36} {'Wall (ms)':>9}")
+    for command in commands:
+        entry = command_time(command, scripts_dir, runs)
+        results['commands'].append(entry)
+        print(f"{entry['command']:<36} {entry['wall_ms']:>9.1f}")
+
+    if output_file is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = os.path.join(RESULTS_DIR, f"startup-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output_file}")
+
+    if baseline:
+        compare(results, baseline)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline scripts' cold-start import and run time.")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Fresh interpreters per measurement")
+    parser.add_argument('--scripts-dir', default=SCRIPT_DIR,
+                        help="scripts/ directory to measure (e.g. of a `git worktree` at an older commit)")
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmarks/startup-<time>.json)")
+    parser.add_argument('--compare', default=None, help="Earlier results file to compare against")
+    args = parser.parse_args()
+    run_benchmark(args.modules, DEFAULT_COMMANDS, args.scripts_dir, args.runs, args.output, args.compare)
@@ -0,0 +1,78 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import load_to_sql
+from aggregations import load_sales_columns, compute_rollups
+from storage import ParquetStorage, ROLLUP_COLUMNS
+
+def _dir_size(path):
+    """Total bytes of a file, or of every file under a directory."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def _measure(func):
+    """Run func() once, returning (result, seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmark(csv_file=load_to_sql.CSV_FILE, chunksize=load_to_sql.CHUNK_SIZE):
+    """Load the same CSV into SQLite and Parquet, then compare load time, size and rollup reads."""
+    if not os.path.exists(csv_file):
+        print(f"Error: CSV file not found at {csv_file}")
+        return
+
+    workdir = tempfile.mkdtemp(prefix='storage_bench_')
+    db_file = os.path.join(workdir, 'ecommerce.db')
+    parquet_dir = os.path.join(workdir, 'sales_parquet')
+    load_to_sql.CSV_FILE = csv_file
+    load_to_sql.SQL_DIR = workdir
+    load_to_sql.DB_FILE = db_file
+
+    try:
+        print(f"Benchmarking storage backends on {csv_file}...")
+        _, sqlite_load = _measure(lambda: load_to_sql.load_data(chunksize=chunksize))
+        _, parquet_load = _measure(
+            lambda: ParquetStorage(parquet_dir).write(load_to_sql.read_csv_chunks(csv_file, chunksize))
+        )
+
+        def sqlite_read():
+            conn = sqlite3.connect(db_file)
+            try:
+                return load_sales_columns(conn)
+            finally:
+                conn.close()
+
+        def parquet_read():
+            return ParquetStorage(parquet_dir).read_columns(list(ROLLUP_COLUMNS)).rename(columns=ROLLUP_COLUMNS)
+
+        sqlite_frame, sqlite_read_time = _measure(sqlite_read)
+        parquet_frame, parquet_read_time = _measure(parquet_read)
+        _, sqlite_agg = _measure(lambda: compute_rollups(sqlite_frame))
+        _, parquet_agg = _measure(lambda: compute_rollups(parquet_frame))
+
+        rows = [
+            ('Load time (s)', sqlite_load, parquet_load),
+            ('Size on disk (MB)', _dir_size(db_file) / 1024 ** 2, _dir_size(parquet_dir) / 1024 ** 2),
+            ('Rollup column read (s)', sqlite_read_time, parquet_read_time),
+            ('Rollup frame memory (MB)', sqlite_frame.memory_usage(deep=True).sum() / 1024 ** 2,
+             parquet_frame.memory_usage(deep=True).sum() / 1024 ** 2),
+            ('Rollup compute (s)', sqlite_agg, parquet_agg),
+        ]
+        print(f"{'Metric':<32} {'SQLite':>10} {'Parquet':>10}")
+        for label, sqlite_value, parquet_value in rows:
+            print(f"{label:<32} {sqlite_value:>10.2f} {parquet_value:>10.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the SQLite and Parquet storage backends.")
+    parser.add_argument('--csv', default=load_to_sql.CSV_FILE, help="Cleaned CSV to load")
+    parser.add_argument('--chunksize', type=int, default=load_to_sql.CHUNK_SIZE, help="Rows per CSV chunk")
+    args = parser.parse_args()
+    run_benchmark(args.csv, args.chunksize)
@@ -0,0 +1,255 @@
+"""
+Skip-if-unchanged build of the pipeline: clean -> load -> dashboard.
+
+Each stage runs its script in a fresh interpreter, exactly as when run by
+hand. A manifest records, for every stage, the fingerprint (size, mtime and
+SHA-256) of each input and output, plus the stage's arguments. A stage reruns
+only when one of these changed, or an output is missing or was modified since.
+Hashes are recomputed only for files whose size or mtime changed, so a
+touched but unchanged file costs one hash and does not trigger a rebuild.
+The stage scripts and every module of scripts/ they import (found by
+reading their import statements, including imports inside functions) count
+as inputs, as do the named queries in sql/ when query_library.py is among
+them, so a code change reruns the stages it affects.
+
+This module imports nothing heavier than the standard library, so a rerun
+with nothing to do finishes in well under a second.
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+RAW_CSV = os.path.join(DATA_DIR, 'Amazon Sale Report.csv')
+CLEANED_CSV = os.path.join(DATA_DIR, 'cleaned_data.csv')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+OUTPUT_HTML = os.path.join(PROJECT_ROOT, 'dashboard', 'index.html')
+MANIFEST_FILE = os.path.join(PROJECT_ROOT, 'cache', 'build_manifest.json')
+# Written by load_to_sql.py --monitor, only once monitoring is enabled
+ALERTS_FILE = os.path.join(PROJECT_ROOT, 'monitoring', 'alerts.jsonl')
+
+HASH_BLOCK_BYTES = 1024 ** 2
+
+def _local_imports(path):
+    """Top-level module names imported anywhere in a Python file."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return names
+
+def code_inputs(script):
+    """
+    The script and every module in scripts/ it imports, directly or not, plus
+    the named query files if it uses query_library.py. Sorted paths.
+    """
+    found = set()
+    pending = [os.path.join(SCRIPT_DIR, script)]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        for name in _local_imports(path):
+            module = os.path.join(SCRIPT_DIR, f"{name}.py")
+            if os.path.exists(module):
+                pending.append(module)
+    if os.path.join(SCRIPT_DIR, 'query_library.py') in found:
+        found.update(glob.glob(os.path.join(SQL_DIR, '*.sql')))
+    return sorted(found)
+
+# name -> script, data inputs, optional inputs (may not exist), outputs. Stages run in
+# this order; each stage's code inputs come from code_inputs(script).
+STAGES = {
+    'clean': {
+        'script': 'clean_data.py',
+        'inputs': [RAW_CSV],
+        'optional': [],
+        'outputs': [CLEANED_CSV],
+    },
+    'load': {
+        'script': 'load_to_sql.py',
+        'inputs': [CLEANED_CSV],
+        'optional': [],
+        'outputs': [DB_FILE],
+    },
+    'dashboard': {
+        'script': 'generate_dashboard.py',
+        'inputs': [DB_FILE],
+        'optional': [ALERTS_FILE],
+        'outputs': [OUTPUT_HTML],
+    },
+}
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fingerprint(path, previous=None):
+    """
+    Size, mtime and SHA-256 of a file (None if it does not exist). The hash of
+    `previous` is reused when size and mtime are unchanged.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+        sha256 = previous['sha256']
+    else:
+        sha256 = _hash_file(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+
+def _same_content(current, recorded):
+    if current is None or recorded is None:
+        return current is recorded
+    return current['sha256'] == recorded['sha256']
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {'stages': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """Write the manifest atomically, so an interrupted build never leaves it half-written."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp, path)
+
+def stage_state(stage, args, record):
+    """
+    Current fingerprints of a stage's files, and why it must run (None if it
+    is up to date). `record` is the stage's manifest entry from its last run.
+    """
+    recorded = (record or {}).get('files', {})
+    watched = stage['inputs'] + stage['optional'] + code_inputs(stage['script']) + stage['outputs']
+    files = {path: fingerprint(path, recorded.get(path)) for path in watched}
+    if record is None:
+        return files, "never built"
+    if record.get('args') != args:
+        return files, "arguments changed"
+    for path in stage['outputs']:
+        if files[path] is None:
+            return files, f"{os.path.relpath(path, PROJECT_ROOT)} is missing"
+    for path in watched:
+        if not _same_content(files[path], recorded.get(path)):
+            return files, f"{os.path.relpath(path, PROJECT_ROOT)} changed"
+    return files, None
+
+def _stat(path):
+    return (os.stat(path).st_size, os.stat(path).st_mtime_ns) if os.path.exists(path) else None
+
+def run_stage(stage, args):
+    """Run the stage's script in a fresh interpreter; returns (succeeded, seconds)."""
+    before = {path: _stat(path) for path in stage['outputs']}
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, stage['script'])] + args, cwd=PROJECT_ROOT)
+    seconds = time.perf_counter() - start
+    # The scripts report some failures without a non-zero exit, so also require every output to be (re)written
+    written = all(_stat(path) is not None and _stat(path) != before[path] for path in stage['outputs'])
+    return result.returncode == 0 and written, seconds
+
+def build(stages=None, force=(), dry_run=False, stage_args=None, run_args=None, manifest_file=MANIFEST_FILE):
+    """
+    Bring the pipeline up to date, running only the stages whose inputs,
+    code, arguments or outputs changed since their last successful run.
+
+    `stage_args` are arguments that are part of a stage's recipe (a change
+    reruns it); `run_args` only affect how it runs (e.g. --incremental).
+    Returns True if every selected stage is up to date afterwards.
+    """
+    stages = stages or list(STAGES)
+    stage_args = stage_args or {}
+    run_args = run_args or {}
+    manifest = load_manifest(manifest_file)
+    # Outputs of stages a dry run would rerun: the stages reading them would rerun too
+    pending = {}
+    start = time.perf_counter()
+    for name in STAGES:
+        if name not in stages:
+            continue
+        stage = STAGES[name]
+        args = stage_args.get(name, [])
+        record = manifest['stages'].get(name)
+        files, reason = stage_state(stage, args, record)
+        if name in force:
+            reason = "forced"
+        upstream = [pending[path] for path in stage['inputs'] if path in pending]
+        if reason is None and upstream:
+            reason = f"after {upstream[0]}"
+        missing = [path for path in stage['inputs'] if files[path] is None and path not in pending]
+        if reason is not None and missing:
+            if all(files[path] is not None for path in stage['outputs']):
+                # e.g. cleaned_data.csv written by the notebook, without the raw export
+                print(f"{name:<10} skipped: {os.path.relpath(missing[0], PROJECT_ROOT)} not found, "
+                      f"using the existing outputs")
+                continue
+            print(f"{name:<10} failed: {os.path.relpath(missing[0], PROJECT_ROOT)} not found")
+            if not dry_run:
+                save_manifest(manifest, manifest_file)
+            return False
+        if reason is None:
+            print(f"{name:<10} up to date")
+            # Keep reused hashes keyed to current mtimes, so touched files are hashed only once
+            manifest['stages'][name]['files'] = files
+            continue
+        if dry_run:
+            print(f"{name:<10} would run ({reason})")
+            pending.update((path, name) for path in stage['outputs'])
+            continue
+
+        print(f"{name:<10} running ({reason})")
+        succeeded, seconds = run_stage(stage, args + run_args.get(name, []))
+        if not succeeded:
+            print(f"{name:<10} failed after {seconds:.1f}s; later stages not run")
+            manifest['stages'].pop(name, None)
+            save_manifest(manifest, manifest_file)
+            return False
+        files = {path: fingerprint(path, None if path in stage['outputs'] else files[path]) for path in files}
+        manifest['stages'][name] = {'args': args, 'files': files, 'seconds': round(seconds, 2),
+                                    'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        print(f"{name:<10} done in {seconds:.1f}s")
+    if not dry_run:
+        save_manifest(manifest, manifest_file)
+    print(f"Build finished in {time.perf_counter() - start:.2f}s")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the clean, load and dashboard stages whose inputs changed.")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES),
+                        help="Stages to consider (in pipeline order)")
+    parser.add_argument('--force', nargs='*', choices=list(STAGES), default=None,
+                        help="Rerun these stages even if unchanged (no names: all selected stages)")
+    parser.add_argument('--dry-run', action='store_true', help="Only report which stages would run, and why")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Load with load_to_sql.py --incremental when the load stage runs")
+    parser.add_argument('--offline', action='store_true',
+                        help="Build the dashboard with generate_dashboard.py --offline")
+    parser.add_argument('--manifest', default=MANIFEST_FILE, help="Where the build manifest is kept")
+    args = parser.parse_args()
+
+    # A bare --force reruns every selected stage
+    force = args.stages if args.force == [] else args.force or []
+    stage_args = {'dashboard': ['--offline'] if args.offline else []}
+    run_args = {'load': ['--incremental'] if args.incremental else []}
+    ok = build(args.stages, force, args.dry_run, stage_args, run_args, args.manifest)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,213 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import resource
+import argparse
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+RAW_CSV = os.path.join(DATA_DIR, 'Amazon Sale Report.csv')
+CLEANED_CSV = os.path.join(DATA_DIR, 'cleaned_data.csv')
+
+# Rows read per chunk of the raw export
+CHUNK_SIZE = 100_000
+
+# Raw export dates look like 04-30-22
+DATE_FORMAT = '%m-%d-%y'
+
+# Columns missing in more than this share of rows are dropped
+MAX_MISSING_RATIO = 0.5
+
+# Explicit dtypes for the raw Amazon export. Low-cardinality text is read straight into
+# `category`, so string normalization runs once per distinct value instead of per row.
+RAW_DTYPES = {
+    'index': 'int64',
+    'Order ID': str,
+    'Date': str,
+    'Status': 'category',
+    'Fulfilment': 'category',
+    'Sales Channel ': 'category',
+    'ship-service-level': 'category',
+    'Style': 'category',
+    'SKU': 'category',
+    'Category': 'category',
+    'Size': 'category',
+    'ASIN': 'category',
+    'Courier Status': 'category',
+    'Qty': 'int64',
+    'currency': 'category',
+    'Amount': 'float64',
+    'ship-city': 'category',
+    'ship-state': 'category',
+    'ship-postal-code': 'float64',
+    'ship-country': 'category',
+    'promotion-ids': str,
+    'B2B': 'bool',
+    'fulfilled-by': 'category',
+    'Unnamed: 22': 'category',
+}
+
+def snake_case(name):
+    """Column name as used downstream: trimmed, lowercase, spaces to underscores."""
+    return name.strip().lower().replace(' ', '_')
+
+def peak_rss_mb():
+    """Peak resident memory since the last reset, in MB."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux and cannot be reset, so this is the process-wide peak
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter so each step reports its own high-water mark."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+class StepStats:
+    """Wall time and peak resident memory per pipeline step, summed over chunks."""
+
+    def __init__(self):
+        self.steps = {}
+
+    def run(self, name, func, *args):
+        reset_peak_rss()
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        seconds, peak = self.steps.get(name, (0.0, 0.0))
+        self.steps[name] = (seconds + elapsed, max(peak, peak_rss_mb()))
+        return result
+
+    def report(self):
+        print(f"{'Step':<16} {'Time (s)':>10} {'Peak RSS (MB)':>14}")
+        for name, (seconds, peak) in self.steps.items():
+            print(f"{name:<16} {seconds:>10.2f} {peak:>14.1f}")
+        print(f"{'Total':<16} {sum(s for s, _ in self.steps.values()):>10.2f}")
+
+def read_raw_chunks(path=RAW_CSV, chunksize=CHUNK_SIZE):
+    """Stream the raw export as DataFrame chunks with explicit dtypes."""
+    return pd.read_csv(path, dtype=RAW_DTYPES, chunksize=chunksize)
+
+def find_sparse_columns(path=RAW_CSV, chunksize=CHUNK_SIZE, max_missing_ratio=MAX_MISSING_RATIO):
+    """Raw columns missing in more than `max_missing_ratio` of rows (one streaming pass)."""
+    rows = 0
+    missing = None
+    for chunk in read_raw_chunks(path, chunksize):
+        counts = chunk.isna().sum()
+        missing = counts if missing is None else missing + counts
+        rows += len(chunk)
+    if missing is None:
+        return []
+    return [col for col, count in missing.items() if count > rows * max_missing_ratio]
+
+def fix_column_names(df):
+    """Rename columns to snake_case."""
+    return df.rename(columns=snake_case)
+
+def convert_dates(df):
+    """Parse the raw date column; unparseable dates become NaT."""
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], format=DATE_FORMAT, errors='coerce')
+    return df
+
+def fill_missing(df):
+    """Fill text gaps with 'Unknown' and numeric gaps with 0, all columns at once."""
+    fills = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            if df[col].hasnans and 'Unknown' not in dtype.categories:
+                df[col] = df[col].cat.add_categories('Unknown')
+            fills[col] = 'Unknown'
+        elif pd.api.types.is_string_dtype(dtype) or dtype == object:
+            fills[col] = 'Unknown'
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            fills[col] = 0
+    return df.fillna(fills)
+
+def drop_duplicate_rows(df, seen):
+    """
+    Drop rows already present in this chunk or in `seen`, the sorted 64-bit row
+    hashes of earlier chunks. Returns the deduplicated chunk and the updated hashes.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    keep = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen)
+    return df[keep], np.sort(np.concatenate([seen, hashes[keep]]))
+
+def normalize_text(df):
+    """Trim and title-case text columns; categoricals are normalized once per distinct value."""
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories
+            df[col] = df[col].map(dict(zip(categories, categories.str.strip().str.title())))
+        elif pd.api.types.is_string_dtype(dtype) or dtype == object:
+            df[col] = df[col].str.strip().str.title()
+    return df
+
+def write_chunk(df, path, first):
+    """Write one cleaned chunk, with the header only for the first."""
+    df.to_csv(path, mode='w' if first else 'a', header=first, index=False, date_format='%Y-%m-%d')
+
+def clean_data(raw_file=RAW_CSV, output_file=CLEANED_CSV, chunksize=CHUNK_SIZE):
+    """
+    Run the notebook's cleaning steps over the raw export, one chunk at a time.
+
+    Steps match notebooks/data_cleaning.ipynb: snake_case names, parse dates, drop
+    columns missing in more than half the rows, fill gaps, drop duplicate rows and
+    trim/title-case text. Returns the per-step StepStats.
+    """
+    if not os.path.exists(raw_file):
+        print(f"Error: raw CSV file not found at {raw_file}")
+        return None
+
+    stats = StepStats()
+    print(f"Cleaning {raw_file} in chunks of {chunksize:,} rows...")
+    try:
+        sparse = stats.run('find sparse', find_sparse_columns, raw_file, chunksize)
+        if sparse:
+            print(f"Dropping columns with more than {MAX_MISSING_RATIO:.0%} missing values: {sparse}")
+
+        seen = np.empty(0, dtype='uint64')
+        rows_read = rows_written = 0
+        reader = read_raw_chunks(raw_file, chunksize)
+        first = True
+        while True:
+            chunk = stats.run('read', next, reader, None)
+            if chunk is None:
+                break
+            rows_read += len(chunk)
+            chunk = chunk.drop(columns=sparse)
+            chunk = stats.run('rename', fix_column_names, chunk)
+            chunk = stats.run('dates', convert_dates, chunk)
+            chunk = stats.run('fill missing', fill_missing, chunk)
+            chunk, seen = stats.run('dedupe', drop_duplicate_rows, chunk, seen)
+            chunk = stats.run('normalize text', normalize_text, chunk)
+            stats.run('write', write_chunk, chunk, output_file, first)
+            rows_written += len(chunk)
+            first = False
+    except Exception as e:
+        print(f"Error cleaning data: {e}")
+        return None
+
+    print(f"Removed {rows_read - rows_written:,} duplicate rows.")
+    print(f"Success! Wrote {rows_written:,} cleaned rows to {output_file}")
+    stats.report()
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the raw Amazon sales export.")
+    parser.add_argument('--input', default=RAW_CSV, help="Raw Amazon Sale Report CSV")
+    parser.add_argument('--output', default=CLEANED_CSV, help="Where to write the cleaned CSV")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="Rows per CSV chunk")
+    args = parser.parse_args()
+    clean_data(args.input, args.output, args.chunksize)
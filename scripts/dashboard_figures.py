@@ -0,0 +1,353 @@
+import base64
+import json
+import time
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.utils import PlotlyJSONEncoder
+
+from tracing import record
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Comprehensive color palette (teal, coral, gray, green)
+COLORS = {
+    'teal': '#00B8AA',
+    'coral': '#FC8665',
+    'green': '#2ECC71',
+    'gray': '#95A5A6',
+    'dark_teal': '#038387',
+    'light_coral': '#FF9F80',
+    'dark_gray': '#7F8C8D',
+    'light_gray': '#ECF0F1',
+    'background': '#F8F9FA',
+    'card_bg': '#FFFFFF',
+}
+
+# Every chart uses this template. Builders leave it out (validating a template on each
+# figure costs far more than building the figure) and encode_figure() splices it in.
+FIGURE_TEMPLATE = 'plotly_white'
+
+# Decimal places kept for data values in compact output (amounts are in rupees)
+FLOAT_DECIMALS = 2
+
+def _new_figure():
+    """Empty figure that skips applying plotly's default template."""
+    return go.Figure(layout=dict(template={}))
+
+def build_yoy_figure(monthly):
+    """Chart 1: Area Chart - Year over Year Comparison."""
+    fig = _new_figure()
+    fig.add_trace(go.Scatter(
+        x=monthly['month'],
+        y=monthly['revenue'],
+        mode='lines',
+        name='This Year Sales',
+        line=dict(color=COLORS['teal'], width=2.5),
+        fill='tozeroy',
+        fillcolor=f"rgba(0, 184, 170, 0.15)",
+        hovertemplate='<b>This Year</b><br>%{x}<br>₹%{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=monthly['month'],
+        y=monthly['last_year_revenue'],
+        mode='lines',
+        name='Last Year Sales',
+        line=dict(color=COLORS['coral'], width=2.5, dash='dot'),
+        fill='tozeroy',
+        fillcolor=f"rgba(252, 134, 101, 0.15)",
+        hovertemplate='<b>Last Year</b><br>%{x}<br>₹%{y:,.0f}<extra></extra>'
+    ))
+    # Annotation layer: months with monitoring alerts (see anomaly_monitor.py)
+    if 'alerts' in monthly and monthly['alerts'].any():
+        flagged = monthly[monthly['alerts'] > 0]
+        fig.add_trace(go.Scatter(
+            x=flagged['month'],
+            y=flagged['revenue'],
+            mode='markers',
+            name='Alerts',
+            marker=dict(color=COLORS['coral'], size=11, symbol='triangle-up', line=dict(width=1, color='white')),
+            customdata=flagged['alerts'],
+            text=flagged['alert_text'],
+            hovertemplate='<b>%{customdata} alerts</b><br>%{text}<extra></extra>'
+        ))
+    fig.update_layout(
+        xaxis_title='Month',
+        yaxis_title='Sales Revenue (₹)',
+        hovermode='x unified',
+        height=350,
+        margin=dict(l=50, r=20, t=10, b=50),
+        font=dict(family='Segoe UI', size=11),
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation='h', yanchor='bottom',y=1.02, xanchor='right', x=1),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
+    )
+    return fig
+
+def build_scatter_figure(cat_metrics):
+    """Chart 2: Scatter Plot - Sales Variance."""
+    fig = _new_figure()
+    fig.add_trace(go.Scatter(
+        x=cat_metrics['orders'],
+        y=cat_metrics['avg_revenue'],
+        mode='markers',
+        marker=dict(
+            size=cat_metrics['revenue']/1000000,
+            sizemode='diameter',
+            sizeref=2,
+            color=cat_metrics['variance'],
+            colorscale=[[0, COLORS['coral']], [0.5, COLORS['gray']], [1, COLORS['green']]],
+            showscale=True,
+            colorbar=dict(title='Variance'),
+            line=dict(width=1, color='white')
+        ),
+        text=cat_metrics['category'],
+        hovertemplate='<b>%{text}</b><br>Orders: %{x}<br>Avg Revenue: ₹%{y:.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='Number of Orders',
+        yaxis_title='Average Revenue (₹)',
+        height=320,
+        margin=dict(l=50, r=20, t=10, b=50),
+        font=dict(family='Segoe UI', size=11),
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=True, gridcolor='#E0E0E0'),
+        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
+    )
+    return fig
+
+def build_monthly_bar_figure(monthly):
+    """Chart 3: Horizontal Bar - Monthly Orders."""
+    fig = _new_figure()
+    fig.add_trace(go.Bar(
+        y=monthly['month'],
+        x=monthly['orders'],
+        orientation='h',
+        marker=dict(color=COLORS['green']),
+        text=monthly['orders'],
+        textposition='outside',
+        hovertemplate='<b>%{y}</b><br>Orders: %{x:,}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='Orders',
+        yaxis_title='',
+        height=320,
+        margin=dict(l=80, r=20, t=10, b=50),
+        font=dict(family='Segoe UI', size=11),
+        plot_bgcolor='rgba(0,0,0,0)',
+        yaxis=dict(autorange='reversed', showgrid=False),
+        xaxis=dict(showgrid=True, gridcolor='#E0E0E0')
+    )
+    return fig
+
+def build_geo_figure(regional):
+    """Chart 4: Geographic Bar Chart (Top States)."""
+    fig = _new_figure()
+    fig.add_trace(go.Bar(
+        x=regional['state'].head(10),
+        y=regional['revenue'].head(10),
+        marker=dict(
+            color=regional['revenue'].head(10),
+            colorscale=[[0, COLORS['light_coral']], [1, COLORS['teal']]],
+            showscale=False
+        ),
+        text=regional['revenue'].head(10).apply(lambda x: f'₹{x/1000000:.1f}M'),
+        textposition='outside',
+        hovertemplate='<b>%{x}</b><br>Revenue: ₹%{y:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='',
+        yaxis_title='Revenue (₹)',
+        height=320,
+        margin=dict(l=50, r=20, t=10, b=80),
+        font=dict(family='Segoe UI', size=11),
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=False, tickangle=-45),
+        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
+    )
+    return fig
+
+def build_regional_bar_figure(regional):
+    """Chart 5: Regional Bar Chart (Horizontal)."""
+    fig = _new_figure()
+    fig.add_trace(go.Bar(
+        y=regional['state'].head(8),
+        x=regional['revenue'].head(8),
+        orientation='h',
+        marker=dict(color=COLORS['teal']),
+        text=regional['revenue'].head(8).apply(lambda x: f'₹{x/1000000:.1f}M'),
+        textposition='outside',
+        hovertemplate='<b>%{y}</b><br>₹%{x:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='Revenue (₹)',
+        yaxis_title='',
+        height=320,
+        margin=dict(l=100, r=20, t=10, b=50),
+        font=dict(family='Segoe UI', size=11),
+        plot_bgcolor='rgba(0,0,0,0)',
+        yaxis=dict(autorange='reversed', showgrid=False),
+        xaxis=dict(showgrid=True, gridcolor='#E0E0E0')
+    )
+    return fig
+
+def build_category_figure(categories):
+    """Chart 6: Category Bar Chart (Vertical)."""
+    fig = _new_figure()
+    fig.add_trace(go.Bar(
+        x=categories['category'],
+        y=categories['revenue'],
+        marker=dict(
+            color=[COLORS['teal'], COLORS['coral'], COLORS['green'], COLORS['gray'], COLORS['dark_teal']]
+        ),
+        text=categories['revenue'].apply(lambda x: f'₹{x/1000000:.1f}M'),
+        textposition='outside',
+        hovertemplate='<b>%{x}</b><br>₹%{y:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='',
+        yaxis_title='Revenue (₹)',
+        height=320,
+        margin=dict(l=50, r=20, t=10, b=80),
+        font=dict(family='Segoe UI', size=11),
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=False, tickangle=-45),
+        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
+    )
+    return fig
+
+def build_channel_figure(channels):
+    """Chart 7: Donut Chart - Channels."""
+    fig = _new_figure()
+    fig.add_trace(go.Pie(
+        labels=channels['sales_channel'],
+        values=channels['revenue'],
+        hole=0.5,
+        marker=dict(colors=[COLORS['teal'], COLORS['coral'], COLORS['green']]),
+        textinfo='label+percent',
+        textfont=dict(size=12),
+        hovertemplate='<b>%{label}</b><br>₹%{value:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=320,
+        margin=dict(l=20, r=20, t=10, b=20),
+        font=dict(family='Segoe UI', size=11),
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+# (name, chart div id, JS variable, comment, builder, input frame), in page order
+FIGURES = [
+    ('yoy', 'yoy-chart', 'yoyData', 'Year-over-Year Trends', build_yoy_figure, 'monthly'),
+    ('scatter', 'scatter-chart', 'scatterData', 'Scatter Plot', build_scatter_figure, 'cat_metrics'),
+    ('monthly_bar', 'monthly-bar-chart', 'monthlyBarData', 'Monthly Orders', build_monthly_bar_figure, 'monthly'),
+    ('geo', 'geo-chart', 'geoData', 'Geographic Chart', build_geo_figure, 'regional'),
+    ('regional_bar', 'regional-bar-chart', 'regionalBarData', 'Regional Bar', build_regional_bar_figure, 'regional'),
+    ('category', 'category-chart', 'categoryData', 'Category', build_category_figure, 'categories'),
+    ('channel', 'channel-chart', 'channelData', 'Channel', build_channel_figure, 'channels'),
+]
+
+@lru_cache(maxsize=None)
+def _template_json():
+    """The shared template as a plain dict, resolved once per process."""
+    return pio.templates[FIGURE_TEMPLATE].to_plotly_json()
+
+def _json_default(obj):
+    # orjson serializes numeric arrays natively; object arrays (strings) and numpy
+    # scalars come through here
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _escape_for_script(text):
+    """Escape the characters that could end an inline <script>, as plotly's to_json does."""
+    return text.replace('<', '\\u003c').replace('>', '\\u003e').replace('/', '\\u002f')
+
+def _compact(value):
+    """Round floats and turn plotly's base64 typed arrays into short JSON lists."""
+    if isinstance(value, dict):
+        if 'bdata' in value and 'dtype' in value:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            if 'shape' in value:
+                array = array.reshape([int(n) for n in str(value['shape']).split(',')])
+            return _compact(array)
+        return {key: _compact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_compact(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            value = np.round(value, FLOAT_DECIMALS)
+            if np.isfinite(value).all() and (value == np.trunc(value)).all():
+                value = value.astype(np.int64)
+        return value.tolist()
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), FLOAT_DECIMALS)
+    return value
+
+def _dumps(value):
+    if orjson is not None:
+        text = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=_json_default).decode()
+    else:
+        text = json.dumps(value, cls=PlotlyJSONEncoder, separators=(',', ':'))
+    return _escape_for_script(text)
+
+def encode_template():
+    """The shared template as JSON, for pages that embed it once instead of per figure."""
+    return _dumps(_template_json())
+
+def encode_figure(fig, compact=False):
+    """
+    Serialize a figure to JSON, using orjson when installed.
+
+    By default the shared template is spliced into the figure. With `compact`
+    the template is left out (the page must assign it, see encode_template())
+    and data values are rounded to FLOAT_DECIMALS.
+    """
+    figure = fig.to_plotly_json()
+    if compact:
+        return _dumps(_compact(figure))
+    figure['layout']['template'] = _template_json()
+    return _dumps(figure)
+
+def render_figure(name, builder, frame, compact=False):
+    """Build and encode one figure; returns (name, json, build seconds, encode seconds)."""
+    start = time.perf_counter()
+    fig = builder(frame)
+    built = time.perf_counter()
+    figure_json = encode_figure(fig, compact)
+    return name, figure_json, built - start, time.perf_counter() - built
+
+def render_figures(frames, executor=None, compact=False):
+    """
+    Build and encode every dashboard figure from a dict of rollup frames.
+
+    Figures are independent, so with an `executor` (a thread or process pool)
+    they are rendered concurrently. Results come back in FIGURES order.
+    """
+    jobs = [(name, builder, frames[frame], compact) for name, _, _, _, builder, frame in FIGURES]
+    if executor is None:
+        results = [render_figure(*job) for job in jobs]
+    else:
+        futures = [executor.submit(render_figure, *job) for job in jobs]
+        results = [future.result() for future in futures]
+    # Recorded from the returned timings so figures rendered in worker processes are traced too
+    for name, figure_json, build, encode in results:
+        record(f"figure build: {name}", build)
+        record(f"json encode: {name}", encode)
+    return results
+
+def report_figure_timings(results):
+    """Print the per-figure build / encode breakdown."""
+    print(f"{'Figure':<14} {'Build (ms)':>10} {'Encode (ms)':>11} {'JSON (KB)':>10}")
+    for name, figure_json, build, encode in results:
+        print(f"{name:<14} {build * 1000:>10.1f} {encode * 1000:>11.1f} {len(figure_json) / 1024:>10.1f}")
+    print(f"{'Total':<14} {sum(r[2] for r in results) * 1000:>10.1f} {sum(r[3] for r in results) * 1000:>11.1f}")
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from aggregations import ROLLUP_NAMES, ROLLUP_FILTERS, load_cube_rollups_concurrently
+from query_library import DEFAULT_POOL_SIZE, ReadOnlyPool, load_library
+from snapshots import consistent_read, with_retry
+from storage import SQLiteStorage
+from summary_tables import summary_tables_exist
+from dashboard_figures import COLORS, FIGURES, encode_template, render_figures
+from generate_dashboard import DB_FILE, ASSETS_DIR, add_derived_metrics, write_plotly_asset
+from period_metrics import HISTORY_QUERY
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+
+# Responses kept in memory, least recently used evicted first
+DEFAULT_CACHE_ENTRIES = 256
+
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ResponseCache:
+    """In-memory LRU of encoded responses, keyed by path, filters and data version."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return body
+
+    def put(self, key, body):
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def report(self):
+        print(f"Response cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} entries")
+
+def parse_filters(query_string):
+    """Validated rollup filters from a query string (unknown parameters are ignored)."""
+    params = parse_qs(query_string)
+    filters = {name: params[name][0].strip() for name in ROLLUP_FILTERS if params.get(name, [''])[0].strip()}
+    for name in ('date_from', 'date_to'):
+        if name in filters and not ISO_DATE.match(filters[name]):
+            raise HTTPError(400, f"{name} must be YYYY-MM-DD")
+    return filters
+
+def _records(frame):
+    return json.loads(frame.to_json(orient='records'))
+
+def rollups_body(rollups):
+    """JSON for /api/rollups: every rollup frame as a list of records."""
+    payload = {name: _records(frame) for name, frame in zip(ROLLUP_NAMES, rollups)}
+    payload['kpis'] = payload['kpis'][0]
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+def figures_body(rollups, history=None):
+    """JSON for /api/figures: KPIs plus every chart in compact form (template left out)."""
+    kpis, monthly, cat_metrics, regional, categories, channels = rollups
+    add_derived_metrics(monthly, cat_metrics, history)
+    frames = {
+        'monthly': monthly,
+        'cat_metrics': cat_metrics,
+        'regional': regional,
+        'categories': categories,
+        'channels': channels,
+    }
+    # Filters matching no rows give empty object columns, which plotly rejects as marker sizes
+    frames = {name: frame.astype('float64') if frame.empty else frame for name, frame in frames.items()}
+    figures = ','.join(f'"{name}":{text}' for name, text, _, _ in render_figures(frames, compact=True))
+    kpi_json = json.dumps(_records(kpis)[0], separators=(',', ':'))
+    return f'{{"kpis":{kpi_json},"figures":{{{figures}}}}}'.encode()
+
+def shell_html():
+    """The dashboard shell: filter bar, KPI tiles and chart slots filled from /api/figures."""
+    chart_divs = '\n'.join(f'        <div class="tile"><div id="{div_id}"></div></div>' for _, div_id, *_ in FIGURES)
+    chart_ids = json.dumps({name: div_id for name, div_id, *_ in FIGURES})
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>E-Commerce Sales Analytics | Live Dashboard</title>
+    <script src="/assets/plotly.min.js"></script>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: {COLORS['background']};
+                padding: 16px; color: #2c3e50; }}
+        .header, .tile, .kpi-tile {{ background: {COLORS['card_bg']}; border-radius: 6px; box-shadow: 0 2px 8px rgba(0,0,0,0.08); }}
+        .header {{ padding: 20px 28px; margin-bottom: 20px; }}
+        h1 {{ font-size: 26px; font-weight: 600; }}
+        form {{ margin-top: 12px; display: flex; gap: 12px; align-items: center; font-size: 13px; color: {COLORS['dark_gray']}; }}
+        .kpi-row {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 16px; margin-bottom: 20px; }}
+        .kpi-tile {{ padding: 24px; border-left: 4px solid {COLORS['teal']}; }}
+        .kpi-label {{ font-size: 11px; color: {COLORS['dark_gray']}; text-transform: uppercase; font-weight: 600; }}
+        .kpi-value {{ font-size: 38px; font-weight: 700; color: #1a252f; }}
+        .charts {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 16px; }}
+        .tile {{ padding: 22px; }}
+        #status {{ color: {COLORS['gray']}; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📊 E-Commerce Sales Analytics Dashboard</h1>
+        <form id="filters">
+            <label>From <input type="date" name="date_from"></label>
+            <label>To <input type="date" name="date_to"></label>
+            <label>State <select name="state"><option value="">All</option></select></label>
+            <label>Category <select name="category"><option value="">All</option></select></label>
+            <span id="status"></span>
+        </form>
+    </div>
+    <div class="kpi-row">
+        <div class="kpi-tile"><div class="kpi-label">Total Products</div><div class="kpi-value" id="kpi-products"></div></div>
+        <div class="kpi-tile"><div class="kpi-label">Total Sales</div><div class="kpi-value" id="kpi-revenue"></div></div>
+        <div class="kpi-tile"><div class="kpi-label">Total Orders</div><div class="kpi-value" id="kpi-orders"></div></div>
+        <div class="kpi-tile"><div class="kpi-label">Avg Order Value</div><div class="kpi-value" id="kpi-avg"></div></div>
+    </div>
+    <div class="charts">
+{chart_divs}
+    </div>
+    <script>
+        var dashboardTemplate = {encode_template()};
+        var chartIds = {chart_ids};
+        var form = document.getElementById('filters');
+
+        function fillOptions(select, values) {{
+            values.forEach(function (value) {{ select.add(new Option(value, value)); }});
+        }}
+
+        function refresh() {{
+            var params = new URLSearchParams(new FormData(form)).toString();
+            var start = performance.now();
+            fetch('/api/figures?' + params).then(function (response) {{ return response.json(); }}).then(function (data) {{
+                var k = data.kpis;
+                document.getElementById('kpi-products').textContent = (k.total_products || 0).toLocaleString();
+                document.getElementById('kpi-revenue').textContent = '₹' + ((k.total_revenue || 0) / 1e6).toFixed(1) + 'M';
+                document.getElementById('kpi-orders').textContent = Math.round((k.total_orders || 0) / 1000) + 'K';
+                document.getElementById('kpi-avg').textContent = '₹' + Math.round(k.avg_order_value || 0);
+                Object.keys(chartIds).forEach(function (name) {{
+                    var fig = data.figures[name];
+                    fig.layout.template = dashboardTemplate;
+                    Plotly.react(chartIds[name], fig.data, fig.layout, {{responsive: true, displayModeBar: false}});
+                }});
+                document.getElementById('status').textContent = Math.round(performance.now() - start) + ' ms';
+            }});
+        }}
+
+        fetch('/api/filters').then(function (response) {{ return response.json(); }}).then(function (options) {{
+            fillOptions(form.state, options.states);
+            fillOptions(form.category, options.categories);
+            form.date_from.value = options.date_from;
+            form.date_to.value = options.date_to;
+            form.addEventListener('change', refresh);
+            refresh();
+        }});
+    </script>
+</body>
+</html>
+""".encode()
+
+class DashboardServer:
+    """
+    Serves the dashboard shell and the cube rollups as JSON.
+
+    The six rollup queries of a request run concurrently on a thread pool, each
+    on its own read-only connection, so the event loop keeps accepting requests
+    while SQLite works. Responses are
+    cached in memory until the database's data version changes. Loads swap
+    their data in atomically (see snapshots.py), so requests keep being
+    answered while one runs.
+    """
+
+    def __init__(self, db_file=DB_FILE, pool_size=DEFAULT_POOL_SIZE, cache_entries=DEFAULT_CACHE_ENTRIES):
+        self.storage = SQLiteStorage(db_file)
+        self.pool = ReadOnlyPool(db_file, pool_size)
+        # Request handlers and the queries they fan out to need separate threads
+        self.executor = ThreadPoolExecutor(max_workers=pool_size)
+        self.query_executor = ThreadPoolExecutor(max_workers=pool_size)
+        self.cache = ResponseCache(cache_entries)
+        self.plotly_js = write_plotly_asset(ASSETS_DIR)
+        self.routes = {
+            '/api/rollups': self.rollups,
+            '/api/figures': self.figures,
+            '/api/filters': self.filter_options,
+        }
+
+    def query_rollups(self, filters):
+        # The queries run on separate connections, so no single snapshot covers them:
+        # rerun them if a load committed while they ran
+        return consistent_read(lambda: load_cube_rollups_concurrently(self.pool, filters, self.query_executor),
+                               self.storage.data_version)
+
+    def rollups(self, filters):
+        return rollups_body(self.query_rollups(filters))
+
+    def monthly_history(self, filters):
+        """Monthly revenue without the date filter, so last year stays visible in a narrowed range."""
+        if not filters.get('date_from') and not filters.get('date_to'):
+            return None
+        undated = {name: value for name, value in filters.items() if name not in ('date_from', 'date_to')}
+        def history():
+            with self.pool.connection() as conn:
+                return load_library().run(conn, HISTORY_QUERY, undated)
+
+        return with_retry(history)
+
+    def figures(self, filters):
+        return figures_body(self.query_rollups(filters), self.monthly_history(filters))
+
+    def filter_options(self, filters):
+        states, categories, dates = load_library().run_many(
+            self.pool, ['filter_states', 'filter_categories', 'filter_dates'], executor=self.query_executor,
+        )
+        options = {'states': states['state'].tolist(), 'categories': categories['category'].tolist()}
+        options.update(_records(dates)[0])
+        return json.dumps(options, separators=(',', ':')).encode()
+
+    async def respond(self, path, query_string):
+        """(status, content type, body, cache hit) for one GET request."""
+        if path == '/':
+            return 200, 'text/html; charset=utf-8', shell_html(), False
+        if path == '/assets/plotly.min.js':
+            with open(self.plotly_js, 'rb') as f:
+                return 200, 'application/javascript', f.read(), False
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(404, f"No route for {path}")
+
+        filters = parse_filters(query_string)
+        key = (path, tuple(sorted(filters.items())), self.storage.data_version())
+        body = self.cache.get(key)
+        if body is not None:
+            return 200, 'application/json', body, True
+        body = await asyncio.get_running_loop().run_in_executor(self.executor, handler, filters)
+        self.cache.put(key, body)
+        return 200, 'application/json', body, False
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        target, hit = '-', False
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            # Headers are read and ignored; every response closes the connection
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request_line) < 2:
+                return
+            method, target = request_line[0], request_line[1]
+            if method != 'GET':
+                raise HTTPError(405, f"{method} is not supported")
+            url = urlsplit(target)
+            status, content_type, body, hit = await self.respond(url.path, url.query)
+        except HTTPError as e:
+            status, content_type = e.status, 'application/json'
+            body = json.dumps({'error': str(e)}).encode()
+        except Exception as e:
+            print(f"Error handling {target}: {e}")
+            status, content_type = 500, 'application/json'
+            body = json.dumps({'error': str(e)}).encode()
+
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+        print(f"GET {target} {status} {(time.perf_counter() - start) * 1000:.1f} ms{' (cached)' if hit else ''}")
+
+    def close(self):
+        self.executor.shutdown()
+        self.query_executor.shutdown()
+        self.pool.close()
+        self.cache.report()
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"📊 Serving the dashboard at http://{host}:{port}/ (Ctrl+C to stop)")
+    async with listener:
+        await listener.serve_forever()
+
+def run_server(db_file=DB_FILE, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=DEFAULT_POOL_SIZE,
+               cache_entries=DEFAULT_CACHE_ENTRIES):
+    """Serve the dashboard until interrupted."""
+    if not os.path.exists(db_file):
+        print(f"Error: database not found at {db_file}")
+        return
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        if not summary_tables_exist(conn):
+            print("Error: sales_daily_cube not found; run load_to_sql.py to build it")
+            return
+    finally:
+        conn.close()
+
+    server = DashboardServer(db_file, pool_size, cache_entries)
+    try:
+        asyncio.run(serve(server, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dashboard with filterable JSON endpoints.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database to serve")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help="Read-only SQLite connections (and query threads)")
+    parser.add_argument('--cache-entries', type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help="Responses kept in the in-memory cache")
+    args = parser.parse_args()
+    run_server(args.db, args.host, args.port, args.pool_size, args.cache_entries)
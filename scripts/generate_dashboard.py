@@ -1,9 +1,20 @@
-import pandas as pd
-import sqlite3
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import os
-import numpy as np
+import time
+import html
+import gzip
+import argparse
+import importlib.util
+
+# Only light modules are imported here: pandas, numpy and plotly load inside the
+# functions that need them, so `--help` and `--check` start in a fraction of the time
+from storage import BACKENDS, MAX_SHARDS, list_shards, open_storage
+from query_cache import QueryCache, DEFAULT_MAX_BYTES, CACHE_FILE
+from tracing import add_tracing_arguments, stop_tracing, trace, tracing_from_args
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Define paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,118 +23,150 @@ SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
 DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
 DASHBOARD_DIR = os.path.join(PROJECT_ROOT, 'dashboard')
 OUTPUT_HTML = os.path.join(DASHBOARD_DIR, 'index.html')
+ASSETS_DIR = os.path.join(DASHBOARD_DIR, 'assets')
 
-# Comprehensive color palette (teal, coral, gray, green)
-COLORS = {
-    'teal': '#00B8AA',
-    'coral': '#FC8665',
-    'green': '#2ECC71',
-    'gray': '#95A5A6',
-    'dark_teal': '#038387',
-    'light_coral': '#FF9F80',
-    'dark_gray': '#7F8C8D',
-    'light_gray': '#ECF0F1',
-    'background': '#F8F9FA',
-    'card_bg': '#FFFFFF',
-}
+PLOTLY_CDN = 'https://cdn.plot.ly/plotly-latest.min.js'
 
-os.makedirs(DASHBOARD_DIR, exist_ok=True)
+# Packages the dashboard needs, and the backends that need more
+REQUIRED_PACKAGES = ['pandas', 'numpy', 'plotly']
+BACKEND_PACKAGES = {'parquet': ['pyarrow']}
+OPTIONAL_PACKAGES = ['orjson', 'brotli']
 
-def get_comprehensive_data():
-    """Fetch all data needed for comprehensive dashboard."""
-    conn = sqlite3.connect(DB_FILE)
-    
-    # KPIs
-    kpi_query = """
-    SELECT 
-        COUNT(DISTINCT order_id) as total_orders,
-        COUNT(DISTINCT sku) as total_products,
-        SUM(qty) as total_units,
-        ROUND(SUM(amount), 2) as total_revenue,
-        ROUND(AVG(amount), 2) as avg_order_value
-    FROM sales
-    WHERE status NOT LIKE '%Cancelled%'
-    """
-    kpis = pd.read_sql_query(kpi_query, conn)
-    
-    # Monthly trend for current year
-    monthly_query = """
-    SELECT 
-        strftime('%Y-%m', date) as month,
-        COUNT(DISTINCT order_id) as orders,
-        ROUND(SUM(amount), 2) as revenue
-    FROM sales
-    WHERE status NOT LIKE '%Cancelled%'
-    GROUP BY month
-    ORDER BY month
-    """
-    monthly = pd.read_sql_query(monthly_query, conn)
-    
-    # Category metrics for scatter plot
-    category_metrics = """
-    SELECT 
-        category,
-        COUNT(DISTINCT order_id) as orders,
-        ROUND(SUM(amount), 2) as revenue,
-        ROUND(AVG(amount), 2) as avg_revenue
-    FROM sales
-    WHERE status NOT LIKE '%Cancelled%'
-    GROUP BY category
+# Alerts listed per month in the revenue trend's hover text
+ALERT_LINES = 5
+
+def get_comprehensive_data(backend='sqlite', cache=None, approximate=False):
     """
-    cat_metrics = pd.read_sql_query(category_metrics, conn)
-    
-    # Regional data
-    regional_query = """
-    SELECT 
-        "ship-state" as state,
-        COUNT(DISTINCT order_id) as orders,
-        ROUND(SUM(amount), 2) as revenue
-    FROM sales
-    WHERE status NOT LIKE '%Cancelled%'
-        AND "ship-state" != 'Unknown'
-    GROUP BY state
-    ORDER BY revenue DESC
+    Fetch all data needed for comprehensive dashboard.
+
+    With `approximate`, the distinct order and product KPIs come from the per-day
+    sketches (see sketch_tables.py) when they have been built.
     """
-    regional = pd.read_sql_query(regional_query, conn)
-    
-    # Category performance
-    category_query = """
-    SELECT 
-        category,
-        ROUND(SUM(amount), 2) as revenue
-    FROM sales
-    WHERE status NOT LIKE '%Cancelled%'
-    GROUP BY category
-    ORDER BY revenue DESC
+    # SQLite answers from the summary cube when built (single scan otherwise);
+    # Parquet reads only the columns the rollups need
+    storage = open_storage(backend, DB_FILE if backend == 'sqlite' else None)
+    with trace('rollups'):
+        if cache is None:
+            rollups = storage.rollups()
+        else:
+            # Unchanged data is answered from the cache without touching the storage
+            rollups = cache.get_or_compute(storage.ROLLUP_QUERY, storage.data_version(), storage.rollups)
+    kpis, monthly, cat_metrics, regional, categories, channels = rollups
+    if approximate:
+        kpis = apply_approximate_kpis(kpis, backend)
+    with trace('derived metrics', rows=len(monthly) + len(cat_metrics)):
+        add_derived_metrics(monthly, cat_metrics)
+        add_alert_annotations(monthly)
+    return kpis, monthly, cat_metrics, regional, categories, channels
+
+def apply_approximate_kpis(kpis, backend='sqlite'):
+    """Replace the distinct-count KPIs with their sketch estimates, if the sketches exist."""
+    from sketch_tables import approximate_kpis, sketch_tables_exist
+
+    if backend != 'sqlite':
+        print("Approximate KPIs need the SQLite sketches; using exact counts.")
+        return kpis
+    try:
+        # One snapshot with busy retries, like the rollups, so a load swapping in meanwhile is not half-read
+        estimates = open_storage('sqlite', DB_FILE).read(
+            lambda conn: approximate_kpis(conn) if sketch_tables_exist(conn) else None)
+    except ValueError as e:
+        # Sketches of different sizes cannot be merged (rebuild with sketch_tables.py --rebuild)
+        print(f"Error merging sketches: {e}; using exact counts.")
+        return kpis
+    if estimates is None:
+        print("No sketches found (load with --sketches); using exact counts.")
+        return kpis
+    kpis = kpis.copy()
+    kpis['total_orders'] = estimates['distinct_orders']
+    kpis['total_products'] = estimates['distinct_skus']
+    return kpis
+
+def add_derived_metrics(monthly, cat_metrics, history=None):
     """
-    categories = pd.read_sql_query(category_query, conn)
-    
-    # Sales channel
-    channel_query = """
-    SELECT 
-        sales_channel,
-        ROUND(SUM(amount), 2) as revenue
-    FROM sales
-    WHERE status NOT LIKE '%Cancelled%'
-    GROUP BY sales_channel
+    Add the comparison columns the charts plot on top of the raw rollups.
+
+    Last year's revenue is looked up in `history` (monthly revenue without the
+    date filter; defaults to `monthly` itself) and left empty for months with no
+    sales history a year earlier.
     """
-    channels = pd.read_sql_query(channel_query, conn)
-    
-    conn.close()
-    
-    # Create simulated "Last Year" data for year-over-year comparison
-    monthly['last_year_revenue'] = monthly['revenue'] * np.random.uniform(0.7, 0.9, len(monthly))
+    from period_metrics import period_over_period
+
+    # Same month of the previous year, from the real monthly history
+    periods = period_over_period(monthly if history is None else history, ['revenue'])
+    monthly['last_year_revenue'] = monthly['month'].map(periods.set_index('month')['revenue_last_year'])
     
     # Calculate variance for scatter plot
     cat_metrics['variance'] = cat_metrics['avg_revenue'] - cat_metrics['avg_revenue'].mean()
-    
-    return kpis, monthly, cat_metrics, regional, categories, channels
 
-def create_comprehensive_dashboard():
-    """Generate comprehensive analytics dashboard."""
+def add_alert_annotations(monthly, alerts_file=None):
+    """
+    Count each month's monitoring alerts (see anomaly_monitor.py) into `alerts`,
+    with the first few described in `alert_text`, for the trend chart's alert markers.
+    """
+    from anomaly_monitor import ALERTS_FILE, describe_alert, read_alerts
+
+    alerts = read_alerts(alerts_file or ALERTS_FILE)
+    # A series replayed after a reset may repeat its alerts; keep each once
+    alerts = alerts.drop_duplicates(['date', 'scope', 'segment', 'metric', 'kind'], keep='last')
+    lines = {}
+    for alert in alerts.sort_values('scope', key=lambda scope: scope != 'overall', kind='stable').to_dict('records'):
+        lines.setdefault(alert['date'][:7], []).append(f"{alert['date']} {describe_alert(alert)}")
+    monthly['alerts'] = monthly['month'].map(lambda month: len(lines.get(month, [])))
+    monthly['alert_text'] = monthly['month'].map(
+        lambda month: '<br>'.join(lines.get(month, [])[:ALERT_LINES])
+        + (f"<br>+{len(lines[month]) - ALERT_LINES} more" if len(lines.get(month, [])) > ALERT_LINES else ''))
+
+def write_precompressed(path):
+    """Write gzip (and, if the brotli package is installed, brotli) siblings of a file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    with gzip.GzipFile(path + '.gz', 'wb', compresslevel=9, mtime=0) as f:
+        f.write(data)
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data))
+
+def write_plotly_asset(assets_dir=ASSETS_DIR, precompress=False):
+    """Write the plotly.js bundle shipped with the plotly package once; returns its path."""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
     
-    print("Fetching data...")
-    kpis, monthly, cat_metrics, regional, categories, channels = get_comprehensive_data()
+    path = os.path.join(assets_dir, f'plotly-{get_plotlyjs_version()}.min.js')
+    if not os.path.exists(path):
+        os.makedirs(assets_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+    if precompress and not os.path.exists(path + '.gz'):
+        write_precompressed(path)
+    return path
+
+def asset_src(asset_path, output_file):
+    """URL of a local asset relative to the page that loads it."""
+    return os.path.relpath(asset_path, os.path.dirname(output_file)).replace(os.sep, '/')
+
+def write_page(output_file, html_content, precompress=False):
+    """Write a dashboard page, plus pre-compressed siblings if requested."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with trace('html write'):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    if precompress:
+        with trace('precompress'):
+            write_precompressed(output_file)
+
+def build_dashboard_html(kpis, monthly, cat_metrics, regional, categories, channels, executor=None, segment=None,
+                         plotly_src=PLOTLY_CDN, compact=False):
+    """
+    Render the dashboard page from the rollups; returns (html, per-figure results).
+
+    `segment` (e.g. "State: Maharashtra") labels a dashboard built for a slice of the data.
+    With `compact`, the chart template is embedded once for the whole page and chart
+    values are rounded (see dashboard_figures.encode_figure).
+    """
+    from dashboard_figures import COLORS, FIGURES, encode_template, render_figures
+
+    page_title = html.escape(segment) if segment else 'Comprehensive Dashboard'
+    report_label = html.escape(segment) if segment else 'Comprehensive Business Intelligence Report'
     
     # Extract KPIs
     total_revenue = kpis['total_revenue'].iloc[0]
@@ -138,8 +181,8 @@ def create_comprehensive_dashboard():
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>E-Commerce Sales Analytics | Comprehensive Dashboard</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <title>E-Commerce Sales Analytics | {page_title}</title>
+    <script src="{plotly_src}"></script>
     <style>
         * {{
             margin: 0;
@@ -264,7 +307,7 @@ def create_comprehensive_dashboard():
         <!-- Header -->
         <div class="header">
             <h1>📊 E-Commerce Sales Analytics Dashboard</h1>
-            <div class="subtitle">Comprehensive Business Intelligence Report | {total_orders:,} Orders Analyzed</div>
+            <div class="subtitle">{report_label} | {total_orders:,} Orders Analyzed</div>
         </div>
         
         <!-- KPI Row -->
@@ -339,226 +382,68 @@ def create_comprehensive_dashboard():
     <script>
 """
     
-    # Chart 1: Area Chart - Year over Year Comparison
-    fig_yoy = go.Figure()
-    fig_yoy.add_trace(go.Scatter(
-        x=monthly['month'],
-        y=monthly['revenue'],
-        mode='lines',
-        name='This Year Sales',
-        line=dict(color=COLORS['teal'], width=2.5),
-        fill='tozeroy',
-        fillcolor=f"rgba(0, 184, 170, 0.15)",
-        hovertemplate='<b>This Year</b><br>%{x}<br>₹%{y:,.0f}<extra></extra>'
-    ))
-    fig_yoy.add_trace(go.Scatter(
-        x=monthly['month'],
-        y=monthly['last_year_revenue'],
-        mode='lines',
-        name='Last Year Sales',
-        line=dict(color=COLORS['coral'], width=2.5, dash='dot'),
-        fill='tozeroy',
-        fillcolor=f"rgba(252, 134, 101, 0.15)",
-        hovertemplate='<b>Last Year</b><br>%{x}<br>₹%{y:,.0f}<extra></extra>'
-    ))
-    fig_yoy.update_layout(
-        xaxis_title='Month',
-        yaxis_title='Sales Revenue (₹)',
-        hovermode='x unified',
-        template='plotly_white',
-        height=350,
-        margin=dict(l=50, r=20, t=10, b=50),
-        font=dict(family='Segoe UI', size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        legend=dict(orientation='h', yanchor='bottom',y=1.02, xanchor='right', x=1),
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
-    )
-    
-    # Chart 2: Scatter Plot - Sales Variance
-    fig_scatter = go.Figure()
-    fig_scatter.add_trace(go.Scatter(
-        x=cat_metrics['orders'],
-        y=cat_metrics['avg_revenue'],
-        mode='markers',
-        marker=dict(
-            size=cat_metrics['revenue']/1000000,
-            sizemode='diameter',
-            sizeref=2,
-            color=cat_metrics['variance'],
-            colorscale=[[0, COLORS['coral']], [0.5, COLORS['gray']], [1, COLORS['green']]],
-            showscale=True,
-            colorbar=dict(title='Variance'),
-            line=dict(width=1, color='white')
-        ),
-        text=cat_metrics['category'],
-        hovertemplate='<b>%{text}</b><br>Orders: %{x}<br>Avg Revenue: ₹%{y:.0f}<extra></extra>'
-    ))
-    fig_scatter.update_layout(
-        xaxis_title='Number of Orders',
-        yaxis_title='Average Revenue (₹)',
-        template='plotly_white',
-        height=320,
-        margin=dict(l=50, r=20, t=10, b=50),
-        font=dict(family='Segoe UI', size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=True, gridcolor='#E0E0E0'),
-        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
-    )
-    
-    # Chart 3: Horizontal Bar - Monthly Orders
-    fig_monthly_bar = go.Figure()
-    fig_monthly_bar.add_trace(go.Bar(
-        y=monthly['month'],
-        x=monthly['orders'],
-        orientation='h',
-        marker=dict(color=COLORS['green']),
-        text=monthly['orders'],
-        textposition='outside',
-        hovertemplate='<b>%{y}</b><br>Orders: %{x:,}<extra></extra>'
-    ))
-    fig_monthly_bar.update_layout(
-        xaxis_title='Orders',
-        yaxis_title='',
-        template='plotly_white',
-        height=320,
-        margin=dict(l=80, r=20, t=10, b=50),
-        font=dict(family='Segoe UI', size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        yaxis=dict(autorange='reversed', showgrid=False),
-        xaxis=dict(showgrid=True, gridcolor='#E0E0E0')
-    )
-    
-    # Chart 4: Geographic Bar Chart (Top States)
-    fig_geo = go.Figure()
-    fig_geo.add_trace(go.Bar(
-        x=regional['state'].head(10),
-        y=regional['revenue'].head(10),
-        marker=dict(
-            color=regional['revenue'].head(10),
-            colorscale=[[0, COLORS['light_coral']], [1, COLORS['teal']]],
-            showscale=False
-        ),
-        text=regional['revenue'].head(10).apply(lambda x: f'₹{x/1000000:.1f}M'),
-        textposition='outside',
-        hovertemplate='<b>%{x}</b><br>Revenue: ₹%{y:,.0f}<extra></extra>'
-    ))
-    fig_geo.update_layout(
-        xaxis_title='',
-        yaxis_title='Revenue (₹)',
-        template='plotly_white',
-        height=320,
-        margin=dict(l=50, r=20, t=10, b=80),
-        font=dict(family='Segoe UI', size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=False, tickangle=-45),
-        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
-    )
-    
-    # Chart 5: Regional Bar Chart (Horizontal)
-    fig_regional_bar = go.Figure()
-    fig_regional_bar.add_trace(go.Bar(
-        y=regional['state'].head(8),
-        x=regional['revenue'].head(8),
-        orientation='h',
-        marker=dict(color=COLORS['teal']),
-        text=regional['revenue'].head(8).apply(lambda x: f'₹{x/1000000:.1f}M'),
-        textposition='outside',
-        hovertemplate='<b>%{y}</b><br>₹%{x:,.0f}<extra></extra>'
-    ))
-    fig_regional_bar.update_layout(
-        xaxis_title='Revenue (₹)',
-        yaxis_title='',
-        template='plotly_white',
-        height=320,
-        margin=dict(l=100, r=20, t=10, b=50),
-        font=dict(family='Segoe UI', size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        yaxis=dict(autorange='reversed', showgrid=False),
-        xaxis=dict(showgrid=True, gridcolor='#E0E0E0')
-    )
-    
-    # Chart 6: Category Bar Chart (Vertical)
-    fig_category = go.Figure()
-    fig_category.add_trace(go.Bar(
-        x=categories['category'],
-        y=categories['revenue'],
-        marker=dict(
-            color=[COLORS['teal'], COLORS['coral'], COLORS['green'], COLORS['gray'], COLORS['dark_teal']]
-        ),
-        text=categories['revenue'].apply(lambda x: f'₹{x/1000000:.1f}M'),
-        textposition='outside',
-        hovertemplate='<b>%{x}</b><br>₹%{y:,.0f}<extra></extra>'
-    ))
-    fig_category.update_layout(
-        xaxis_title='',
-        yaxis_title='Revenue (₹)',
-        template='plotly_white',
-        height=320,
-        margin=dict(l=50, r=20, t=10, b=80),
-        font=dict(family='Segoe UI', size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=False, tickangle=-45),
-        yaxis=dict(showgrid=True, gridcolor='#E0E0E0')
-    )
-    
-    # Chart 7: Donut Chart - Channels
-    fig_channel = go.Figure()
-    fig_channel.add_trace(go.Pie(
-        labels=channels['sales_channel'],
-        values=channels['revenue'],
-        hole=0.5,
-        marker=dict(colors=[COLORS['teal'], COLORS['coral'], COLORS['green']]),
-        textinfo='label+percent',
-        textfont=dict(size=12),
-        hovertemplate='<b>%{label}</b><br>₹%{value:,.0f}<extra></extra>'
-    ))
-    fig_channel.update_layout(
-        template='plotly_white',
-        height=320,
-        margin=dict(l=20, r=20, t=10, b=20),
-        font=dict(family='Segoe UI', size=11),
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
+    # Build and serialize the charts (concurrently when given a pool)
+    frames = {
+        'monthly': monthly,
+        'cat_metrics': cat_metrics,
+        'regional': regional,
+        'categories': categories,
+        'channels': channels,
+    }
+    with trace('figures'):
+        results = render_figures(frames, executor, compact)
+    figure_json = {name: text for name, text, _, _ in results}
     
     # Add charts to HTML
-    html_content += f"""
-        // Chart 1: Year-over-Year Trends
-        var yoyData = {fig_yoy.to_json()};
-        Plotly.newPlot('yoy-chart', yoyData.data, yoyData.layout, {{responsive: true, displayModeBar: false}});
-        
-        // Chart 2: Scatter Plot
-        var scatterData = {fig_scatter.to_json()};
-        Plotly.newPlot('scatter-chart', scatterData.data, scatterData.layout, {{responsive: true, displayModeBar: false}});
-        
-        // Chart 3: Monthly Orders
-        var monthlyBarData = {fig_monthly_bar.to_json()};
-        Plotly.newPlot('monthly-bar-chart', monthlyBarData.data, monthlyBarData.layout, {{responsive: true, displayModeBar: false}});
-        
-        // Chart 4: Geographic Chart
-        var geoData = {fig_geo.to_json()};
-        Plotly.newPlot('geo-chart', geoData.data, geoData.layout, {{responsive: true, displayModeBar: false}});
-        
-        // Chart 5: Regional Bar
-        var regionalBarData = {fig_regional_bar.to_json()};
-        Plotly.newPlot('regional-bar-chart', regionalBarData.data, regionalBarData.layout, {{responsive: true, displayModeBar: false}});
-        
-        // Chart 6: Category
-        var categoryData = {fig_category.to_json()};
-        Plotly.newPlot('category-chart', categoryData.data, categoryData.layout, {{responsive: true, displayModeBar: false}});
-        
-        // Chart 7: Channel
-        var channelData = {fig_channel.to_json()};
-        Plotly.newPlot('channel-chart', channelData.data, channelData.layout, {{responsive: true, displayModeBar: false}});
+    if compact:
+        html_content += f"""
+        var dashboardTemplate = {encode_template()};
+        """
+    for number, (name, div_id, var, comment, _, _) in enumerate(FIGURES, start=1):
+        set_template = f"{var}.layout.template = dashboardTemplate;" if compact else ""
+        html_content += f"""
+        // Chart {number}: {comment}
+        var {var} = {figure_json[name]};{set_template}
+        Plotly.newPlot('{div_id}', {var}.data, {var}.layout, {{responsive: true, displayModeBar: false}});
+        """
+    html_content += """
     </script>
 </body>
 </html>
 """
+    return html_content, results
+
+def create_comprehensive_dashboard(backend='sqlite', cache=None, executor=None, offline=False, precompress=False,
+                                   approximate=False):
+    """
+    Generate comprehensive analytics dashboard.
+
+    `offline` loads plotly.js from a shared local copy under dashboard/assets/ instead
+    of the CDN and writes compact chart JSON; `precompress` adds .gz/.br siblings.
+    `approximate` shows sketch estimates for the distinct order and product counts.
+    """
+    from dashboard_figures import report_figure_timings
+
+    print(f"Fetching data from {backend}...")
+    try:
+        rollups = get_comprehensive_data(backend, cache, approximate)
+    except (FileNotFoundError, ValueError) as e:
+        # e.g. no shards yet, or more shards than SQLite can attach
+        print(f"Error reading {backend} storage: {e}")
+        return False
+    
+    plotly_src = PLOTLY_CDN
+    if offline:
+        plotly_src = asset_src(write_plotly_asset(ASSETS_DIR, precompress), OUTPUT_HTML)
+    
+    start = time.perf_counter()
+    with trace('html build'):
+        html_content, results = build_dashboard_html(*rollups, executor=executor, plotly_src=plotly_src,
+                                                     compact=offline)
+    elapsed = time.perf_counter() - start
     
     # Write to file
-    with open(OUTPUT_HTML, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_page(OUTPUT_HTML, html_content, precompress)
     
     print(f"✅ Comprehensive dashboard generated!")
     print(f"📊 Location: {OUTPUT_HTML}")
@@ -571,6 +456,87 @@ def create_comprehensive_dashboard():
     print(f"   - Geographic visualizations")
     print(f"   - Vertical bar charts (categories)")
     print(f"   - Donut chart (channels)")
+    print(f"⏱️ Page rendered in {elapsed * 1000:.0f} ms:")
+    report_figure_timings(results)
+    return True
+
+def _writable(path):
+    """Whether `path`, or the nearest existing directory above it, can be written to."""
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return False
+        path = parent
+    return os.access(path, os.W_OK)
+
+def check_environment(backend='sqlite', cache=True):
+    """
+    Check that a build could run, without running it or importing pandas: the
+    storage exists, the required packages are installed and the output
+    directories are writable. Prints one line per check; returns True if all pass.
+    """
+    storage = open_storage(backend, DB_FILE if backend == 'sqlite' else None)
+    checks = [(f"{backend} storage at {storage.path}", storage.exists())]
+    if backend == 'shards':
+        checks.append((f"at most {MAX_SHARDS} shards to attach", len(list_shards(storage.path)) <= MAX_SHARDS))
+    for package in REQUIRED_PACKAGES + BACKEND_PACKAGES.get(backend, []):
+        checks.append((f"package {package}", importlib.util.find_spec(package) is not None))
+    checks.append((f"output directory {DASHBOARD_DIR}", _writable(DASHBOARD_DIR)))
+    if cache:
+        checks.append((f"cache directory {os.path.dirname(CACHE_FILE)}", _writable(os.path.dirname(CACHE_FILE))))
+    for label, ok in checks:
+        print(f"{'ok' if ok else 'FAILED':<8} {label}")
+    for package in OPTIONAL_PACKAGES:
+        if importlib.util.find_spec(package) is None:
+            print(f"{'-':<8} optional package {package} not installed")
+    return all(ok for _, ok in checks)
+
+def main(argv=None):
+    """Command-line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(description="Generate the sales analytics dashboard.")
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlite',
+                        help="Storage to read from (parquet needs pyarrow)")
+    parser.add_argument('--no-cache', action='store_true', help="Always query the storage, bypassing the result cache")
+    parser.add_argument('--cache-size-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 ** 2,
+                        help="Size bound of the on-disk result cache")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Render figures on a pool of this many workers (0 renders them in-process)")
+    parser.add_argument('--pool', choices=['thread', 'process'], default='process',
+                        help="Worker pool type used with --workers")
+    parser.add_argument('--offline', action='store_true',
+                        help="Load plotly.js from a shared local asset instead of the CDN and write compact chart JSON")
+    parser.add_argument('--precompress', action='store_true',
+                        help="Also write .gz (and .br, with the brotli package) copies of the output")
+    parser.add_argument('--approximate', action='store_true',
+                        help="Show distinct order / product counts from the sketches built by load_to_sql.py --sketches")
+    parser.add_argument('--check', action='store_true',
+                        help="Check the storage, packages and output directory, then exit without building")
+    add_tracing_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.check:
+        return 0 if check_environment(args.backend, cache=not args.no_cache) else 1
+    tracing_from_args(args)
+
+    cache = None if args.no_cache else QueryCache(max_bytes=int(args.cache_size_mb * 1024 ** 2))
+    executor = None
+    if args.workers > 0:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        pool = ProcessPoolExecutor if args.pool == 'process' else ThreadPoolExecutor
+        executor = pool(max_workers=args.workers)
+    try:
+        with trace('create_comprehensive_dashboard'):
+            built = create_comprehensive_dashboard(backend=args.backend, cache=cache, executor=executor,
+                                                   offline=args.offline, precompress=args.precompress,
+                                                   approximate=args.approximate)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.report()
+            cache.close()
+        stop_tracing(args.trace_json)
+    return 0 if built else 1
 
 if __name__ == "__main__":
-    create_comprehensive_dashboard()
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+SYNTHETIC_DIR = os.path.join(DATA_DIR, 'synthetic')
+
+# Rows in the real Amazon export; --scale multiplies this
+BASE_ROWS = 128_975
+
+# Orders generated (and written) per chunk; memory stays flat whatever the scale
+CHUNK_ORDERS = 250_000
+
+DEFAULT_SEED = 42
+
+# Columns of cleaned_data.csv, as written by clean_data.py
+CLEANED_COLUMNS = [
+    'index', 'order_id', 'date', 'status', 'fulfilment', 'sales_channel', 'ship-service-level', 'style', 'sku',
+    'category', 'size', 'asin', 'courier_status', 'qty', 'currency', 'amount', 'ship-city', 'ship-state',
+    'ship-postal-code', 'ship-country', 'promotion-ids', 'b2b',
+]
+
+# Value distributions, as row counts in the real export (normalized to probabilities).
+# Values are spelled as in the raw export; the cleaned format title-cases them like clean_data.py.
+CATEGORY_ROWS = {
+    'Set': 50_284, 'kurta': 49_877, 'Western Dress': 15_500, 'Top': 10_622, 'Ethnic Dress': 1_159,
+    'Blouse': 926, 'Bottom': 440, 'Saree': 164, 'Dupatta': 3,
+}
+STATUS_ROWS = {
+    'Shipped': 77_804, 'Shipped - Delivered to Buyer': 28_769, 'Cancelled': 18_332,
+    'Shipped - Returned to Seller': 1_953, 'Shipped - Picked Up': 973, 'Pending': 658,
+    'Pending - Waiting for Pick Up': 281, 'Shipped - Returning to Seller': 145, 'Shipped - Out for Delivery': 35,
+    'Shipped - Rejected by Buyer': 11, 'Shipping': 8, 'Shipped - Lost in Transit': 5, 'Shipped - Damaged': 1,
+}
+STATE_ROWS = {
+    'MAHARASHTRA': 22_260, 'KARNATAKA': 17_326, 'TAMIL NADU': 11_483, 'TELANGANA': 11_330,
+    'UTTAR PRADESH': 10_638, 'DELHI': 6_782, 'KERALA': 6_585, 'WEST BENGAL': 5_963, 'ANDHRA PRADESH': 5_430,
+    'GUJARAT': 4_489, 'HARYANA': 4_415, 'RAJASTHAN': 2_705, 'MADHYA PRADESH': 2_274, 'ODISHA': 2_131,
+    'BIHAR': 2_111, 'PUNJAB': 1_943, 'ASSAM': 1_630, 'UTTARAKHAND': 1_422, 'JHARKHAND': 1_391, 'GOA': 1_075,
+    'CHHATTISGARH': 925, 'HIMACHAL PRADESH': 695, 'JAMMU & KASHMIR': 645, 'PUDUCHERRY': 330, 'CHANDIGARH': 313,
+    'MANIPUR': 227, 'MEGHALAYA': 183, 'NAGALAND': 149, 'TRIPURA': 143, 'SIKKIM': 110, 'ARUNACHAL PRADESH': 106,
+    'MIZORAM': 74, 'LADAKH': 45,
+}
+SIZE_ROWS = {
+    'M': 22_711, 'L': 22_132, 'XL': 20_876, 'XXL': 18_096, 'S': 17_090, '3XL': 14_816, 'XS': 11_161,
+    '6XL': 738, '5XL': 550, '4XL': 427, 'Free': 378,
+}
+CHANNEL_ROWS = {'Amazon.in': 128_851, 'Non-Amazon': 124}
+FULFILMENT_ROWS = {'Amazon': 89_698, 'Merchant': 39_277}
+PROMOTIONS = [
+    'Amazon PLCC Free-Financing Universal Merchant AAT-WNKTBO3K27EJC',
+    'IN Core Free Shipping 2015/04/08 23-48-5-108',
+    'VPC-44571-64609357-1',
+]
+LINES_PER_ORDER = {1: 0.95, 2: 0.035, 3: 0.01, 4: 0.005}
+
+# Median line price (INR) per category; prices are log-normal around it
+CATEGORY_PRICE = {
+    'Set': 800, 'kurta': 450, 'Western Dress': 760, 'Top': 530, 'Ethnic Dress': 720,
+    'Blouse': 520, 'Bottom': 360, 'Saree': 800, 'Dupatta': 300,
+}
+PRICE_SIGMA = 0.35
+
+# Share of orders per month in the export (it covers 31 March to 29 June 2022)
+FIRST_DATE = '2022-03-31'
+LAST_DATE = '2022-06-29'
+MONTH_SHARE = {3: 0.0013, 4: 0.38, 5: 0.33, 6: 0.2887}
+
+STYLES = 1_400
+SIZES_PER_STYLE = 5
+CITIES_PER_STATE = 60
+
+# Rates of the gaps and repeats the cleaning step has to handle
+CANCELLED_AMOUNT_MISSING = 0.4
+CITY_MISSING = 0.0003
+PROMOTION_MISSING = 0.38
+B2B_RATE = 0.007
+DUPLICATE_RATE = 0.0001
+# 'fulfilled-by' is only set on merchant orders and 'Unnamed: 22' is mostly empty, so
+# clean_data.py drops both (as in cleaned_data.csv)
+UNNAMED_MISSING = 0.6
+
+def _probabilities(counts):
+    values = np.array(list(counts.values()), dtype=float)
+    return np.array(list(counts), dtype=object), values / values.sum()
+
+class Catalog:
+    """Products, places and dates shared by every chunk, built once from the seed."""
+
+    def __init__(self, rng):
+        categories, category_p = _probabilities(CATEGORY_ROWS)
+        sizes, size_p = _probabilities(SIZE_ROWS)
+        self.categories = categories
+
+        # Styles belong to one category and come in a few sizes; each size is a SKU
+        style_category = rng.choice(len(categories), STYLES, p=category_p)
+        style_category[:len(categories)] = np.arange(len(categories))
+        sku_style, sku_size = [], []
+        for style in range(STYLES):
+            for size in rng.choice(len(sizes), SIZES_PER_STYLE, replace=False, p=size_p):
+                sku_style.append(style)
+                sku_size.append(size)
+        sku_style = np.array(sku_style)
+        sku_size = np.array(sku_size)
+        style_names = np.array([f"{categories[c][:3].upper()}{1000 + s}" for s, c in enumerate(style_category)],
+                               dtype=object)
+        self.sku_style = style_names[sku_style]
+        self.sku_name = np.array([f"{style}-KR-{sizes[size]}" for style, size in zip(self.sku_style, sku_size)],
+                                 dtype=object)
+        self.sku_size = sizes[sku_size]
+        asins = rng.choice(16 ** 8, len(sku_style), replace=False)
+        self.sku_asin = np.array([f"B0{n:08X}" for n in asins], dtype=object)
+        self.sku_category = style_category[sku_style]
+
+        # Skewed (Zipf-like) popularity of the SKUs within each category
+        self.category_p = category_p
+        self.category_skus = []
+        for c in range(len(categories)):
+            skus = rng.permutation(np.flatnonzero(self.sku_category == c))
+            weights = 1.0 / np.arange(1, len(skus) + 1) ** 0.8
+            self.category_skus.append((skus, weights / weights.sum()))
+
+        # Every state has a pool of cities with their own postal codes
+        self.states, self.state_p = _probabilities(STATE_ROWS)
+        self.city_names = np.array(
+            [f"{state.title()} City {n + 1}" for state in self.states for n in range(CITIES_PER_STATE)], dtype=object
+        )
+        self.city_postal = rng.integers(110_000, 855_000, len(self.city_names)).astype(float)
+        city_weights = 1.0 / np.arange(1, CITIES_PER_STATE + 1)
+        self.city_p = city_weights / city_weights.sum()
+
+        dates = pd.date_range(FIRST_DATE, LAST_DATE)
+        weights = np.array([MONTH_SHARE[d.month] / (dates.month == d.month).sum() for d in dates])
+        self.dates_iso = np.array(dates.strftime('%Y-%m-%d'), dtype=object)
+        self.dates_raw = np.array(dates.strftime('%m-%d-%y'), dtype=object)
+        self.date_p = weights / weights.sum()
+
+        self.statuses, self.status_p = _probabilities(STATUS_ROWS)
+        self.channels, self.channel_p = _probabilities(CHANNEL_ROWS)
+        self.fulfilments, self.fulfilment_p = _probabilities(FULFILMENT_ROWS)
+        self.category_price = np.array([CATEGORY_PRICE[c] for c in categories], dtype=float)
+
+def _order_ids(order_numbers):
+    """Unique ids in the export's 3-7-7 digit shape, e.g. 405-8078784-5731545."""
+    numbers = pd.Series(order_numbers)
+    middle = (numbers * 2_654_435_761 % 10 ** 7).astype(str).str.zfill(7)
+    return ((numbers % 9 + 400).astype(str) + '-' + middle + '-' + (numbers // 9).astype(str).str.zfill(7)).to_numpy()
+
+def generate_chunk(catalog, rng, first_order, n_orders, first_index, raw=True):
+    """One chunk of sales rows for orders first_order .. first_order + n_orders - 1."""
+    # Order-level attributes
+    lines_values = np.array(list(LINES_PER_ORDER))
+    lines = rng.choice(lines_values, n_orders, p=list(LINES_PER_ORDER.values()))
+    order_date = rng.choice(len(catalog.dates_iso), n_orders, p=catalog.date_p)
+    order_state = rng.choice(len(catalog.states), n_orders, p=catalog.state_p)
+    order_city = order_state * CITIES_PER_STATE + rng.choice(CITIES_PER_STATE, n_orders, p=catalog.city_p)
+    order_status = rng.choice(len(catalog.statuses), n_orders, p=catalog.status_p)
+    order_channel = rng.choice(len(catalog.channels), n_orders, p=catalog.channel_p)
+    order_fulfilment = rng.choice(len(catalog.fulfilments), n_orders, p=catalog.fulfilment_p)
+    order_b2b = rng.random(n_orders) < B2B_RATE
+    order_promotion = rng.integers(0, len(PROMOTIONS), n_orders)
+    order_promotion_missing = rng.random(n_orders) < PROMOTION_MISSING
+    order_ids = _order_ids(np.arange(first_order, first_order + n_orders))
+
+    # Expand to one row per order line
+    order = np.repeat(np.arange(n_orders), lines)
+    n = len(order)
+    category = rng.choice(len(catalog.categories), n, p=catalog.category_p)
+    sku = np.empty(n, dtype=np.int64)
+    for c, (skus, p) in enumerate(catalog.category_skus):
+        rows = np.flatnonzero(category == c)
+        sku[rows] = rng.choice(skus, len(rows), p=p)
+
+    status = catalog.statuses[order_status[order]]
+    cancelled = order_status[order] == list(STATUS_ROWS).index('Cancelled')
+    pending = pd.Series(status).str.startswith('Pending').to_numpy()
+    qty = np.where(rng.random(n) < 0.995, 1, rng.integers(2, 5, n))
+    qty = np.where(cancelled & (rng.random(n) < 0.7), 0, qty)
+    price = catalog.category_price[category] * np.exp(rng.normal(0.0, PRICE_SIGMA, n))
+    amount = np.round(price * np.maximum(qty, 1), 0)
+    amount[cancelled & (rng.random(n) < CANCELLED_AMOUNT_MISSING)] = np.nan
+    courier = np.where(cancelled, 'Cancelled', np.where(pending, 'Unshipped', 'Shipped')).astype(object)
+    fulfilment = catalog.fulfilments[order_fulfilment[order]]
+    service_level = np.where((fulfilment == 'Amazon') ^ (rng.random(n) < 0.05), 'Expedited', 'Standard')
+    city = catalog.city_names[order_city[order]]
+    city[rng.random(n) < CITY_MISSING] = None
+    promotion = np.array(PROMOTIONS, dtype=object)[order_promotion[order]]
+    promotion[order_promotion_missing[order]] = None
+
+    frame = pd.DataFrame({
+        'index': np.arange(first_index, first_index + n),
+        'Order ID': order_ids[order],
+        'Date': (catalog.dates_raw if raw else catalog.dates_iso)[order_date[order]],
+        'Status': status,
+        'Fulfilment': fulfilment,
+        'Sales Channel ': catalog.channels[order_channel[order]],
+        'ship-service-level': service_level,
+        'Style': catalog.sku_style[sku],
+        'SKU': catalog.sku_name[sku],
+        'Category': catalog.categories[category],
+        'Size': catalog.sku_size[sku],
+        'ASIN': catalog.sku_asin[sku],
+        'Courier Status': courier,
+        'Qty': qty,
+        'currency': np.where(np.isnan(amount), None, 'INR'),
+        'Amount': amount,
+        'ship-city': city,
+        'ship-state': catalog.states[order_state[order]],
+        'ship-postal-code': catalog.city_postal[order_city[order]],
+        'ship-country': 'IN',
+        'promotion-ids': promotion,
+        'B2B': order_b2b[order],
+        'fulfilled-by': np.where(fulfilment == 'Merchant', 'Easy Ship', None),
+        'Unnamed: 22': np.where(rng.random(n) < UNNAMED_MISSING, None, False),
+    })
+
+    if raw:
+        # A few exact repeats for the dedupe step
+        repeats = frame.sample(frac=DUPLICATE_RATE, random_state=rng.integers(2 ** 31))
+        return pd.concat([frame, repeats], ignore_index=True)
+
+    frame = frame.drop(columns=['fulfilled-by', 'Unnamed: 22'])
+    frame.columns = CLEANED_COLUMNS
+    for col in ['order_id', 'status', 'fulfilment', 'sales_channel', 'ship-service-level', 'style', 'sku',
+                'category', 'size', 'asin', 'courier_status', 'currency', 'ship-city', 'ship-state', 'ship-country',
+                'promotion-ids']:
+        frame[col] = frame[col].fillna('Unknown').str.strip().str.title()
+    frame['amount'] = frame['amount'].fillna(0)
+    return frame
+
+def generate(output_file, rows=BASE_ROWS, raw=True, seed=DEFAULT_SEED, chunk_orders=CHUNK_ORDERS):
+    """
+    Write about `rows` synthetic sales rows to `output_file`, in the raw export's
+    format (input of clean_data.py) or in cleaned_data.csv's (input of load_to_sql.py).
+
+    Output is deterministic for a given seed and row count. Returns the rows written.
+    """
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    catalog = Catalog(np.random.default_rng(seed))
+    mean_lines = sum(k * p for k, p in LINES_PER_ORDER.items())
+    total_orders = max(1, int(round(rows / mean_lines)))
+
+    written = 0
+    for number, first_order in enumerate(range(0, total_orders, chunk_orders)):
+        rng = np.random.default_rng([seed, number])
+        chunk = generate_chunk(catalog, rng, first_order, min(chunk_orders, total_orders - first_order), written, raw)
+        chunk.to_csv(output_file, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+        written += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written:,} {'raw' if raw else 'cleaned'} rows ({total_orders:,} orders) to {output_file} "
+          f"in {elapsed:.1f}s ({os.path.getsize(output_file) / 1024 ** 2:,.0f} MB)")
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Amazon sales data at any scale.")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help=f"Multiple of the real export's {BASE_ROWS:,} rows (e.g. 10, 100, 1000)")
+    parser.add_argument('--rows', type=int, default=None, help="Approximate row count (overrides --scale)")
+    parser.add_argument('--format', choices=['raw', 'cleaned'], default='raw',
+                        help="raw: input of clean_data.py; cleaned: input of load_to_sql.py")
+    parser.add_argument('--output', default=None, help="CSV to write (default: data/synthetic/<format>_x<scale>.csv)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Random seed (output is deterministic)")
+    args = parser.parse_args()
+
+    rows = args.rows or int(BASE_ROWS * args.scale)
+    output = args.output or os.path.join(SYNTHETIC_DIR, f"{args.format}_x{args.scale:g}.csv")
+    generate(output, rows, raw=args.format == 'raw', seed=args.seed)
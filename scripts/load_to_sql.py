@@ -1,6 +1,19 @@
 import pandas as pd
 import sqlite3
 import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+from schema import (
+    CSV_DTYPES, create_sales_table, create_sales_indexes, normalize_dates, add_order_state, sales_table_is_current,
+)
+from summary_tables import CUBE_TABLE, SKU_TABLE, SummaryBuilder, refresh_summary_tables, summary_tables_exist
+from sketch_tables import SKETCH_TABLE, refresh_sketches, sketch_tables_exist
+from anomaly_monitor import DEFAULT_THRESHOLD, AnomalyMonitor, monitor_tables_exist, write_alerts
+from snapshots import connect, discard_shadow, open_shadow, swap_in
+from storage import BACKENDS, MAX_SHARDS, PARQUET_DIR, SHARD_DIR, ParquetStorage
+from tracing import add_tracing_arguments, stop_tracing, trace, traced_chunks, tracing_from_args
 
 # Define paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -10,9 +23,366 @@ SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
 CSV_FILE = os.path.join(DATA_DIR, 'cleaned_data.csv')
 DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
 
-def load_data():
-    """Loads cleaned data from CSV to SQLite database."""
-    
+# Rows read per CSV chunk; peak memory scales with this, not with the file size
+CHUNK_SIZE = 100_000
+
+# Rows are identified by (order_id, sku, date) for incremental loads
+KEY_COLUMNS = ['order_id', 'sku', 'date']
+
+# Bookkeeping tables maintained next to `sales`
+ROW_HASH_TABLE = 'load_row_hashes'
+WATERMARK_TABLE = 'load_watermark'
+
+# Tables a full load rebuilds; the shadow database starts with a copy of every other table
+REBUILT_TABLES = ['sales', ROW_HASH_TABLE, CUBE_TABLE, SKU_TABLE, SKETCH_TABLE]
+
+# Connection settings for the duration of an incremental load: WAL so readers are not blocked,
+# relaxed fsync while writing, large page cache and in-memory temp tables
+BULK_LOAD_PRAGMAS = [
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'OFF'),
+    ('cache_size', -262144),
+    ('temp_store', 'MEMORY'),
+]
+
+def _wrapping_add(a, b):
+    """Add two signed 64-bit hashes with wrap-around, matching NumPy's int64 sum."""
+    return (a + b + 2**63) % 2**64 - 2**63
+
+def read_csv_chunks(path=None, chunksize=CHUNK_SIZE):
+    """Stream the cleaned CSV as DataFrame chunks with explicit dtypes, ISO dates and derived order state."""
+    reader = pd.read_csv(path or CSV_FILE, dtype=CSV_DTYPES, chunksize=chunksize)
+    return (add_order_state(normalize_dates(chunk)) for chunk in reader)
+
+def apply_bulk_load_profile(conn):
+    """Switch the connection to the bulk-load settings (must run outside a transaction)."""
+    for pragma, value in BULK_LOAD_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+def restore_durable_profile(conn):
+    """Return to durable writes once the load has committed (WAL stays on)."""
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+def _key_hashes(df):
+    """
+    Fingerprint every (order_id, sku, date) key in the frame.
+
+    Returns one row per key with a key hash, the key's date and a content hash
+    combining all source rows sharing that key, so duplicate rows are kept.
+    """
+    key_hash = pd.util.hash_pandas_object(df[KEY_COLUMNS], index=False).to_numpy()
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    keys = pd.DataFrame({
+        'key_hash': key_hash.view('int64'),
+        'date': df['date'].astype(str).to_numpy(),
+        'row_hash': row_hash.view('int64'),
+    })
+    # Sum wraps around in 64 bits, which makes it order-independent across duplicates
+    return keys.groupby('key_hash', sort=False).agg(date=('date', 'first'), row_hash=('row_hash', 'sum')).reset_index()
+
+def _ensure_load_state(conn, row_hashes=True):
+    """Create the watermark table, and the row-hash table if `row_hashes`, if they do not exist yet."""
+    if row_hashes:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ROW_HASH_TABLE} (
+                key_hash INTEGER PRIMARY KEY,
+                date TEXT,
+                row_hash INTEGER NOT NULL
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{ROW_HASH_TABLE}_date ON {ROW_HASH_TABLE}(date)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            load_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            loaded_at TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            source_file TEXT,
+            max_date TEXT,
+            rows_read INTEGER,
+            rows_written INTEGER
+        )
+    """)
+
+def _accumulate_key_hashes(conn, table, keys):
+    """Upsert per-chunk key hashes, combining keys that span several chunks."""
+    conn.executemany(
+        f"INSERT INTO {table} (key_hash, date, row_hash) VALUES (?, ?, ?) "
+        "ON CONFLICT(key_hash) DO UPDATE SET row_hash = wrapping_add(row_hash, excluded.row_hash)",
+        _rows(keys[['key_hash', 'date', 'row_hash']]),
+    )
+
+def _record_watermark(conn, mode, max_date, rows_read, rows_written):
+    """Append one row to the load watermark table."""
+    conn.execute(
+        f"INSERT INTO {WATERMARK_TABLE} (loaded_at, mode, source_file, max_date, rows_read, rows_written) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (datetime.now().isoformat(timespec='seconds'), mode, CSV_FILE, max_date, rows_read, rows_written),
+    )
+
+def get_watermark(conn):
+    """Return the highest order date loaded so far, or None if nothing was loaded."""
+    try:
+        row = conn.execute(f"SELECT MAX(max_date) FROM {WATERMARK_TABLE}").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0]
+
+def _table_exists(conn, table):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+def _column_values(series):
+    """Plain Python values for one column, with missing values as None for sqlite3."""
+    if series.hasnans:
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.tolist()
+
+def _rows(df):
+    """Yield a chunk's rows as plain Python tuples (column-wise tolist() is far cheaper than itertuples)."""
+    return zip(*(_column_values(df[col]) for col in df.columns))
+
+def _insert_rows(conn, df):
+    """Append a chunk to `sales` with one batched executemany."""
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    placeholders = ', '.join('?' for _ in df.columns)
+    with trace('sqlite insert', rows=len(df)):
+        conn.executemany(f"INSERT INTO sales ({columns}) VALUES ({placeholders})", _rows(df))
+
+def _max_date(current, df):
+    if df.empty:
+        return current
+    chunk_max = df['date'].astype(str).max()
+    return chunk_max if current is None else max(current, chunk_max)
+
+def _full_load(conn, chunks, sketches=False, row_hashes=True):
+    """
+    Replace `sales` with the streamed rows and rebuild the load state.
+
+    The row hashes and indexes only incremental loads use are built only when
+    `row_hashes` is set; without them the next incremental load
+    falls back to a full load, which builds them.
+    """
+    conn.execute("DROP TABLE IF EXISTS sales")
+    conn.execute(f"DROP TABLE IF EXISTS {ROW_HASH_TABLE}")
+    _ensure_load_state(conn, row_hashes)
+
+    rows_read = 0
+    max_date = None
+    key_hashes = []
+    summaries = SummaryBuilder()
+    for chunk in chunks:
+        if rows_read == 0:
+            create_sales_table(conn, chunk.columns)
+        _insert_rows(conn, chunk)
+        summaries.observe(chunk)
+        if row_hashes:
+            with trace('key hashes', rows=len(chunk)):
+                key_hashes.append(_key_hashes(chunk))
+        rows_read += len(chunk)
+        max_date = _max_date(max_date, chunk)
+
+    if rows_read == 0:
+        create_sales_table(conn, add_order_state(pd.read_csv(CSV_FILE, dtype=CSV_DTYPES, nrows=0)).columns)
+    if key_hashes:
+        with trace('key hashes'):
+            # Keys spanning chunks are combined once, the same way _key_hashes combines duplicate rows
+            keys = pd.concat(key_hashes, ignore_index=True).groupby('key_hash', sort=False).agg(
+                date=('date', 'first'), row_hash=('row_hash', 'sum')).reset_index()
+            conn.executemany(f"INSERT INTO {ROW_HASH_TABLE} (key_hash, date, row_hash) VALUES (?, ?, ?)",
+                             _rows(keys[['key_hash', 'date', 'row_hash']]))
+
+    # Indexes are built once over the loaded table instead of being maintained per insert
+    with trace('index build'):
+        create_sales_indexes(conn, incremental=row_hashes)
+    with trace('summary refresh'):
+        summaries.finish(conn)
+    if sketches or sketch_tables_exist(conn):
+        with trace('sketch refresh'):
+            refresh_sketches(conn)
+    _record_watermark(conn, 'replace', max_date, rows_read, rows_read)
+    return rows_read, rows_read
+
+def _reread_keys(chunks, keys, cutoff, delta):
+    """Replace the rows of `keys` in `delta` with all of their rows from a second pass over `chunks`."""
+    keys = set(keys)
+    parts = [] if delta is None else [delta[~delta['_key_hash'].isin(keys)]]
+    for chunk in chunks:
+        if cutoff is not None:
+            chunk = chunk[chunk['date'].astype(str) >= cutoff]
+        row_keys = pd.util.hash_pandas_object(chunk[KEY_COLUMNS], index=False).to_numpy().view('int64')
+        wanted = pd.Series(row_keys).isin(keys).to_numpy()
+        if wanted.any():
+            parts.append(chunk[wanted].assign(_key_hash=row_keys[wanted]))
+    return pd.concat(parts)
+
+def _incremental_load(conn, chunks, lookback_days=None, sketches=False, reread=None):
+    """
+    Upsert only the rows whose (order_id, sku, date) key is new or whose content changed.
+
+    Each chunk's key hashes are compared with `load_row_hashes`; only rows that may
+    have changed are held in memory, so memory tracks the size of the delta. When
+    `lookback_days` is set, rows dated before (watermark - lookback_days) are
+    treated as settled history and skipped without being compared.
+
+    A key's rows can span several chunks, and a chunk whose part of a key matched
+    the stored hash was skipped. If such a key turns out to have changed once
+    every chunk is read, `reread()` (a fresh iterator over the same chunks)
+    is used to collect all of its rows in a second pass.
+    """
+    _ensure_load_state(conn)
+
+    watermark = get_watermark(conn)
+    cutoff = None
+    if lookback_days is not None and watermark:
+        cutoff = (datetime.fromisoformat(watermark[:10]) - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS load_incoming (key_hash INTEGER PRIMARY KEY, date TEXT, row_hash INTEGER)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS load_chunk_keys (key_hash INTEGER PRIMARY KEY, row_hash INTEGER)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS load_pruned_keys (key_hash INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM load_incoming")
+    conn.execute("DELETE FROM load_pruned_keys")
+
+    rows_read = 0
+    max_date = None
+    candidates = []
+    for chunk in chunks:
+        if cutoff is not None:
+            chunk = chunk[chunk['date'].astype(str) >= cutoff]
+        if chunk.empty:
+            continue
+        rows_read += len(chunk)
+        max_date = _max_date(max_date, chunk)
+
+        with trace('key hashes', rows=len(chunk)):
+            keys = _key_hashes(chunk)
+            _accumulate_key_hashes(conn, 'load_incoming', keys)
+
+        # Keys whose chunk-level hash already matches are unchanged; keep the rest as candidates
+        conn.execute("DELETE FROM load_chunk_keys")
+        conn.executemany(
+            "INSERT INTO load_chunk_keys VALUES (?, ?)",
+            _rows(keys[['key_hash', 'row_hash']]),
+        )
+        unchanged = pd.read_sql_query(f"""
+            SELECT c.key_hash FROM load_chunk_keys c
+            JOIN {ROW_HASH_TABLE} k ON k.key_hash = c.key_hash AND k.row_hash = c.row_hash
+        """, conn)['key_hash']
+        # Remember what was skipped, in case the key's other chunks change it after all
+        conn.executemany("INSERT OR IGNORE INTO load_pruned_keys VALUES (?)", ((int(key),) for key in unchanged))
+        row_keys = pd.util.hash_pandas_object(chunk[KEY_COLUMNS], index=False).to_numpy().view('int64')
+        maybe_changed = ~pd.Series(row_keys, index=chunk.index).isin(unchanged)
+        if maybe_changed.any():
+            candidates.append(chunk[maybe_changed.to_numpy()].assign(_key_hash=row_keys[maybe_changed.to_numpy()]))
+
+    # Compare the full per-key hashes now that keys spanning chunks are complete
+    changed = pd.read_sql_query(f"""
+        SELECT i.key_hash, i.date, i.row_hash FROM load_incoming i
+        LEFT JOIN {ROW_HASH_TABLE} k ON k.key_hash = i.key_hash
+        WHERE k.row_hash IS NULL OR k.row_hash != i.row_hash
+    """, conn)
+
+    if changed.empty:
+        if not summary_tables_exist(conn):
+            refresh_summary_tables(conn)
+        if sketches and not sketch_tables_exist(conn):
+            refresh_sketches(conn)
+        _record_watermark(conn, 'incremental', max_date, rows_read, 0)
+        return rows_read, 0
+
+    delta = pd.concat(candidates) if candidates else None
+    incomplete = pd.read_sql_query(f"""
+        SELECT p.key_hash FROM load_pruned_keys p
+        JOIN load_incoming i ON i.key_hash = p.key_hash
+        LEFT JOIN {ROW_HASH_TABLE} k ON k.key_hash = p.key_hash
+        WHERE k.row_hash IS NULL OR k.row_hash != i.row_hash
+    """, conn)['key_hash']
+    if not incomplete.empty:
+        with trace('changed key reread'):
+            delta = _reread_keys(reread(), incomplete, cutoff, delta)
+    delta = delta[delta['_key_hash'].isin(changed['key_hash'])].drop(columns='_key_hash')
+
+    # Stage the changed keys, drop their old rows, then append the new versions
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS load_delta_keys (order_id TEXT, sku TEXT, date TEXT)")
+    conn.execute("DELETE FROM load_delta_keys")
+    conn.executemany(
+        "INSERT INTO load_delta_keys VALUES (?, ?, ?)",
+        _rows(delta[KEY_COLUMNS].drop_duplicates().astype(str)),
+    )
+    conn.execute("""
+        DELETE FROM sales
+        WHERE (order_id, sku, date) IN (SELECT order_id, sku, date FROM load_delta_keys)
+    """)
+    _insert_rows(conn, delta)
+
+    # Re-aggregate only the order dates this delta touched
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM load_delta_keys")]
+    with trace('summary refresh'):
+        refresh_summary_tables(conn, dates if summary_tables_exist(conn) else None)
+    if sketches or sketch_tables_exist(conn):
+        with trace('sketch refresh'):
+            refresh_sketches(conn, dates if sketch_tables_exist(conn) else None)
+
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {ROW_HASH_TABLE} (key_hash, date, row_hash) VALUES (?, ?, ?)",
+        _rows(changed[['key_hash', 'date', 'row_hash']]),
+    )
+    _record_watermark(conn, 'incremental', max_date, rows_read, len(delta))
+    return rows_read, len(delta)
+
+def load_parquet(chunksize=CHUNK_SIZE):
+    """Write the cleaned CSV to the month-partitioned Parquet dataset instead of SQLite."""
+    print(f"Writing Parquet dataset to {PARQUET_DIR}...")
+    try:
+        start = time.perf_counter()
+        rows = ParquetStorage(PARQUET_DIR).write(read_csv_chunks(CSV_FILE, chunksize))
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"Error writing Parquet dataset: {e}")
+        return
+
+    print(f"Success! Wrote {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec).")
+
+def load_sharded(chunksize=CHUNK_SIZE, workers=1, shard_by='quarter'):
+    """Rebuild the per-quarter (or per-month) shard databases on a process pool."""
+    from parallel_load import load_shards
+
+    print(f"Writing {shard_by} shards to {SHARD_DIR} with {workers} workers...")
+    try:
+        start = time.perf_counter()
+        with trace('shard load'):
+            counts = load_shards(CSV_FILE, SHARD_DIR, workers, chunksize, shard_by)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"Error writing shards: {e}")
+        return
+
+    rows = sum(counts.values())
+    print(f"Success! Loaded {rows:,} rows into {len(counts)} shards in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec).")
+
+def load_data(incremental=False, lookback_days=None, chunksize=CHUNK_SIZE, backend='sqlite', sketches=False,
+              workers=1, shard_by='quarter', monitor=False, alert_threshold=DEFAULT_THRESHOLD, max_cancel_rate=None):
+    """
+    Loads cleaned data from CSV to SQLite database.
+
+    The CSV is streamed in `chunksize`-row chunks and written inside a single
+    transaction. By default the database is rebuilt in a shadow file and
+    swapped in when complete, so readers see either the old or the new data. With `incremental=True`,
+    only new or changed (order_id, sku, date) rows are upserted and the load
+    watermark is advanced. `backend='parquet'` writes the columnar dataset instead.
+    `sketches=True` also builds the per-day approximate-count sketches (see
+    sketch_tables.py); once built, later loads keep them up to date.
+
+    With `workers` > 1 the CSV is parsed on a process pool (see parallel_load.py)
+    and written by this single writer. `backend='shards'` instead rebuilds one
+    database per `shard_by` period ('quarter' or 'month') under sql/shards/,
+    written in parallel by the workers.
+
+    `monitor=True` scores each newly loaded day for anomalies as the rows stream
+    in (see anomaly_monitor.py) and appends alerts to monitoring/alerts.jsonl;
+    once enabled, later loads keep monitoring.
+    """
+
     # Check if CSV exists
     if not os.path.exists(CSV_FILE):
         print(f"Error: CSV file not found at {CSV_FILE}")
@@ -23,31 +393,142 @@ def load_data():
         print(f"Creating SQL directory at {SQL_DIR}")
         os.makedirs(SQL_DIR)
 
-    print(f"Loading data from {CSV_FILE}...")
-    try:
-        df = pd.read_csv(CSV_FILE)
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
+    print(f"Loading data from {CSV_FILE} in chunks of {chunksize:,} rows...")
+    if monitor and backend != 'sqlite':
+        print("Anomaly monitoring is SQLite-only; loading without it.")
+    if backend == 'parquet':
+        if incremental:
+            print("Incremental loads are SQLite-only; rewriting the Parquet dataset.")
+        load_parquet(chunksize)
+        return
+
+    if backend == 'shards':
+        if incremental:
+            print("Shards carry no incremental load state; rebuilding them.")
+        load_sharded(chunksize, workers, shard_by)
         return
 
     print(f"Connecting to database at {DB_FILE}...")
     try:
-        conn = sqlite3.connect(DB_FILE)
-        
-        # Write to SQL
-        df.to_sql('sales', conn, if_exists='replace', index=False)
-        
+        conn = connect(DB_FILE)
+        conn.isolation_level = None
+        start = time.perf_counter()
+
+        full_load = not (incremental and sales_table_is_current(conn) and _table_exists(conn, ROW_HASH_TABLE))
+        if incremental and full_load:
+            print("No current load state found; running a full load instead.")
+        if full_load:
+            # Rebuilt in a shadow database and swapped in once complete, so readers
+            # of the live database never see a partly loaded table (see snapshots.py)
+            sketches = sketches or sketch_tables_exist(conn)
+            # Row hashes are kept once incremental loads are in use
+            row_hashes = incremental or _table_exists(conn, ROW_HASH_TABLE)
+            conn.close()
+            conn = open_shadow(DB_FILE, REBUILT_TABLES)
+        else:
+            apply_bulk_load_profile(conn)
+        conn.create_function('wrapping_add', 2, _wrapping_add, deterministic=True)
+
+        # Write to SQL in one explicit transaction covering DDL and every chunk
+        # (incremental falls back to a full load on an empty database)
+        if workers > 1:
+            from parallel_load import parallel_chunks
+            chunks = traced_chunks(parallel_chunks(CSV_FILE, workers, chunksize), 'csv parse')
+        else:
+            chunks = traced_chunks(read_csv_chunks(CSV_FILE, chunksize), 'csv parse')
+        # An incremental load takes the write lock up front rather than upgrading to it mid-way
+        conn.execute("BEGIN" if full_load else "BEGIN IMMEDIATE")
+        try:
+            anomaly_monitor = None
+            if monitor or monitor_tables_exist(conn):
+                anomaly_monitor = AnomalyMonitor(conn, alert_threshold, max_cancel_rate=max_cancel_rate)
+                chunks = anomaly_monitor.watch(chunks)
+            if full_load:
+                rows_read, written = _full_load(conn, chunks, sketches, row_hashes)
+            else:
+                rows_read, written = _incremental_load(conn, chunks, lookback_days, sketches,
+                                                       reread=lambda: read_csv_chunks(CSV_FILE, chunksize))
+                print(f"Incremental load: upserted {written} changed rows.")
+            alerts = []
+            if anomaly_monitor is not None:
+                with trace('anomaly scoring'):
+                    alerts = anomaly_monitor.finish()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            if full_load:
+                conn.close()
+                discard_shadow(DB_FILE)
+            raise
+
+        # Refresh planner statistics: full ANALYZE after a rebuild, incremental optimize otherwise.
+        # Sampled statistics make the two-valued is_cancelled index look selective, so no analysis_limit.
+        if full_load:
+            with trace('analyze'):
+                conn.execute("ANALYZE")
+            conn.close()
+            try:
+                with trace('swap in'):
+                    swap_seconds = swap_in(DB_FILE)
+            except Exception:
+                discard_shadow(DB_FILE)
+                raise
+            print(f"Swapped the rebuilt database in ({swap_seconds * 1000:.0f} ms).")
+            conn = connect(DB_FILE)
+        else:
+            restore_durable_profile(conn)
+            with trace('analyze'):
+                conn.execute("PRAGMA optimize")
+        elapsed = time.perf_counter() - start
+
+        # Alerts are written only once the load that raised them is visible to readers
+        if anomaly_monitor is not None:
+            write_alerts(alerts)
+            print(f"Monitor: {len(alerts)} new alerts (through {anomaly_monitor.last_date}); "
+                  f"see scripts/anomaly_monitor.py")
+
         # Verify
         cursor = conn.cursor()
         cursor.execute("SELECT count(*) FROM sales")
         rows = cursor.fetchone()[0]
-        
+
         print(f"Success! Loaded {rows} rows into table 'sales'.")
-        
+        print(f"Read {rows_read:,} rows, wrote {written:,} in {elapsed:.2f}s "
+              f"({rows_read / max(elapsed, 1e-9):,.0f} rows/sec).")
+
         conn.close()
-        
+
     except Exception as e:
-        print(f"Error checking database: {e}")
+        print(f"Error loading data: {e}")
 
 if __name__ == "__main__":
-    load_data()
+    parser = argparse.ArgumentParser(description="Load cleaned sales data into SQLite.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Upsert only new or changed (order_id, sku, date) rows")
+    parser.add_argument('--lookback-days', type=int, default=None,
+                        help="With --incremental, only compare rows dated within N days of the watermark")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help="Rows per CSV chunk (bounds peak memory)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parse the CSV on this many processes (the single writer keeps full/incremental loads)")
+    parser.add_argument('--shard-by', choices=['quarter', 'month'], default='quarter',
+                        help="With --backend shards, the period each shard database covers "
+                             f"(at most {MAX_SHARDS} shards, so months only fit under a year of data)")
+    parser.add_argument('--sketches', action='store_true',
+                        help="Also build the per-day sketches behind approximate distinct counts and top-K")
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlite',
+                        help="Storage to load into (parquet needs pyarrow; shards are written in parallel)")
+    parser.add_argument('--monitor', action='store_true',
+                        help="Score each newly loaded day for anomalies and append alerts to monitoring/alerts.jsonl")
+    parser.add_argument('--alert-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="With --monitor, flag days this many standard deviations from the recent baseline")
+    parser.add_argument('--max-cancel-rate', type=float, default=None,
+                        help="With --monitor, also flag days whose cancellation rate exceeds this (e.g. 0.3)")
+    add_tracing_arguments(parser)
+    args = parser.parse_args()
+    tracing_from_args(args)
+    with trace('load_data'):
+        load_data(incremental=args.incremental, lookback_days=args.lookback_days, chunksize=args.chunksize,
+                  backend=args.backend, sketches=args.sketches, workers=args.workers, shard_by=args.shard_by,
+                  monitor=args.monitor, alert_threshold=args.alert_threshold, max_cancel_rate=args.max_cancel_rate)
+    stop_tracing(args.trace_json)
@@ -0,0 +1,178 @@
+"""
+Parallel CSV loading for load_to_sql.py.
+
+The cleaned CSV is split into byte ranges that start and end on line
+boundaries; each range is parsed on a process pool. The cleaned export has no
+quoted fields spanning lines, so a line boundary is always a record boundary.
+
+Two ways to write the parsed rows:
+
+* parallel_chunks() feeds the parsed chunks, in file order, to the usual
+  single-writer load (full or incremental) in load_to_sql.py. Only parsing
+  runs in parallel.
+* load_shards() has every worker write its rows straight into per-quarter (or
+  per-month) shard databases, then builds each shard's indexes and summary
+  tables in parallel. storage.ShardedStorage queries the shards through
+  ATTACH and UNION ALL views. Shards are always rebuilt in full, in a staging
+  directory that replaces the live one once every shard is finished, and
+  carry no incremental load state.
+"""
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from load_to_sql import _insert_rows
+from schema import CSV_DTYPES, add_order_state, create_sales_indexes, create_sales_table, normalize_dates
+from storage import MAX_SHARDS, SHARD_DIR, list_shards, swap_dir
+from summary_tables import refresh_summary_tables
+
+# Byte ranges are at most this large, so a worker's parsed partition stays small
+PARTITION_BYTES = 32 * 1024 ** 2
+
+# Shard writers wait this long for another worker's write to the same shard
+SHARD_BUSY_TIMEOUT_MS = 600_000
+
+def byte_ranges(path, partitions):
+    """
+    Split the file after its header into about `partitions` (start, end) byte
+    ranges, each starting at the beginning of a line. Returns (header, ranges).
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        boundaries = [data_start]
+        for i in range(1, partitions):
+            f.seek(max(data_start + (size - data_start) * i // partitions - 1, boundaries[-1]))
+            f.readline()
+            boundaries.append(max(f.tell(), boundaries[-1]))
+        boundaries.append(size)
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return next(csv.reader([header.decode('utf-8')])), ranges
+
+def partition_count(path, workers):
+    """At least one range per worker, and no range larger than PARTITION_BYTES."""
+    return max(workers, -(-os.path.getsize(path) // PARTITION_BYTES))
+
+def read_partition(path, header, start, end, chunksize):
+    """Parse one byte range into prepared chunks (explicit dtypes, ISO dates, order state)."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    reader = pd.read_csv(io.BytesIO(data), names=header, header=None, dtype=CSV_DTYPES, chunksize=chunksize)
+    return [add_order_state(normalize_dates(chunk)) for chunk in reader]
+
+def parallel_chunks(path, workers, chunksize):
+    """
+    Yield the CSV's prepared chunks in file order while a process pool parses
+    ahead. At most `workers` + 1 partitions are parsed but not yet consumed.
+    """
+    header, ranges = byte_ranges(path, partition_count(path, workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for start, end in ranges:
+            pending.append(executor.submit(read_partition, path, header, start, end, chunksize))
+            if len(pending) > workers:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+def shard_key(dates, by='quarter'):
+    """Shard name of each ISO date: 'YYYY-MM' by month, 'YYYY-Qn' by quarter."""
+    dates = dates.fillna('unknown').astype(str)
+    if by == 'month':
+        return dates.str[:7]
+    months = pd.to_numeric(dates.str[5:7], errors='coerce')
+    quarters = ((months - 1) // 3 + 1).astype('Int64').astype(str)
+    return (dates.str[:4] + '-Q' + quarters).where(months.notna(), 'unknown')
+
+def shard_path(shard_dir, key):
+    return os.path.join(shard_dir, f"sales-{key}.db")
+
+def _write_to_shard(path, rows):
+    """Append rows to a shard, creating its table first; one short write transaction."""
+    conn = sqlite3.connect(path, timeout=SHARD_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        # IMMEDIATE takes the write lock up front, so two workers never race to create the table
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sales'").fetchone() is None:
+            create_sales_table(conn, rows.columns)
+        _insert_rows(conn, rows)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+def write_partition_to_shards(path, header, start, end, chunksize, shard_dir, by):
+    """Parse one byte range and append each shard's rows to its database; returns the rows written."""
+    rows = 0
+    for chunk in read_partition(path, header, start, end, chunksize):
+        for key, shard_rows in chunk.groupby(shard_key(chunk['date'], by).to_numpy(), sort=False):
+            _write_to_shard(shard_path(shard_dir, key), shard_rows)
+        rows += len(chunk)
+    return rows
+
+def finish_shard(path):
+    """Build a loaded shard's indexes, summary tables and planner statistics."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        create_sales_indexes(conn, incremental=False)
+        refresh_summary_tables(conn)
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        return conn.execute("SELECT count(*) FROM sales").fetchone()[0]
+    finally:
+        conn.close()
+
+def count_shards(path, by='quarter', chunksize=1_000_000):
+    """Distinct shard keys in the CSV, from one pass over its date column only."""
+    keys = set()
+    for chunk in pd.read_csv(path, usecols=['date'], dtype={'date': 'string'}, chunksize=chunksize):
+        keys.update(shard_key(normalize_dates(chunk)['date'], by).unique())
+    return len(keys)
+
+def load_shards(path, shard_dir=SHARD_DIR, workers=None, chunksize=100_000, by='quarter'):
+    """
+    Rebuild the shard databases from the CSV on `workers` processes.
+
+    The shard count is checked first, so a load that would exceed MAX_SHARDS
+    fails before anything is written. Workers parse byte ranges and write each
+    row to its shard in a staging directory (writes to one shard are
+    serialized by SQLite's lock, writes to different shards run in parallel);
+    then every shard is indexed and summarized in parallel and the staging
+    directory replaces `shard_dir`. Returns {shard name: rows}.
+    """
+    shard_count = count_shards(path, by)
+    if shard_count > MAX_SHARDS:
+        raise ValueError(f"{shard_count} {by} shards exceed SQLite's limit of {MAX_SHARDS} attached databases"
+                         + ("; shard by quarter instead" if by == 'month' else ""))
+
+    workers = workers or os.cpu_count()
+    staging_dir = shard_dir + '.staging'
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    try:
+        header, ranges = byte_ranges(path, partition_count(path, workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            start = time.perf_counter()
+            futures = [executor.submit(write_partition_to_shards, path, header, begin, end, chunksize, staging_dir, by)
+                       for begin, end in ranges]
+            rows = sum(future.result() for future in futures)
+            print(f"Parsed and wrote {rows:,} rows from {len(ranges)} partitions in {time.perf_counter() - start:.2f}s")
+
+            shards = list_shards(staging_dir)
+            start = time.perf_counter()
+            counts = dict(zip(map(os.path.basename, shards), executor.map(finish_shard, shards)))
+            print(f"Indexed and summarized {len(shards)} shards in {time.perf_counter() - start:.2f}s")
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    swap_dir(staging_dir, shard_dir)
+    return counts
@@ -0,0 +1,148 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from query_library import load_library
+from query_cache import QueryCache
+from storage import BACKENDS, open_storage
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+
+HISTORY_QUERY = 'monthly_history'
+
+# Segments the history query can group by (None = overall totals)
+GROUPINGS = ['category', 'state', 'channel']
+
+# Months between a period and the one it is compared with
+MOM_LAG = 1
+YOY_LAG = 12
+DEFAULT_WINDOW = 3
+
+def _month_numbers(months):
+    """'YYYY-MM' strings as consecutive integers (year * 12 + month - 1)."""
+    months = pd.Series(months).astype(str)
+    return months.str[:4].astype(int) * 12 + months.str[5:7].astype(int) - 1
+
+def _month_labels(numbers):
+    numbers = np.asarray(numbers)
+    return [f"{year:04d}-{month:02d}" for year, month in zip(numbers // 12, numbers % 12 + 1)]
+
+def complete_months(history, value_columns, group=None):
+    """
+    Every month between the first and last month of the history, for every
+    segment, with months that had no sales filled with 0. Lags then count
+    calendar months instead of rows. Rows with no month (NULL or unparseable
+    dates) are left out of the grid.
+    """
+    history = history[history['month'].notna()]
+    numbers = _month_numbers(history['month']).to_numpy()
+    grid = np.arange(numbers.min(), numbers.max() + 1) if len(numbers) else np.array([], dtype=int)
+    frame = history.assign(_month=numbers)
+    if group is None:
+        index = pd.Index(grid, name='_month')
+        frame = frame.set_index('_month')[list(value_columns)]
+    else:
+        segments = frame[group].drop_duplicates().sort_values()
+        index = pd.MultiIndex.from_product([segments, grid], names=[group, '_month'])
+        frame = frame.set_index([group, '_month'])[list(value_columns)]
+    frame = frame.reindex(index, fill_value=0).reset_index()
+    frame.insert(0 if group is None else 1, 'month', _month_labels(frame['_month']))
+    return frame.drop(columns='_month')
+
+def _change(current, previous):
+    """Relative change, NULL where there is no earlier value to compare with."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (current - previous) / previous
+    return change.where(previous > 0).round(4)
+
+def period_over_period(history, value_columns=('revenue', 'orders'), group=None, window=DEFAULT_WINDOW):
+    """
+    Month-over-month, year-over-year and rolling-window metrics from monthly history.
+
+    `history` has a 'month' ('YYYY-MM') column, the `value_columns`, and the
+    `group` column if given. For each value column the result adds the previous
+    month and the same month last year (with their relative changes), and the
+    sum over the trailing `window` months. Values with no history to compare
+    against are NULL rather than estimated. Every step is a vectorized shift or
+    cumulative sum over the completed month grid, so the output is deterministic.
+    Rows with no month are appended as they are, with every metric NULL.
+    """
+    frame = complete_months(history, value_columns, group)
+    keys = frame[group] if group is not None else pd.Series(0, index=frame.index)
+    grouped = frame.groupby(keys, sort=False, dropna=False)
+    position = grouped.cumcount()
+    for col in value_columns:
+        values = frame[col].astype(float)
+        previous = grouped[col].shift(MOM_LAG)
+        last_year = grouped[col].shift(YOY_LAG)
+        frame[f'{col}_prev_month'] = previous
+        frame[f'{col}_mom_pct'] = _change(values, previous)
+        frame[f'{col}_last_year'] = last_year
+        frame[f'{col}_yoy_pct'] = _change(values, last_year)
+        # Trailing sum as a difference of running totals; incomplete windows stay NULL
+        running = values.groupby(keys, sort=False, dropna=False).cumsum()
+        before_window = running.groupby(keys, sort=False, dropna=False).shift(window).fillna(0)
+        frame[f'{col}_rolling_{window}m'] = (running - before_window).where(position >= window - 1).round(2)
+    undated = history.loc[history['month'].isna(), frame.columns.intersection(history.columns)]
+    if undated.empty:
+        return frame
+    return pd.concat([frame, undated], ignore_index=True)
+
+def load_period_metrics(conn, group=None, filters=None, window=DEFAULT_WINDOW):
+    """Period-over-period metrics for one grouping, from the summary cube's monthly history."""
+    if group is not None and group not in GROUPINGS:
+        raise ValueError(f"Unknown grouping '{group}' (expected one of {GROUPINGS})")
+    params = dict(filters or {}, segment_by=group)
+    history = load_library().run(conn, HISTORY_QUERY, params)
+    if group is None:
+        history = history.drop(columns='segment')
+    else:
+        history = history.rename(columns={'segment': group})
+    return period_over_period(history, group=group, window=window)
+
+def cached_period_metrics(storage, cache, group=None, filters=None, window=DEFAULT_WINDOW):
+    """The same metrics, answered from the result cache while the data is unchanged."""
+    def compute():
+        return storage.read(lambda conn: load_period_metrics(conn, group, filters, window))
+
+    if cache is None:
+        return compute()
+    key = f"{load_library().sql(HISTORY_QUERY)}\n-- group={group} window={window} filters={sorted((filters or {}).items())}"
+    return cache.get_or_compute(key, storage.data_version(), compute)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute MoM, YoY and rolling revenue / orders from the summary cube.")
+    parser.add_argument('--backend', choices=[b for b in BACKENDS if b != 'parquet'], default='sqlite',
+                        help="Database to read the monthly history from")
+    parser.add_argument('--group', choices=GROUPINGS, default=None, help="Segment to compute the metrics for")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="Months in the rolling window")
+    parser.add_argument('--state', default=None, help="Only this ship-state")
+    parser.add_argument('--category', default=None, help="Only this category")
+    parser.add_argument('--no-cache', action='store_true', help="Always query the database")
+    parser.add_argument('--output', default=None, help="Write the metrics to this CSV file instead of printing them")
+    args = parser.parse_args()
+
+    storage = open_storage(args.backend, DB_FILE if args.backend == 'sqlite' else None)
+    if not storage.exists():
+        print(f"Error: no database found at {storage.path}. Run load_to_sql.py first.")
+        raise SystemExit(1)
+    cache = None if args.no_cache else QueryCache()
+    try:
+        filters = {name: value for name, value in [('state', args.state), ('category', args.category)] if value}
+        metrics = cached_period_metrics(storage, cache, args.group, filters, args.window)
+        if args.output:
+            metrics.to_csv(args.output, index=False)
+            print(f"Wrote {len(metrics):,} rows to {args.output}")
+        else:
+            print(metrics.to_string(index=False))
+    except Exception as e:
+        print(f"Error computing period metrics: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
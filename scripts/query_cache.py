@@ -0,0 +1,123 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+CACHE_DIR = os.path.join(PROJECT_ROOT, 'cache')
+CACHE_FILE = os.path.join(CACHE_DIR, 'query_cache.db')
+
+# Total size of cached results before least-recently-used entries are evicted
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+
+def file_fingerprint(paths):
+    """
+    Cheap data version for files on disk: path, size and mtime of every file
+    under `paths`. Any committed write to a SQLite database touches the main
+    file or its -wal file, so this changes whenever the data can have changed.
+    """
+    entries = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                entries.extend(os.path.join(root, name) for name in names)
+        elif os.path.exists(path):
+            entries.append(path)
+    digest = hashlib.sha256()
+    for entry in sorted(entries):
+        stat = os.stat(entry)
+        digest.update(f"{entry}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+class QueryCache:
+    """
+    Persistent cache of query results, keyed by query text plus a data version.
+
+    Results are pickled into a small SQLite file. When the cached bytes exceed
+    `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_query_cache_last_used ON query_cache(last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(query, data_version):
+        return hashlib.sha256(f"{data_version}\n{query}".encode()).hexdigest()
+
+    def get(self, query, data_version):
+        """Cached result for `query` at `data_version`, or None on a miss."""
+        key = self.make_key(query, data_version)
+        row = self.conn.execute("SELECT value FROM query_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE query_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        return pickle.loads(row[0])
+
+    def put(self, query, data_version, result):
+        """Store `result`, then evict least recently used entries beyond max_bytes."""
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO query_cache (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (self.make_key(query, data_version), value, len(value), time.time()),
+        )
+        self._evict()
+        self.conn.commit()
+
+    def get_or_compute(self, query, data_version, compute):
+        """Return the cached result, or run compute() and cache what it returns."""
+        result = self.get(query, data_version)
+        if result is None:
+            result = compute()
+            self.put(query, data_version, result)
+        return result
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM query_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM query_cache ORDER BY last_used").fetchall():
+            self.conn.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        self.conn.execute("DELETE FROM query_cache")
+        self.conn.commit()
+
+    def size(self):
+        """(entries, bytes) currently cached."""
+        return self.conn.execute("SELECT count(*), COALESCE(SUM(size), 0) FROM query_cache").fetchone()
+
+    def report(self):
+        entries, total = self.size()
+        print(f"Query cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+              f"{entries} entries ({total / 1024 ** 2:.1f} MB of {self.max_bytes / 1024 ** 2:.0f} MB)")
+
+    def close(self):
+        self.conn.close()
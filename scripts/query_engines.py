@@ -0,0 +1,224 @@
+"""
+Engines that run the named queries of query_library.py.
+
+* SQLiteEngine, the default, runs them on sql/ecommerce.db like the rest of
+  the pipeline.
+* DuckDBEngine runs the same SQL on DuckDB (optional: pip install duckdb),
+  an embedded columnar engine that executes GROUP BY and COUNT(DISTINCT)
+  vectorized and on every core. It reads the cleaned CSV or the Parquet
+  dataset in place. Results come back as Arrow tables and become pandas
+  columns over the same buffers (pd.ArrowDtype), with no Python object per value.
+
+On DuckDB, `sales` is a view over the files, with `date` typed as DATE and
+`is_cancelled` derived from `status` as the loader does. The first query that
+needs the summary tables materializes them in memory with the loader's own
+aggregation SQL. The shipped queries are written in SQL both engines accept
+(e.g. `x IS NULL OR x <> y` rather than SQLite's `x IS NOT y`), with two
+translations: `:name` parameters are passed as DuckDB's `$name`, and SQLite's
+index hints (`NOT INDEXED`, `INDEXED BY`) are dropped, since DuckDB has no
+such indexes. DuckDB accepts SQLite's strftime(format, date) argument order.
+
+The engine for each query can be chosen from a plan written by
+benchmark_engines.py (see open_engine('auto')).
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+from query_library import PARAMETER, load_library
+from snapshots import connect
+from storage import PARQUET_DIR
+from summary_tables import CUBE_TABLE, SKU_TABLE, _CUBE_INSERT
+from tracing import trace
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+CSV_FILE = os.path.join(DATA_DIR, 'cleaned_data.csv')
+PLAN_FILE = os.path.join(PROJECT_ROOT, 'benchmarks', 'engine-plan.json')
+
+ENGINES = ['sqlite', 'duckdb', 'auto']
+SOURCES = ['csv', 'parquet']
+
+# Column types of the cleaned CSV that DuckDB should not sniff
+CSV_TYPES = {'date': 'DATE', 'qty': 'BIGINT', 'amount': 'DOUBLE', 'ship-postal-code': 'DOUBLE', 'b2b': 'BOOLEAN'}
+
+# SQLite's per-table index hints, which DuckDB does not parse
+INDEX_HINT = re.compile(r'\s+(?:NOT\s+INDEXED|INDEXED\s+BY\s+\w+)\b', re.IGNORECASE)
+
+def _require_duckdb():
+    """Import duckdb lazily; it is only needed for the DuckDB engine."""
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("The duckdb engine requires duckdb (pip install duckdb)")
+    return duckdb
+
+def _sql_path(path):
+    return path.replace("'", "''")
+
+def duckdb_sql(sql):
+    """A named query's SQLite text as DuckDB runs it: `$name` parameters, no index hints."""
+    return PARAMETER.sub(r'$\1', INDEX_HINT.sub('', sql))
+
+class SQLiteEngine:
+    """Named queries on the SQLite database, through QueryLibrary.run."""
+
+    name = 'sqlite'
+
+    def __init__(self, db_file=DB_FILE):
+        self.conn = connect(db_file)
+
+    def run(self, name, params=None):
+        return load_library().run(self.conn, name, params)
+
+    def close(self):
+        self.conn.close()
+
+class DuckDBEngine:
+    """Named queries on DuckDB, over the cleaned CSV or the Parquet dataset."""
+
+    name = 'duckdb'
+
+    def __init__(self, source='parquet', path=None, threads=None):
+        duckdb = _require_duckdb()
+        if source not in SOURCES:
+            raise ValueError(f"Unknown DuckDB source '{source}' (expected one of {SOURCES})")
+        self.source = source
+        self.path = path or (PARQUET_DIR if source == 'parquet' else CSV_FILE)
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No {source} data at {self.path}")
+        self.conn = duckdb.connect()
+        if threads:
+            self.conn.execute(f"SET threads = {int(threads)}")
+        self.conn.execute(f"CREATE VIEW sales AS {self._sales_select()}")
+        self.summary_built = False
+
+    def _sales_select(self):
+        if self.source == 'parquet':
+            files = _sql_path(os.path.join(self.path, '**', '*.parquet'))
+            # The loader already derived is_cancelled; only `date` needs its type
+            return f"SELECT * REPLACE (CAST(date AS DATE) AS date) FROM read_parquet('{files}', hive_partitioning = true)"
+        types = ', '.join(f"'{column}': '{kind}'" for column, kind in CSV_TYPES.items())
+        return f"""
+            SELECT * REPLACE (CAST(b2b AS INTEGER) AS b2b),
+                CASE
+                    WHEN status IS NULL THEN NULL
+                    WHEN lower(status) LIKE '%cancelled%' THEN 1
+                    ELSE 0
+                END AS is_cancelled
+            FROM read_csv('{_sql_path(self.path)}', header = true, types = {{{types}}})
+        """
+
+    def build_summary_tables(self):
+        """Materialize the summary cube and distinct (date, sku) pairs in memory; returns seconds taken."""
+        start = time.perf_counter()
+        cube = _CUBE_INSERT.format(row_filter='', date_filter='').replace(f"INSERT INTO {CUBE_TABLE}", f"CREATE TABLE {CUBE_TABLE} AS")
+        with trace('duckdb summary tables'):
+            self.conn.execute(cube)
+            self.conn.execute(f"""
+                CREATE TABLE {SKU_TABLE} AS
+                SELECT DISTINCT date, sku FROM sales WHERE is_cancelled = 0 AND sku IS NOT NULL
+            """)
+        self.summary_built = True
+        return time.perf_counter() - start
+
+    def run(self, name, params=None):
+        library = load_library()
+        sql = library.sql(name)
+        if not self.summary_built and (CUBE_TABLE in sql or SKU_TABLE in sql):
+            self.build_summary_tables()
+        with trace(f"duckdb query: {name}") as span:
+            result = self.conn.execute(duckdb_sql(sql), library.bind(name, params))
+            # to_arrow_table() replaced fetch_arrow_table() in duckdb 1.4
+            table = result.to_arrow_table() if hasattr(result, 'to_arrow_table') else result.fetch_arrow_table()
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+            span.rows = len(df)
+        return df
+
+    def close(self):
+        self.conn.close()
+
+def load_plan(plan_file=PLAN_FILE):
+    """{query name: engine} chosen by benchmark_engines.py, or {} if there is no plan yet."""
+    if not os.path.exists(plan_file):
+        return {}
+    with open(plan_file, encoding='utf-8') as f:
+        return json.load(f)['choice']
+
+class RoutedEngine:
+    """
+    Each query on the engine the benchmark plan chose for it. Queries missing
+    from the plan, and every query when duckdb is not installed, run on SQLite.
+    """
+
+    name = 'auto'
+
+    def __init__(self, db_file=DB_FILE, source='parquet', path=None, plan_file=PLAN_FILE):
+        self.plan = load_plan(plan_file)
+        self.engines = {'sqlite': SQLiteEngine(db_file)}
+        if 'duckdb' in self.plan.values():
+            try:
+                self.engines['duckdb'] = DuckDBEngine(source, path)
+            except (ImportError, FileNotFoundError) as e:
+                print(f"Running every query on SQLite: {e}")
+
+    def engine_for(self, name):
+        return self.engines.get(self.plan.get(name), self.engines['sqlite'])
+
+    def run(self, name, params=None):
+        return self.engine_for(name).run(name, params)
+
+    def close(self):
+        for engine in self.engines.values():
+            engine.close()
+
+def open_engine(engine='sqlite', db_file=DB_FILE, source='parquet', path=None, plan_file=PLAN_FILE):
+    """Return the query engine for `engine` ('sqlite', 'duckdb' or 'auto')."""
+    if engine == 'sqlite':
+        return SQLiteEngine(db_file)
+    if engine == 'duckdb':
+        return DuckDBEngine(source, path)
+    if engine == 'auto':
+        return RoutedEngine(db_file, source, path, plan_file)
+    raise ValueError(f"Unknown query engine '{engine}' (expected one of {ENGINES})")
+
+def _parse_params(pairs):
+    params = {}
+    for pair in pairs:
+        key, _, value = pair.partition('=')
+        params[key] = value
+    return params
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a named query on SQLite or DuckDB.")
+    parser.add_argument('query', help="Name of the query (see sql/*.sql)")
+    parser.add_argument('--engine', choices=ENGINES, default='sqlite',
+                        help="Engine to run on (auto: the one benchmark_engines.py chose for this query)")
+    parser.add_argument('--source', choices=SOURCES, default='parquet', help="Files DuckDB reads")
+    parser.add_argument('--path', default=None, help="CSV file or Parquet directory for DuckDB")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database")
+    parser.add_argument('--plan', default=PLAN_FILE, help="Per-query engine choice written by benchmark_engines.py")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help="Query parameter, e.g. --param date_from=2022-04-01 (repeatable)")
+    args = parser.parse_args()
+
+    engine = None
+    try:
+        engine = open_engine(args.engine, args.db, args.source, args.path, args.plan)
+        start = time.perf_counter()
+        df = engine.run(args.query, _parse_params(args.param))
+        print(df.to_string(index=False))
+        print(f"\n{len(df):,} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except Exception as e:
+        print(f"Error running query: {e}")
+    finally:
+        if engine is not None:
+            engine.close()
@@ -0,0 +1,124 @@
+import os
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pandas as pd
+
+from snapshots import connect
+from tracing import trace
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+
+# Files of named queries, each statement introduced by a "-- name: <query>" line
+QUERY_FILES = [
+    os.path.join(SQL_DIR, 'dashboard_queries.sql'),
+    os.path.join(SQL_DIR, 'analysis_queries.sql'),
+]
+
+DEFAULT_POOL_SIZE = 4
+
+NAME_TAG = re.compile(r'^--\s*name:\s*(\w+)\s*$', re.M)
+PARAMETER = re.compile(r'(?<![:\w]):([A-Za-z_]\w*)')
+
+def parse_named_queries(text):
+    """
+    Split SQL text into {name: statement}. A statement runs from its
+    "-- name:" tag to the next tag or the end of the file; comment lines are
+    dropped and the trailing semicolon is removed.
+    """
+    queries = {}
+    parts = NAME_TAG.split(text)
+    for name, body in zip(parts[1::2], parts[2::2]):
+        lines = [line for line in body.splitlines() if line.strip() and not line.strip().startswith('--')]
+        queries[name] = '\n'.join(lines).strip().rstrip(';')
+    return queries
+
+class QueryLibrary:
+    """
+    Named, parameterized SQL loaded from the sql/ directory.
+
+    Every statement is bound with named parameters (never formatted into the
+    SQL), and a parameter that is not supplied is bound as NULL, which the
+    queries read as "no filter". The SQL text of a query never changes, so
+    sqlite3's per-connection statement cache prepares it once per connection.
+    """
+
+    def __init__(self, paths=QUERY_FILES):
+        self.queries = {}
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                for name, sql in parse_named_queries(f.read()).items():
+                    if name in self.queries:
+                        raise ValueError(f"Query '{name}' is defined twice (again in {path})")
+                    self.queries[name] = sql
+        self.parameters = {name: sorted(set(PARAMETER.findall(sql))) for name, sql in self.queries.items()}
+
+    def names(self):
+        return list(self.queries)
+
+    def sql(self, name):
+        try:
+            return self.queries[name]
+        except KeyError:
+            raise KeyError(f"Unknown query '{name}'") from None
+
+    def bind(self, name, params=None):
+        """Parameters for `name`: supplied values, with '' and missing ones as NULL."""
+        params = params or {}
+        self.sql(name)
+        return {key: None if params.get(key) == '' else params.get(key) for key in self.parameters[name]}
+
+    def run(self, conn, name, params=None):
+        """Run one named query and return its rows as a DataFrame."""
+        with trace(f"query: {name}") as span:
+            df = pd.read_sql_query(self.sql(name), conn, params=self.bind(name, params))
+            span.rows = len(df)
+        return df
+
+    def run_many(self, pool, names, params=None, executor=None):
+        """
+        Run independent queries concurrently, one pooled connection each, and
+        return their DataFrames in `names` order. sqlite3 releases the GIL while
+        a statement steps, so queries overlap on multi-core machines.
+        """
+        def run_one(name):
+            with pool.connection() as conn:
+                return self.run(conn, name, params)
+
+        if executor is not None:
+            return tuple(executor.map(run_one, names))
+        with ThreadPoolExecutor(max_workers=pool.size) as own_executor:
+            return tuple(own_executor.map(run_one, names))
+
+@lru_cache(maxsize=None)
+def load_library():
+    """The shipped query library, read from disk once per process."""
+    return QueryLibrary()
+
+class ReadOnlyPool:
+    """A fixed set of read-only SQLite connections shared by worker threads."""
+
+    def __init__(self, db_file=DB_FILE, size=DEFAULT_POOL_SIZE):
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(connect(db_file, read_only=True))
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        for _ in range(self.size):
+            self.connections.get().close()
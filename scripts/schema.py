@@ -0,0 +1,236 @@
+import pandas as pd
+
+# Managed schema for the `sales` table. Dates are stored as ISO 'YYYY-MM-DD' text so
+# strftime() and range filters work on them directly.
+SALES_COLUMNS = [
+    ('index', 'INTEGER'),
+    ('order_id', 'TEXT'),
+    ('date', 'TEXT'),
+    ('status', 'TEXT'),
+    ('fulfilment', 'TEXT'),
+    ('sales_channel', 'TEXT'),
+    ('ship-service-level', 'TEXT'),
+    ('style', 'TEXT'),
+    ('sku', 'TEXT'),
+    ('category', 'TEXT'),
+    ('size', 'TEXT'),
+    ('asin', 'TEXT'),
+    ('courier_status', 'TEXT'),
+    ('qty', 'INTEGER'),
+    ('currency', 'TEXT'),
+    ('amount', 'REAL'),
+    ('ship-city', 'TEXT'),
+    ('ship-state', 'TEXT'),
+    ('ship-postal-code', 'REAL'),
+    ('ship-country', 'TEXT'),
+    ('promotion-ids', 'TEXT'),
+    ('b2b', 'INTEGER'),
+    ('status_code', 'INTEGER'),
+    ('is_cancelled', 'INTEGER'),
+]
+
+# Coarse order states derived from the free-text `status` at load time. The first
+# matching keyword wins, so any status mentioning "cancelled" is cancelled, matching
+# the case-insensitive `status LIKE '%Cancelled%'` test it replaces.
+STATUS_CANCELLED = 5
+ORDER_STATUS_CODES = [
+    ('cancelled', STATUS_CANCELLED),
+    ('return', 4),
+    ('rejected', 4),
+    ('lost', 4),
+    ('damaged', 4),
+    ('delivered', 3),
+    ('shipped', 2),
+    ('shipping', 2),
+    ('picked up', 2),
+    ('out for delivery', 2),
+    ('pending', 1),
+]
+
+# Explicit dtypes for the cleaned export so CSV chunks never need type inference
+CSV_DTYPES = {
+    'index': 'int64',
+    'order_id': str,
+    'date': str,
+    'status': str,
+    'fulfilment': str,
+    'sales_channel': str,
+    'ship-service-level': str,
+    'style': str,
+    'sku': str,
+    'category': str,
+    'size': str,
+    'asin': str,
+    'courier_status': str,
+    'qty': 'int64',
+    'currency': str,
+    'amount': 'float64',
+    'ship-city': str,
+    'ship-state': str,
+    'ship-postal-code': 'float64',
+    'ship-country': str,
+    'promotion-ids': str,
+    'b2b': 'bool',
+}
+
+# Only the indexes that queries on `sales` still use; the dashboard and most analysis
+# queries read the summary cube instead. The category and state indexes carry the
+# columns top_products and regional_performance aggregate, so those group in key order.
+# idx_sales_sku covers the distinct-SKU count of a KPI filtered by state or category, and
+# idx_sales_b2b every column b2b_vs_b2c reads (b2b is not in the cube), so it scans the
+# index instead of the table. sales_scan reads nearly every row and every column, so it
+# reads the table NOT INDEXED.
+SALES_INDEXES = [
+    ('idx_sales_category', ['category', 'is_cancelled', 'order_id', 'amount', 'qty', 'style']),
+    ('idx_sales_state', ['ship-state', 'is_cancelled', 'order_id', 'amount', 'qty', 'ship-city']),
+    ('idx_sales_sku', ['is_cancelled', 'sku', 'date', 'category', 'ship-state']),
+    ('idx_sales_b2b', ['is_cancelled', 'b2b', 'order_id', 'qty', 'amount', 'date']),
+]
+
+# Indexes only incremental loads use, so they are built only where incremental load state
+# is kept: idx_sales_load_key serves the upserts, idx_sales_date the per-date summary and
+# sketch refreshes (full refreshes scan the table)
+INCREMENTAL_INDEXES = [
+    ('idx_sales_load_key', ['order_id', 'sku', 'date']),
+    ('idx_sales_date', ['date']),
+]
+
+# Indexes earlier versions created; dropped when the indexes are next (re)built
+RETIRED_INDEXES = ['idx_sales_status', 'idx_sales_channel']
+
+# Columns computed during the load rather than read from the CSV
+DERIVED_COLUMNS = ['status_code', 'is_cancelled']
+
+# Compact in-memory dtypes for frames holding the whole table (analysis, rollups,
+# batch dashboards). Repetitive text becomes categorical, so each distinct string is
+# stored once; `state` and `month` are the aliases used by the rollup scan. Integers
+# are downcast to the smallest type holding them; amount stays float64 so revenue
+# sums match SQLite's to the cent, and 6-digit postal codes are exact in float32.
+CATEGORICAL_COLUMNS = [
+    'status', 'fulfilment', 'sales_channel', 'ship-service-level', 'style', 'sku', 'category', 'size', 'asin',
+    'courier_status', 'currency', 'ship-city', 'ship-state', 'ship-country', 'promotion-ids', 'state', 'month',
+]
+INTEGER_COLUMNS = ['row_id', 'index', 'qty', 'b2b', 'status_code', 'is_cancelled']
+FLOAT32_COLUMNS = ['ship-postal-code']
+DATETIME_COLUMNS = ['date']
+COMPACT_CHUNK_ROWS = 100_000
+
+def _quote(name):
+    return f'"{name}"'
+
+def create_sales_table(conn, columns=None, table='sales'):
+    """
+    Create the `sales` table with declared types and a rowid primary key.
+
+    Only the managed columns present in `columns` (the CSV header) are created;
+    unknown extra columns are stored as untyped TEXT so nothing is dropped.
+    """
+    types = dict(SALES_COLUMNS)
+    names = list(columns) if columns is not None else [name for name, _ in SALES_COLUMNS]
+    definitions = ['row_id INTEGER PRIMARY KEY'] + [f'{_quote(name)} {types.get(name, "TEXT")}' for name in names]
+    conn.execute(f"CREATE TABLE {table} (\n    " + ",\n    ".join(definitions) + "\n)")
+
+def create_sales_indexes(conn, table='sales', incremental=True):
+    """Create the query indexes, and the incremental-load ones if `incremental` (build them after a bulk insert, not before)."""
+    for name in RETIRED_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, columns in SALES_INDEXES + (INCREMENTAL_INDEXES if incremental else []):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(map(_quote, columns))})")
+
+def drop_sales_indexes(conn):
+    """Drop the query indexes so a bulk insert does not maintain them row by row."""
+    for name, _ in SALES_INDEXES + INCREMENTAL_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+def normalize_dates(df):
+    """Coerce the `date` column to ISO 'YYYY-MM-DD' strings (no-op when already ISO)."""
+    dates = df['date']
+    if dates.isna().any() or not dates.str.fullmatch(r'\d{4}-\d{2}-\d{2}').all():
+        parsed = pd.to_datetime(dates, errors='coerce', format='mixed')
+        df = df.assign(date=parsed.dt.strftime('%Y-%m-%d'))
+    return df
+
+def status_code(status):
+    """Map one free-text status to its small-integer order state (0 = other)."""
+    lowered = status.lower()
+    for keyword, code in ORDER_STATUS_CODES:
+        if keyword in lowered:
+            return code
+    return 0
+
+def add_order_state(df):
+    """
+    Derive `status_code` and `is_cancelled` from `status`.
+
+    Statuses are classified once per distinct value, then mapped back onto the rows.
+    A NULL status yields NULL for both, so `is_cancelled = 0` excludes it exactly as
+    `status NOT LIKE '%Cancelled%'` did.
+    """
+    codes, uniques = pd.factorize(df['status'])
+    lookup = pd.array([status_code(str(value)) for value in uniques] + [None], dtype='Int64')
+    state = lookup[codes]
+    return df.assign(
+        status_code=state,
+        is_cancelled=(state == STATUS_CANCELLED).astype('Int64'),
+    )
+
+def sales_table_is_current(conn, table='sales'):
+    """True if the existing table already has the derived columns of the managed schema."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    return bool(existing) and all(col in existing for col in DERIVED_COLUMNS)
+
+def _downcast_integers(series):
+    """Smallest integer dtype for the values; nullable when the column has NULLs."""
+    if series.dtype == bool:
+        return series
+    if series.isna().any():
+        if series.dropna().empty:
+            return series
+        smallest = pd.to_numeric(series.dropna(), downcast='integer').dtype
+        return series.astype(pd.api.types.pandas_dtype(str(smallest).capitalize()))
+    return pd.to_numeric(series, downcast='integer')
+
+def compact_frame(df, parse_dates=True):
+    """Convert the managed columns present in `df` to their compact dtypes."""
+    columns = {}
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            columns[col] = df[col].astype('category')
+        elif col in INTEGER_COLUMNS:
+            columns[col] = _downcast_integers(df[col])
+        elif col in FLOAT32_COLUMNS:
+            columns[col] = df[col].astype('float32')
+        elif col in DATETIME_COLUMNS and parse_dates:
+            columns[col] = pd.to_datetime(df[col], errors='coerce', format='mixed')
+    return df.assign(**columns) if columns else df
+
+def concat_compact(frames):
+    """
+    Concatenate compacted chunks, unioning each categorical column's categories
+    (plain pd.concat would fall back to text when the chunks' categories differ).
+    """
+    frames = list(frames)
+    if len(frames) <= 1:
+        return frames[0] if frames else pd.DataFrame()
+    dtypes = {}
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = pd.Index([])
+            for frame in frames:
+                categories = categories.union(frame[col].cat.categories)
+            dtypes[col] = pd.CategoricalDtype(categories)
+    return pd.concat([frame.astype(dtypes) for frame in frames], ignore_index=True)
+
+def read_sales_csv(path, columns=None, chunksize=COMPACT_CHUNK_ROWS):
+    """
+    Read the cleaned CSV into a compact frame, chunk by chunk, so the full
+    text representation is never held in memory at once.
+    """
+    dtypes = {col: dtype for col, dtype in CSV_DTYPES.items() if columns is None or col in columns}
+    reader = pd.read_csv(path, dtype=dtypes, usecols=columns, chunksize=chunksize)
+    return concat_compact(compact_frame(chunk) for chunk in reader)
+
+def read_sales_frame(sql, conn, params=None, chunksize=COMPACT_CHUNK_ROWS):
+    """Run a query over `sales` and return its rows as a compact frame, read in chunks."""
+    chunks = pd.read_sql_query(sql, conn, params=params, chunksize=chunksize)
+    return concat_compact(compact_frame(chunk) for chunk in chunks)
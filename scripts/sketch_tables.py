@@ -0,0 +1,262 @@
+"""
+Per-day sketches of the non-cancelled sales, maintained next to the summary cube.
+
+sales_daily_sketches holds one row per (date, metric):
+
+* `orders` and `skus` are HyperLogLog sketches of the distinct order_ids and SKUs sold that day.
+* `states` and `styles` are top-K sketches (space-saving candidates plus count-min) of revenue by ship-state and by style.
+
+Any date range is answered by merging its days' sketches, so an approximate
+COUNT(DISTINCT) or top-K needs no hash set over the rows. Like the cube, the
+sketches are refreshed per date, and each row stores its own parameters.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from sketches import HyperLogLog, TopK, dump_record, load_record
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+
+SKETCH_TABLE = 'sales_daily_sketches'
+
+# Default error bounds: HyperLogLog relative standard error, and count-min
+# over-estimate as a fraction of the day's (or merged range's) total revenue
+DEFAULT_DISTINCT_ERROR = 0.01
+DEFAULT_TOPK_ERROR = 0.005
+DEFAULT_TOPK_CAPACITY = 100
+DEFAULT_TOPK_DELTA = 0.01
+
+DISTINCT_METRICS = {'orders': 'order_id', 'skus': 'sku'}
+TOPK_METRICS = {'states': '"ship-state"', 'styles': 'style'}
+
+READ_CHUNK_ROWS = 250_000
+
+_CREATE_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {SKETCH_TABLE} (
+    date TEXT,
+    metric TEXT,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    sketch BLOB NOT NULL,
+    PRIMARY KEY (date, metric)
+) WITHOUT ROWID
+"""
+
+def sketch_tables_exist(conn):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SKETCH_TABLE,)).fetchone()
+    return row is not None
+
+def _stored_settings(conn):
+    """
+    Dimensions of the sketches already in the table, so refreshed days stay
+    mergeable. Read back as stored: converting them to error bounds and back
+    does not always round-trip to the same count-min width.
+    """
+    stored = {}
+    for metric in ['orders', 'states']:
+        row = conn.execute(f"SELECT kind, params, sketch FROM {SKETCH_TABLE} WHERE metric = ? LIMIT 1",
+                           (metric,)).fetchone()
+        if row is None:
+            return None
+        stored[metric] = load_record(*row)
+    return {
+        'precision': stored['orders'].precision,
+        'capacity': stored['states'].capacity,
+        'width': stored['states'].countmin.width,
+        'depth': stored['states'].countmin.depth,
+        'delta': stored['states'].delta,
+    }
+
+def _settings(distinct_error=None, topk_error=None, topk_capacity=None, stored=None):
+    """Sketch dimensions for the requested error bounds; unset ones keep `stored` (or the defaults)."""
+    settings = dict(stored or {})
+    if distinct_error is not None or stored is None:
+        settings['precision'] = HyperLogLog.for_error(distinct_error or DEFAULT_DISTINCT_ERROR).precision
+    if topk_capacity is not None or stored is None:
+        settings['capacity'] = topk_capacity or DEFAULT_TOPK_CAPACITY
+    if topk_error is not None or stored is None:
+        countmin = TopK(settings['capacity'], topk_error or DEFAULT_TOPK_ERROR, DEFAULT_TOPK_DELTA).countmin
+        settings.update(width=countmin.width, depth=countmin.depth, delta=DEFAULT_TOPK_DELTA)
+    return settings
+
+def _new_sketches(precision, capacity, width, depth, delta):
+    sketches = {metric: HyperLogLog(precision) for metric in DISTINCT_METRICS}
+    sketches.update({metric: TopK.sized(capacity, width, depth, delta) for metric in TOPK_METRICS})
+    return sketches
+
+def refresh_sketches(conn, dates=None, distinct_error=None, topk_error=None, topk_capacity=None):
+    """
+    Rebuild the per-day sketches from `sales`, for every date or only `dates`.
+
+    Sketch sizes default to those of the sketches already stored (or the module
+    defaults); passing new error bounds requires a full rebuild (`dates=None`),
+    since sketches of different sizes cannot be merged. Returns the number of days sketched.
+    """
+    conn.execute(_CREATE_TABLE)
+    stored = _stored_settings(conn)
+    if stored and dates is not None:
+        settings = stored
+    else:
+        settings = _settings(distinct_error, topk_error, topk_capacity, stored)
+
+    if dates is None:
+        conn.execute(f"DELETE FROM {SKETCH_TABLE}")
+        date_filter = ""
+    else:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS sketch_dates (date TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM sketch_dates")
+        conn.executemany("INSERT OR IGNORE INTO sketch_dates VALUES (?)", ((date,) for date in dates))
+        conn.execute(f"DELETE FROM {SKETCH_TABLE} WHERE date IN (SELECT date FROM sketch_dates)")
+        date_filter = "AND date IN (SELECT date FROM sketch_dates)"
+
+    columns = ', '.join(f"{column} as {metric}" for metric, column in {**DISTINCT_METRICS, **TOPK_METRICS}.items())
+    query = f"SELECT date, {columns}, amount FROM sales WHERE is_cancelled = 0 {date_filter}"
+    days = {}
+    for chunk in pd.read_sql_query(query, conn, chunksize=READ_CHUNK_ROWS):
+        for date, rows in chunk.groupby('date', sort=False):
+            sketches = days.get(date)
+            if sketches is None:
+                sketches = days[date] = _new_sketches(**settings)
+            for metric in DISTINCT_METRICS:
+                sketches[metric].add(rows[metric].to_numpy())
+            for metric in TOPK_METRICS:
+                sketches[metric].add(rows[metric].to_numpy(), rows['amount'].to_numpy())
+
+    conn.executemany(
+        f"INSERT INTO {SKETCH_TABLE} (date, metric, kind, params, sketch) VALUES (?, ?, ?, ?, ?)",
+        ((date, metric, *dump_record(sketch)) for date, sketches in days.items() for metric, sketch in sketches.items()),
+    )
+    return len(days)
+
+def merged_sketches(conn, date_from=None, date_to=None):
+    """Each metric's sketches over [date_from, date_to] (inclusive) merged into one."""
+    merged = {}
+    rows = conn.execute(f"""
+        SELECT metric, kind, params, sketch FROM {SKETCH_TABLE}
+        WHERE (:date_from IS NULL OR date >= :date_from)
+            AND (:date_to IS NULL OR date <= :date_to)
+    """, {'date_from': date_from, 'date_to': date_to})
+    for metric, kind, params, blob in rows:
+        sketch = load_record(kind, params, blob)
+        if metric in merged:
+            merged[metric].merge(sketch)
+        else:
+            merged[metric] = sketch
+    return merged
+
+def approximate_kpis(conn, date_from=None, date_to=None, top=10):
+    """Approximate distinct orders / SKUs and top states / styles by revenue, from the sketches."""
+    merged = merged_sketches(conn, date_from, date_to)
+    if not merged:
+        return None
+    return {
+        'distinct_orders': merged['orders'].count(),
+        'distinct_skus': merged['skus'].count(),
+        'distinct_error': merged['orders'].standard_error,
+        'top_states': merged['states'].top(top),
+        'top_styles': merged['styles'].top(top),
+        'topk_error_bound': merged['states'].error_bound,
+    }
+
+def _exact(conn, date_from, date_to, top):
+    params = {'date_from': date_from, 'date_to': date_to, 'top': top}
+    where = """WHERE is_cancelled = 0
+        AND (:date_from IS NULL OR date >= :date_from)
+        AND (:date_to IS NULL OR date <= :date_to)"""
+    orders, skus = conn.execute(f"SELECT COUNT(DISTINCT order_id), COUNT(DISTINCT sku) FROM sales {where}",
+                                params).fetchone()
+    tops = {}
+    for metric, column in TOPK_METRICS.items():
+        tops[metric] = conn.execute(f"""
+            SELECT {column}, SUM(amount) as revenue FROM sales {where} AND {column} IS NOT NULL
+            GROUP BY {column} ORDER BY revenue DESC LIMIT :top
+        """, params).fetchall()
+    return {'distinct_orders': orders, 'distinct_skus': skus, 'top_states': tops['states'],
+            'top_styles': tops['styles']}
+
+def _months(conn):
+    return [row[0] for row in conn.execute(f"SELECT DISTINCT substr(date, 1, 7) FROM {SKETCH_TABLE} ORDER BY 1")]
+
+def validation_report(conn, top=10):
+    """
+    Compare the sketch estimates with exact counts over the whole range and
+    each month, printing a table; returns the rows for machine use.
+    """
+    ranges = [('all', None, None)] + [(month, f"{month}-01", f"{month}-31") for month in _months(conn)]
+    report = []
+    print(f"{'Range':<8} {'Metric':<16} {'Exact':>12} {'Approx':>12} {'Error':>8} {'Bound':>8} "
+          f"{'Exact (ms)':>10} {'Approx (ms)':>11}")
+    for label, date_from, date_to in ranges:
+        start = time.perf_counter()
+        exact = _exact(conn, date_from, date_to, top)
+        exact_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        approx = approximate_kpis(conn, date_from, date_to, top)
+        approx_ms = (time.perf_counter() - start) * 1000
+
+        for metric in ['distinct_orders', 'distinct_skus']:
+            error = approx[metric] / exact[metric] - 1 if exact[metric] else 0.0
+            # Three standard errors: the estimate falls inside with ~99.7% probability
+            bound = 3 * approx['distinct_error']
+            report.append({'range': label, 'metric': metric, 'exact': exact[metric], 'approx': approx[metric],
+                           'relative_error': round(error, 5), 'bound': round(bound, 5),
+                           'within_bound': abs(error) <= bound,
+                           'exact_ms': round(exact_ms, 2), 'approx_ms': round(approx_ms, 2)})
+            print(f"{label:<8} {metric:<16} {exact[metric]:>12,} {approx[metric]:>12,} {error:>8.2%} {bound:>8.2%} "
+                  f"{exact_ms:>10.1f} {approx_ms:>11.1f}")
+
+        for metric in ['top_states', 'top_styles']:
+            exact_top = {item: weight for item, weight in exact[metric]}
+            approx_top = dict(approx[metric])
+            recall = len(exact_top.keys() & approx_top.keys()) / max(len(exact_top), 1)
+            worst = max((abs(approx_top[item] - weight) for item, weight in exact_top.items() if item in approx_top),
+                        default=0.0)
+            report.append({'range': label, 'metric': metric, 'recall': round(recall, 4),
+                           'max_weight_error': round(worst, 2), 'bound': round(approx['topk_error_bound'], 2),
+                           'within_bound': worst <= approx['topk_error_bound']})
+            print(f"{label:<8} {metric:<16} {'recall':>12} {recall:>12.0%} {worst:>8,.0f} "
+                  f"{approx['topk_error_bound']:>8,.0f}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and validate the per-day approximate-count sketches.")
+    parser.add_argument('--db', default=DB_FILE, help="SQLite database built by load_to_sql.py")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild every day's sketches from `sales`")
+    parser.add_argument('--distinct-error', type=float, default=None,
+                        help=f"HyperLogLog relative standard error (default {DEFAULT_DISTINCT_ERROR})")
+    parser.add_argument('--topk-error', type=float, default=None,
+                        help=f"Count-min over-estimate as a fraction of total revenue (default {DEFAULT_TOPK_ERROR})")
+    parser.add_argument('--topk-capacity', type=int, default=None,
+                        help=f"Space-saving candidates kept per day (default {DEFAULT_TOPK_CAPACITY})")
+    parser.add_argument('--top', type=int, default=10, help="K of the top-K comparison")
+    parser.add_argument('--output', default=None, help="Also write the validation report to this JSON file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: database not found at {args.db}. Run load_to_sql.py first.")
+        raise SystemExit(1)
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.rebuild or not sketch_tables_exist(conn):
+            start = time.perf_counter()
+            with conn:
+                days = refresh_sketches(conn, None, args.distinct_error, args.topk_error, args.topk_capacity)
+            print(f"Sketched {days} days in {time.perf_counter() - start:.2f}s.")
+        report = validation_report(conn, args.top)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Validation report written to {args.output}")
+    except Exception as e:
+        print(f"Error validating sketches: {e}")
+    finally:
+        conn.close()
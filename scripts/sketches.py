@@ -0,0 +1,231 @@
+"""
+Mergeable sketches for approximate distinct counts and heavy hitters.
+
+* HyperLogLog estimates COUNT(DISTINCT x) from 2^p one-byte registers, with a
+  relative standard error of about 1.04 / sqrt(2^p).
+* CountMinSketch estimates the total weight of any item. An estimate never
+  undercounts, and it overcounts by at most `epsilon` x the sketch's total
+  weight with probability 1 - `delta`.
+* TopK pairs a space-saving candidate list with a count-min sketch. Candidates
+  come from the space-saving counters; their weights come from the count-min.
+
+All three merge losslessly (HyperLogLog, count-min) or within their error
+bounds (space-saving). So per-day sketches can be combined into any date range
+at query time. Values are hashed with pandas' SipHash, which is stable across
+processes, so sketches built by separate loads merge correctly.
+"""
+import json
+import math
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Distinct hash keys (16 bytes each) give the count-min rows independent hash functions
+_ROW_KEYS = [f"countminrow{row:05d}" for row in range(64)]
+
+def _hash(values, hash_key=None):
+    values = np.asarray(values, dtype=object)
+    if hash_key is None:
+        return pd.util.hash_array(values, categorize=False)
+    return pd.util.hash_array(values, hash_key=hash_key, categorize=False)
+
+def _bit_length(values):
+    """Bit length of each uint64, exact (both 32-bit halves fit a float64 without rounding)."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide='ignore'):
+        high_bits = np.where(high > 0, np.floor(np.log2(high)) + 33, 0)
+        low_bits = np.where(low > 0, np.floor(np.log2(low)) + 1, 0)
+    return np.where(high > 0, high_bits, low_bits).astype(np.int64)
+
+def _pack(array):
+    return zlib.compress(np.ascontiguousarray(array).tobytes())
+
+def _unpack(blob, dtype, shape):
+    return np.frombuffer(zlib.decompress(blob), dtype=dtype).reshape(shape).copy()
+
+class HyperLogLog:
+    """Distinct-count sketch; `precision` p gives 2^p registers."""
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, relative_error):
+        """The smallest sketch whose standard error is at most `relative_error`."""
+        return cls(min(18, max(4, math.ceil(math.log2((1.04 / relative_error) ** 2)))))
+
+    @property
+    def standard_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, values):
+        """Add an array of values (NULLs are skipped, as COUNT(DISTINCT) does)."""
+        values = pd.Series(values).dropna().to_numpy()
+        if len(values) == 0:
+            return self
+        hashes = _hash(values)
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        # Rank = position of the first set bit in the suffix (suffix_bits + 1 when it is all zeros)
+        rank = (suffix_bits - _bit_length(suffix) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting over the empty registers
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_record(self):
+        return {'precision': self.precision}, _pack(self.registers)
+
+    @classmethod
+    def from_record(cls, params, blob):
+        sketch = cls(params['precision'])
+        sketch.registers = _unpack(blob, np.uint8, sketch.registers.shape)
+        return sketch
+
+class CountMinSketch:
+    """Weight-per-item sketch of `depth` hashed rows of `width` counters."""
+
+    def __init__(self, width=544, depth=5):
+        if depth > len(_ROW_KEYS):
+            raise ValueError(f"Count-min depth must be at most {len(_ROW_KEYS)}, got {depth}")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+        self.total = 0.0
+
+    @classmethod
+    def for_error(cls, epsilon, delta=0.01):
+        """Over-estimates stay within epsilon x total weight with probability 1 - delta."""
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    def _columns(self, items):
+        return [(_hash(items, _ROW_KEYS[row]) % np.uint64(self.width)).astype(np.int64) for row in range(self.depth)]
+
+    def add(self, items, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        for row, columns in enumerate(self._columns(items)):
+            np.add.at(self.table[row], columns, weights)
+        self.total += float(weights.sum())
+        return self
+
+    def estimate(self, items):
+        if len(items) == 0:
+            return np.zeros(0)
+        return np.min([self.table[row][columns] for row, columns in enumerate(self._columns(items))], axis=0)
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different dimensions")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+class TopK:
+    """
+    Heavy hitters by weight: a space-saving list of `capacity` candidates plus a
+    count-min sketch that estimates each candidate's weight.
+    """
+
+    def __init__(self, capacity=100, epsilon=0.005, delta=0.01):
+        self.capacity = capacity
+        self.counters = {}
+        self.countmin = CountMinSketch.for_error(epsilon, delta)
+        self.delta = delta
+
+    @classmethod
+    def sized(cls, capacity, width, depth, delta=0.01):
+        """A sketch with exactly these count-min dimensions, e.g. to match stored sketches."""
+        sketch = cls(capacity, delta=delta)
+        sketch.countmin = CountMinSketch(width, depth)
+        return sketch
+
+    def add(self, items, weights):
+        """Add (item, weight) pairs; NULL items are skipped and NULL weights count as 0."""
+        frame = pd.DataFrame({'item': np.asarray(items, dtype=object), 'weight': weights}).dropna(subset=['item'])
+        if frame.empty:
+            return self
+        totals = frame.groupby('item', sort=False)['weight'].sum(min_count=0).fillna(0)
+        self.countmin.add(totals.index.to_numpy(), totals.to_numpy())
+        # Weighted space-saving: a new item evicts the smallest counter and inherits its count
+        for item, weight in sorted(totals.items(), key=lambda pair: -pair[1]):
+            if item in self.counters or len(self.counters) < self.capacity:
+                self.counters[item] = self.counters.get(item, 0.0) + weight
+            else:
+                smallest = min(self.counters, key=self.counters.get)
+                self.counters[item] = self.counters.pop(smallest) + weight
+        return self
+
+    def merge(self, other):
+        self.countmin.merge(other.countmin)
+        for item, weight in other.counters.items():
+            self.counters[item] = self.counters.get(item, 0.0) + weight
+        if len(self.counters) > self.capacity:
+            keep = sorted(self.counters.items(), key=lambda pair: -pair[1])[:self.capacity]
+            self.counters = dict(keep)
+        return self
+
+    @property
+    def error_bound(self):
+        """Largest expected over-estimate of any weight (with probability 1 - delta)."""
+        return self.countmin.epsilon * self.countmin.total
+
+    def top(self, k=10):
+        """The `k` heaviest candidates as [(item, estimated weight)], heaviest first."""
+        items = list(self.counters)
+        estimates = self.countmin.estimate(items)
+        ranked = sorted(zip(items, estimates.tolist()), key=lambda pair: -pair[1])
+        return ranked[:k]
+
+    def to_record(self):
+        params = {
+            'capacity': self.capacity,
+            'width': self.countmin.width,
+            'depth': self.countmin.depth,
+            'delta': self.delta,
+            'total': self.countmin.total,
+            'counters': self.counters,
+        }
+        return params, _pack(self.countmin.table)
+
+    @classmethod
+    def from_record(cls, params, blob):
+        sketch = cls.sized(params['capacity'], params['width'], params['depth'], params['delta'])
+        sketch.countmin.table = _unpack(blob, np.float64, (params['depth'], params['width']))
+        sketch.countmin.total = params['total']
+        sketch.counters = dict(params['counters'])
+        return sketch
+
+SKETCH_TYPES = {'hll': HyperLogLog, 'topk': TopK}
+
+def dump_record(sketch):
+    """(type, params JSON, blob) for storing a sketch in a table."""
+    kind = next(name for name, cls in SKETCH_TYPES.items() if isinstance(sketch, cls))
+    params, blob = sketch.to_record()
+    return kind, json.dumps(params), blob
+
+def load_record(kind, params, blob):
+    return SKETCH_TYPES[kind].from_record(json.loads(params), blob)
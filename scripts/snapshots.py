@@ -0,0 +1,184 @@
+"""
+Loads and dashboard reads running side by side on the same SQLite database.
+
+Writers
+-------
+A full load no longer rebuilds `sales` inside the live database. It writes a
+shadow database next to it (sql/ecommerce.db.staging), with no journal since
+a failed build is simply deleted. Tables the load does not rebuild (load
+history, monitor statistics) are copied over first. When the shadow is
+complete, swap_in() copies it over the live database with SQLite's backup
+API, in a single write transaction. Readers never see a half-built table:
+they see the old database until that transaction commits, and the new one
+after. Incremental loads stage their delta in temp tables and apply it in
+one short transaction, so they stay in place.
+
+Readers
+-------
+The live database is kept in WAL mode, where readers do not block the writer
+and the writer does not block readers. A read transaction sees one snapshot
+of the database. read_snapshot() wraps a series of queries in such a
+transaction, so rollups computed by several queries all come from the same
+load. SQLite still returns "database is locked" in a few cases, e.g. while a
+checkpoint or a journal-mode change holds a lock for longer than the busy
+timeout. with_retry() retries those with exponential backoff and jitter.
+"""
+import os
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from tracing import record
+
+# How long SQLite itself waits on a lock before raising "database is locked"
+BUSY_TIMEOUT_SECONDS = 5.0
+
+# Retries of a whole read (or the swap) after a busy error; delays double from
+# the base up to the cap, with full jitter so waiting readers do not retry in step
+RETRY_ATTEMPTS = 6
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 2.0
+
+SHADOW_SUFFIX = '.staging'
+
+# Settings of the shadow database while it is built: no journal or fsync, since
+# a failed build is discarded rather than rolled back
+SHADOW_PRAGMAS = [
+    ('journal_mode', 'OFF'),
+    ('synchronous', 'OFF'),
+    ('cache_size', -262144),
+    ('temp_store', 'MEMORY'),
+]
+
+def is_busy(error):
+    """True for the transient lock errors worth retrying."""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+def with_retry(func, *args, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Call func(*args), retrying busy errors with exponential backoff; other errors propagate."""
+    for attempt in range(attempts):
+        try:
+            return func(*args)
+        except sqlite3.OperationalError as e:
+            if not is_busy(e) or attempt == attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            record('sqlite busy backoff', delay)
+            time.sleep(delay)
+
+def connect(db_file, read_only=False):
+    """Connection with the busy timeout set; `read_only` opens the file read-only."""
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SECONDS,
+                               check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+    return sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_SECONDS)
+
+@contextmanager
+def read_snapshot(conn):
+    """
+    Run the enclosed queries in one read transaction, so all of them see the
+    database as of the first one, even if a load commits in between.
+    """
+    conn.execute("BEGIN")
+    try:
+        # The snapshot starts at the first read, so take it now
+        conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        yield conn
+    finally:
+        conn.execute("ROLLBACK")
+
+def consistent_read(func, version, attempts=RETRY_ATTEMPTS):
+    """
+    Call func() until `version()` is the same before and after it, for reads
+    spread over several connections (such as a pool's) that cannot share one
+    snapshot. Returns the result of the last call.
+    """
+    for _ in range(attempts):
+        before = version()
+        result = with_retry(func)
+        if version() == before:
+            return result
+    return result
+
+def shadow_path(db_file):
+    return db_file + SHADOW_SUFFIX
+
+def _remove_database(path):
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def open_shadow(db_file, rebuilt_tables):
+    """
+    Create an empty shadow database for a full rebuild of `db_file`, with the
+    live database's page size and a copy of every table the load does not
+    rebuild. Returns a connection in autocommit mode with the build settings applied.
+    """
+    shadow_file = shadow_path(db_file)
+    _remove_database(shadow_file)
+    conn = sqlite3.connect(shadow_file)
+    conn.isolation_level = None
+    for pragma, value in SHADOW_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    if os.path.exists(db_file):
+        # The backup into a WAL-mode database requires equal page sizes
+        live = connect(db_file, read_only=True)
+        try:
+            page_size = live.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            live.close()
+        conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        _carry_over_tables(conn, db_file, rebuilt_tables)
+    return conn
+
+def _carry_over_tables(conn, db_file, rebuilt_tables):
+    """Copy the live database's other tables, with their indexes, into the shadow."""
+    conn.execute("ATTACH DATABASE ? AS live", (f"file:{db_file}?mode=ro",))
+    try:
+        objects = conn.execute("""
+            SELECT type, name, tbl_name, sql FROM live.sqlite_master
+            WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY type = 'index'
+        """).fetchall()
+        conn.execute("BEGIN")
+        for kind, name, table, sql in objects:
+            if table in rebuilt_tables:
+                continue
+            conn.execute(sql)
+            if kind == 'table':
+                conn.execute(f'INSERT INTO main."{name}" SELECT * FROM live."{name}"')
+        conn.execute("COMMIT")
+    finally:
+        conn.execute("DETACH DATABASE live")
+
+def _backup(shadow_file, db_file):
+    source = sqlite3.connect(shadow_file)
+    target = connect(db_file)
+    try:
+        # WAL first, so readers keep their snapshot while the pages are replaced
+        target.execute("PRAGMA journal_mode = WAL")
+        # pages=-1: every page in one step, i.e. one write transaction on the target
+        source.backup(target, pages=-1)
+        target.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    finally:
+        source.close()
+        target.close()
+
+def swap_in(db_file):
+    """
+    Replace the live database's contents with its finished shadow, atomically
+    for readers, then delete the shadow. Returns the seconds the swap took.
+    """
+    shadow_file = shadow_path(db_file)
+    start = time.perf_counter()
+    with_retry(_backup, shadow_file, db_file)
+    _remove_database(shadow_file)
+    return time.perf_counter() - start
+
+def discard_shadow(db_file):
+    """Delete a partly built shadow database."""
+    _remove_database(shadow_path(db_file))
@@ -0,0 +1,283 @@
+import glob
+import os
+import shutil
+import sqlite3
+
+from query_cache import file_fingerprint
+from snapshots import connect, read_snapshot, with_retry
+from summary_tables import summary_tables_exist
+
+# aggregations and query_library (and with them pandas) are imported where they
+# are used, so scripts can pick a backend and check it exists without loading pandas
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DB_FILE = os.path.join(SQL_DIR, 'ecommerce.db')
+PARQUET_DIR = os.path.join(PROJECT_ROOT, 'data', 'sales_parquet')
+SHARD_DIR = os.path.join(SQL_DIR, 'shards')
+
+BACKENDS = ['sqlite', 'parquet', 'shards']
+
+# SQLite attaches at most 10 databases to one connection (a compile-time limit)
+MAX_SHARDS = 10
+
+# Tables every shard holds, exposed across shards as UNION ALL views
+SHARDED_TABLES = ['sales', 'sales_daily_cube', 'sales_daily_skus']
+
+# Low-cardinality text columns stored dictionary-encoded and read back as pandas categoricals
+DICTIONARY_COLUMNS = [
+    'status', 'fulfilment', 'sales_channel', 'ship-service-level', 'category', 'size',
+    'courier_status', 'currency', 'ship-city', 'ship-state', 'ship-country',
+]
+
+# Columns compute_rollups() needs, as stored -> as expected by the rollups
+ROLLUP_COLUMNS = {
+    'order_id': 'order_id',
+    'sku': 'sku',
+    'month': 'month',
+    'category': 'category',
+    'ship-state': 'state',
+    'sales_channel': 'sales_channel',
+    'qty': 'qty',
+    'amount': 'amount',
+}
+
+def _require_pyarrow():
+    """Import pyarrow lazily; it is only needed for the Parquet backend."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("The parquet backend requires pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+def _arrow_schema(pa, columns):
+    """
+    Arrow schema for the given `sales` columns, from the managed schema rather than
+    inferred from a chunk's values (an all-NULL text column would infer as null type).
+    Columns the managed schema does not know are stored as text, as in SQLite.
+    """
+    from schema import CSV_DTYPES, SALES_COLUMNS
+
+    csv_types = {'int64': pa.int64(), 'float64': pa.float64(), 'bool': pa.bool_(), str: pa.string()}
+    sql_types = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string()}
+    declared = dict(SALES_COLUMNS)
+    fields = []
+    for col in columns:
+        if col in CSV_DTYPES:
+            fields.append(pa.field(col, csv_types[CSV_DTYPES[col]]))
+        else:
+            fields.append(pa.field(col, sql_types.get(declared.get(col), pa.string())))
+    return pa.schema(fields)
+
+def swap_dir(staging_dir, target_dir):
+    """Move a finished staging directory into place and delete the one it replaces."""
+    previous = target_dir + '.old'
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(target_dir):
+        os.replace(target_dir, previous)
+    # Between the two renames the directory is missing; readers see no data rather than half of it
+    os.replace(staging_dir, target_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+
+class SQLiteStorage:
+    """Read side of the SQLite database written by load_to_sql.py."""
+
+    name = 'sqlite'
+
+    def __init__(self, db_file=DB_FILE):
+        self.path = db_file
+
+    @property
+    def ROLLUP_QUERY(self):
+        """Identifies the rollup queries in cache keys."""
+        from aggregations import ROLLUP_NAMES, SALES_SCAN_NAME
+        from query_library import load_library
+
+        library = load_library()
+        return '\n'.join(library.sql(name) for name in ROLLUP_NAMES + [SALES_SCAN_NAME])
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def data_version(self):
+        """Fingerprint of the database and its WAL, without opening a connection."""
+        return file_fingerprint([self.path, self.path + '-wal'])
+
+    def connect(self):
+        return connect(self.path)
+
+    def read(self, func):
+        """
+        func(conn) on one snapshot of the database, so a load committing meanwhile
+        is seen entirely or not at all; retried with backoff if the database is busy.
+        """
+        def read_once():
+            conn = self.connect()
+            try:
+                with read_snapshot(conn):
+                    return func(conn)
+            finally:
+                conn.close()
+
+        return with_retry(read_once)
+
+    def sales_columns(self):
+        """Non-cancelled rows with the columns compute_rollups() needs, in one scan."""
+        from aggregations import load_sales_columns
+
+        return self.read(load_sales_columns)
+
+    def rollups(self):
+        """Dashboard rollups, from the summary cube when it has been built."""
+        from aggregations import compute_rollups, load_cube_rollups, load_sales_columns
+
+        def rollups(conn):
+            if summary_tables_exist(conn):
+                return load_cube_rollups(conn)
+            return compute_rollups(load_sales_columns(conn))
+
+        return self.read(rollups)
+
+def list_shards(shard_dir=SHARD_DIR):
+    """Shard databases written by load_to_sql.py --shard-by, in period order."""
+    return sorted(glob.glob(os.path.join(shard_dir, 'sales-*.db')))
+
+def connect_shards(shard_files):
+    """
+    An in-memory connection with every shard attached read-only and TEMP views
+    named like the single-database tables, so the named queries run unchanged.
+    """
+    if not shard_files:
+        raise FileNotFoundError("No shard databases found")
+    if len(shard_files) > MAX_SHARDS:
+        raise ValueError(f"{len(shard_files)} shards exceed SQLite's limit of {MAX_SHARDS} attached databases")
+    conn = sqlite3.connect(':memory:', uri=True)
+    schemas = [f"shard{i}" for i in range(len(shard_files))]
+    for schema, path in zip(schemas, shard_files):
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (f"file:{path}?mode=ro",))
+    for table in SHARDED_TABLES:
+        union = '\nUNION ALL\n'.join(f"SELECT * FROM {schema}.{table}" for schema in schemas)
+        conn.execute(f"CREATE TEMP VIEW {table} AS {union}")
+    return conn
+
+class ShardedStorage(SQLiteStorage):
+    """
+    Per-month (or per-quarter) shard databases written in parallel by
+    load_to_sql.py --shard-by, queried together through ATTACH and UNION ALL.
+    Every shard carries its own summary cube, and cube rows are per date, so
+    the cube rollups combine across shards unchanged.
+    """
+
+    name = 'shards'
+
+    def __init__(self, shard_dir=SHARD_DIR):
+        self.path = shard_dir
+
+    def exists(self):
+        return bool(list_shards(self.path))
+
+    def data_version(self):
+        return file_fingerprint([self.path])
+
+    def connect(self):
+        return connect_shards(list_shards(self.path))
+
+    def rollups(self):
+        """Dashboard rollups from the shards' summary cubes."""
+        from aggregations import load_cube_rollups
+
+        return self.read(load_cube_rollups)
+
+class ParquetStorage:
+    """
+    Columnar copy of `sales` as Parquet files partitioned by order month.
+
+    Layout is hive-style (month=YYYY-MM/part-NNNNN.parquet), so readers can
+    prune partitions and read only the columns an aggregation needs.
+    """
+
+    name = 'parquet'
+
+    ROLLUP_QUERY = f"parquet rollups: {sorted(ROLLUP_COLUMNS)} where is_cancelled = 0"
+
+    def __init__(self, root=PARQUET_DIR):
+        self.path = root
+
+    def exists(self):
+        return os.path.isdir(self.path) and any(name.startswith('month=') for name in os.listdir(self.path))
+
+    def data_version(self):
+        """Fingerprint of every file in the dataset."""
+        return file_fingerprint([self.path])
+
+    def write(self, chunks):
+        """
+        Replace the dataset with the given DataFrame chunks; returns rows written.
+
+        The new dataset is written to a staging directory and swapped in once
+        complete, so a failed write leaves the previous dataset in place.
+        """
+        pa, pq = _require_pyarrow()
+
+        staging_dir = self.path + '.staging'
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+
+        schema = None
+        rows = 0
+        try:
+            for part, chunk in enumerate(chunks):
+                chunk = chunk.reset_index(drop=True)
+                months = chunk['date'].str.slice(0, 7).fillna('unknown')
+                if schema is None:
+                    schema = _arrow_schema(pa, chunk.columns)
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                for month, positions in months.groupby(months).indices.items():
+                    month_dir = os.path.join(staging_dir, f'month={month}')
+                    os.makedirs(month_dir, exist_ok=True)
+                    pq.write_table(
+                        table.take(positions),
+                        os.path.join(month_dir, f'part-{part:05d}.parquet'),
+                        use_dictionary=[col for col in DICTIONARY_COLUMNS if col in chunk.columns],
+                    )
+                rows += len(chunk)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        swap_dir(staging_dir, self.path)
+        return rows
+
+    def read_columns(self, columns, active_only=True):
+        """Read only `columns` (plus the partition key if requested) for non-cancelled rows."""
+        _, pq = _require_pyarrow()
+        table = pq.read_table(
+            self.path,
+            columns=columns,
+            filters=[('is_cancelled', '=', 0)] if active_only else None,
+            read_dictionary=[col for col in DICTIONARY_COLUMNS if col in columns],
+            partitioning='hive',
+        )
+        return table.to_pandas()
+
+    def sales_columns(self):
+        """Non-cancelled rows with the columns compute_rollups() needs, column-pruned."""
+        return self.read_columns(list(ROLLUP_COLUMNS)).rename(columns=ROLLUP_COLUMNS)
+
+    def rollups(self):
+        """Dashboard rollups computed from a column-pruned read of the dataset."""
+        from aggregations import compute_rollups
+
+        return compute_rollups(self.sales_columns())
+
+def open_storage(backend='sqlite', path=None):
+    """Return the storage object for `backend` ('sqlite' or 'parquet')."""
+    if backend == 'sqlite':
+        return SQLiteStorage(path or DB_FILE)
+    if backend == 'parquet':
+        return ParquetStorage(path or PARQUET_DIR)
+    if backend == 'shards':
+        return ShardedStorage(path or SHARD_DIR)
+    raise ValueError(f"Unknown storage backend '{backend}' (expected one of {BACKENDS})")
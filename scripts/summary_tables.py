@@ -0,0 +1,218 @@
+"""
+Materialized summary tables maintained by load_to_sql.py.
+
+sales_daily_cube holds one row per (date, category, state, sales_channel) for
+non-cancelled sales, with row count, units, revenue and the number of non-NULL
+amounts (so averages can be re-derived). Dashboard and analysis rollups read
+this cube (a few thousand rows) instead of scanning `sales`.
+
+COUNT(DISTINCT order_id) strategy
+---------------------------------
+Distinct counts do not add up across cells, so the cube stores two order measures:
+
+* `orders` counts the distinct orders in the cell. Summing it is exact for any
+  rollup that keeps `category` in its GROUP BY. An order that spans two
+  categories is counted once in each, just like COUNT(DISTINCT) per category.
+* `primary_orders` counts each order exactly once overall. The order is
+  attributed to its first row ordered by (date, category, state, channel), which
+  works as a per-order dedup. Summing it is exact for rollups that do not group
+  by category (totals, month, state, channel), because an order's date, ship-state
+  and channel are order-level attributes. An order whose rows disagree on those
+  attributes is counted under its first cell only.
+
+COUNT(DISTINCT sku) has no useful cell-level form, so sales_daily_skus keeps
+the distinct (date, sku) pairs, which are far fewer than rows at scale.
+
+Both tables are refreshed per date: a load deletes and recomputes only the
+dates it touched, using the date index on `sales`. Which row of an order is
+primary depends on all of the order's rows, so a refresh first widens the
+touched dates to every date of the orders on them, and ranks each order's
+rows over its full row set rather than over the refreshed dates only.
+
+A full load aggregates the cube from the rows as they stream in (SummaryBuilder)
+rather than re-reading `sales` once it is written; the aggregation is the same.
+"""
+
+import pandas as pd
+
+CUBE_TABLE = 'sales_daily_cube'
+SKU_TABLE = 'sales_daily_skus'
+
+CUBE_DIMENSIONS = ['date', 'category', 'state', 'sales_channel']
+
+# Columns of `sales` the summaries are aggregated from
+SUMMARY_COLUMNS = ['order_id', 'date', 'category', 'ship-state', 'sales_channel', 'qty', 'amount']
+
+_CREATE_TABLES = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CUBE_TABLE} (
+        date TEXT,
+        category TEXT,
+        state TEXT,
+        sales_channel TEXT,
+        orders INTEGER NOT NULL,
+        primary_orders INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        units INTEGER,
+        revenue REAL,
+        amount_rows INTEGER NOT NULL
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS idx_{CUBE_TABLE}_date ON {CUBE_TABLE}(date)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {SKU_TABLE} (
+        date TEXT,
+        sku TEXT,
+        PRIMARY KEY (date, sku)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Rows to (re)aggregate. On a partial refresh, {row_filter} keeps the full row set of
+# every order on the refreshed dates (so each order's primary row is ranked among all
+# its rows) and {date_filter} then keeps only the refreshed dates.
+_CUBE_INSERT = f"""
+INSERT INTO {CUBE_TABLE}
+SELECT
+    date,
+    category,
+    state,
+    sales_channel,
+    COUNT(DISTINCT order_id) as orders,
+    SUM(is_primary) as primary_orders,
+    COUNT(*) as row_count,
+    SUM(qty) as units,
+    SUM(amount) as revenue,
+    COUNT(amount) as amount_rows
+FROM (
+    SELECT
+        order_id,
+        date,
+        category,
+        "ship-state" as state,
+        sales_channel,
+        qty,
+        amount,
+        order_id IS NOT NULL AND ROW_NUMBER() OVER (
+            PARTITION BY order_id ORDER BY date, category, "ship-state", sales_channel
+        ) = 1 as is_primary
+    FROM sales
+    WHERE is_cancelled = 0 {{row_filter}}
+)
+{{date_filter}}
+GROUP BY date, category, state, sales_channel
+"""
+
+_SKU_INSERT = f"""
+INSERT OR IGNORE INTO {SKU_TABLE}
+SELECT DISTINCT date, sku
+FROM sales
+WHERE is_cancelled = 0 AND sku IS NOT NULL {{date_filter}}
+"""
+
+def create_summary_tables(conn):
+    """Create the summary tables and their indexes if they do not exist yet."""
+    for statement in _CREATE_TABLES:
+        conn.execute(statement)
+
+def summary_tables_exist(conn):
+    """True if the cube has been built in this database."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CUBE_TABLE,)).fetchone()
+    return row is not None
+
+def _collect_orders(conn):
+    """Fill summary_orders with the orders that have rows on the dates in summary_dates."""
+    conn.execute("DELETE FROM summary_orders")
+    conn.execute("""
+        INSERT OR IGNORE INTO summary_orders
+        SELECT order_id FROM sales
+        WHERE date IN (SELECT date FROM summary_dates) AND order_id IS NOT NULL
+    """)
+
+def refresh_summary_tables(conn, dates=None):
+    """
+    Recompute the summary tables from `sales`.
+
+    With `dates=None` both tables are rebuilt from scratch; otherwise only the
+    given order dates, and the other dates of orders on them, are deleted and
+    re-aggregated. Returns the cube row count.
+    """
+    create_summary_tables(conn)
+
+    if dates is None:
+        conn.execute(f"DELETE FROM {CUBE_TABLE}")
+        conn.execute(f"DELETE FROM {SKU_TABLE}")
+        row_filter = date_filter = sku_filter = ""
+    else:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS summary_dates (date TEXT PRIMARY KEY)")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS summary_orders (order_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM summary_dates")
+        conn.executemany("INSERT OR IGNORE INTO summary_dates VALUES (?)", ((date,) for date in dates))
+        # Any status: a row cancelled by this load may have been its order's primary row
+        _collect_orders(conn)
+        conn.execute("""
+            INSERT OR IGNORE INTO summary_dates
+            SELECT DISTINCT date FROM sales WHERE order_id IN (SELECT order_id FROM summary_orders)
+        """)
+        _collect_orders(conn)
+        conn.execute(f"DELETE FROM {CUBE_TABLE} WHERE date IN (SELECT date FROM summary_dates)")
+        conn.execute(f"DELETE FROM {SKU_TABLE} WHERE date IN (SELECT date FROM summary_dates)")
+        row_filter = ("AND (order_id IN (SELECT order_id FROM summary_orders) "
+                      "OR date IN (SELECT date FROM summary_dates))")
+        date_filter = "WHERE date IN (SELECT date FROM summary_dates)"
+        sku_filter = "AND date IN (SELECT date FROM summary_dates)"
+
+    conn.execute(_CUBE_INSERT.format(row_filter=row_filter, date_filter=date_filter))
+    conn.execute(_SKU_INSERT.format(date_filter=sku_filter))
+    return conn.execute(f"SELECT count(*) FROM {CUBE_TABLE}").fetchone()[0]
+
+def _records(df):
+    """A frame's rows as tuples of plain Python values, with missing values as None."""
+    columns = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in df.columns]
+    return zip(*columns)
+
+class SummaryBuilder:
+    """
+    The summary cube of a full load, aggregated from its chunks as they stream in.
+
+    Feed it every chunk written to `sales` with observe(), then call finish() in
+    the load's transaction to replace both summary tables. Only the non-cancelled
+    rows' SUMMARY_COLUMNS are held until then; finish() aggregates them exactly as
+    refresh_summary_tables(conn) would, without the window sort over `sales`.
+    The distinct (date, sku) pairs are still one DISTINCT over the table.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def observe(self, chunk):
+        """Keep the summary columns of a chunk's rows with is_cancelled = 0."""
+        kept = chunk['is_cancelled'].eq(0).to_numpy(dtype=bool, na_value=False)
+        self.parts.append(chunk.loc[kept, SUMMARY_COLUMNS])
+
+    def finish(self, conn):
+        """Replace the summary tables with the observed rows' aggregates. Returns the cube row count."""
+        if not self.parts:
+            return refresh_summary_tables(conn)
+        rows = pd.concat(self.parts, ignore_index=True).rename(columns={'ship-state': 'state'})
+        self.parts = []
+
+        # An order's primary row is its first by (date, category, state, channel), NULLs first as in SQLite
+        rows = rows.sort_values(['order_id'] + CUBE_DIMENSIONS, na_position='first', kind='stable')
+        rows['is_primary'] = (rows['order_id'].notna() & ~rows['order_id'].duplicated()).astype('int64')
+        cells = rows.groupby(CUBE_DIMENSIONS, dropna=False, sort=False)
+        cube = pd.DataFrame({
+            'orders': cells['order_id'].nunique(),
+            'primary_orders': cells['is_primary'].sum(),
+            'row_count': cells.size(),
+            'units': cells['qty'].sum(min_count=1),
+            'revenue': cells['amount'].sum(min_count=1),
+            'amount_rows': cells['amount'].count(),
+        }).reset_index()
+
+        create_summary_tables(conn)
+        conn.execute(f"DELETE FROM {CUBE_TABLE}")
+        conn.execute(f"DELETE FROM {SKU_TABLE}")
+        conn.executemany(f"INSERT INTO {CUBE_TABLE} VALUES ({', '.join('?' for _ in cube.columns)})", _records(cube))
+        conn.execute(_SKU_INSERT.format(date_filter=''))
+        return len(cube)
@@ -0,0 +1,265 @@
+"""
+Lightweight stage tracing for the pipeline scripts.
+
+Code marks its stages with `with trace('csv parse') as span: ... span.rows = n`.
+While no tracer is active (the default) trace() does nothing. With --trace,
+every span records wall time, rows processed and the change in resident memory;
+spans with the same name are aggregated into one summary row. --profile adds a
+tracemalloc or cProfile run per stage, and --trace-json writes the summary as
+JSON for scheduled runs. Profilers cannot nest, so cProfile runs only for the
+stages directly inside the root span the scripts wrap their run in (e.g.
+trace('load_data')), on the thread that started tracing.
+
+Each thread keeps its own stack of open spans, so spans opened by query or
+figure threads nest under nothing rather than under whatever span another
+thread has open.
+"""
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+PROFILERS = ['cprofile', 'tracemalloc']
+
+# Functions listed per profiled stage in the summary
+PROFILE_TOP = 5
+
+# Depth of the spans cProfile runs for: 1 is the stages inside the root span
+PROFILE_DEPTH = 1
+
+_active = None
+
+def _rss_mb():
+    """Current resident memory, in MB (0 where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+class Span:
+    """One traced stage while it runs; set `rows` to record how much it processed."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.discard = False
+        self.child_peak = 0
+
+class _NullSpan:
+    rows = None
+    discard = False
+
+class Tracer:
+    """Aggregates span measurements by stage name, in first-seen order."""
+
+    def __init__(self, profiler=None, profile_dir=None):
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.started = datetime.now(timezone.utc)
+        self.stats = {}
+        self.thread = threading.get_ident()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        if profiler == 'tracemalloc':
+            tracemalloc.start()
+
+    @property
+    def stack(self):
+        """The calling thread's open spans, outermost first."""
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def _entry(self, name):
+        return self.stats.setdefault(name, {
+            'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': None, 'rss_delta_mb': 0.0,
+        })
+
+    def record(self, name, seconds, rows=None):
+        """Add a measurement taken elsewhere (e.g. a figure built in a worker process)."""
+        with self.lock:
+            entry = self._entry(name)
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if rows is not None:
+                entry['rows'] = (entry['rows'] or 0) + rows
+
+    @contextmanager
+    def span(self, name, rows=None):
+        span = Span(name)
+        span.rows = rows
+        profile = None
+        start_traced = 0
+        stack = self.stack
+        if self.profiler == 'cprofile' and len(stack) == PROFILE_DEPTH and threading.get_ident() == self.thread:
+            import cProfile
+
+            profile = cProfile.Profile()
+        if self.profiler == 'tracemalloc':
+            start_traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stack.append(span)
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield span
+        finally:
+            if profile is not None:
+                profile.disable()
+            seconds = time.perf_counter() - start
+            rss_delta = _rss_mb() - rss_before
+            # Spans held open by generators (traced_chunks) may finish out of order
+            stack.remove(span)
+            self._finish(span, seconds, rss_delta, profile, start_traced)
+
+    def _finish(self, span, seconds, rss_delta, profile, start_traced):
+        peak = None
+        if self.profiler == 'tracemalloc':
+            # An inner span resets the peak, so fold the children's peaks back in
+            peak = max(tracemalloc.get_traced_memory()[1], span.child_peak)
+            if self.stack:
+                self.stack[-1].child_peak = max(self.stack[-1].child_peak, peak)
+        if span.discard:
+            return
+        self.record(span.name, seconds, span.rows)
+        entry = self.stats[span.name]
+        entry['rss_delta_mb'] += rss_delta
+        if peak is not None:
+            entry['py_peak_mb'] = max(entry.get('py_peak_mb', 0.0), (peak - start_traced) / 1024 ** 2)
+        if profile is not None:
+            self._save_profile(span.name, profile, entry)
+
+    def _save_profile(self, name, profile, entry):
+        # pstats and cProfile load only when profiling, keeping every script's startup light
+        import pstats
+
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, f"{name.replace(' ', '_').replace(':', '')}.prof")
+            profile.dump_stats(path)
+            entry['profile'] = path
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+        entry['top_functions'] = [
+            {'function': f"{os.path.basename(file)}:{line}({func})", 'cumulative_seconds': round(cumulative, 4)}
+            for (file, line, func), (_, _, _, cumulative, _) in top
+        ]
+
+    def summary(self, script=None):
+        """The machine-readable summary: one entry per stage name."""
+        spans = []
+        for name, entry in self.stats.items():
+            item = {'name': name}
+            item.update(entry)
+            item['seconds'] = round(item['seconds'], 6)
+            item['max_seconds'] = round(item['max_seconds'], 6)
+            item['rss_delta_mb'] = round(item['rss_delta_mb'], 2)
+            if 'py_peak_mb' in item:
+                item['py_peak_mb'] = round(item['py_peak_mb'], 2)
+            if item['rows'] and item['seconds']:
+                item['rows_per_sec'] = round(item['rows'] / item['seconds'])
+            spans.append(item)
+        return {
+            'script': script or os.path.basename(sys.argv[0]),
+            'started': self.started.isoformat(timespec='seconds'),
+            'profiler': self.profiler,
+            'spans': spans,
+        }
+
+    def report(self):
+        """Print the per-stage table."""
+        py_peak = self.profiler == 'tracemalloc'
+        print(f"{'Stage':<32} {'Calls':>6} {'Time (ms)':>11} {'Rows':>12} {'RSS Δ (MB)':>11}"
+              + (f" {'Py peak (MB)':>13}" if py_peak else ''))
+        for name, entry in self.stats.items():
+            rows = f"{entry['rows']:,}" if entry['rows'] is not None else '-'
+            print(f"{name[:32]:<32} {entry['calls']:>6} {entry['seconds'] * 1000:>11.1f} {rows:>12} "
+                  f"{entry['rss_delta_mb']:>11.1f}"
+                  + (f" {entry.get('py_peak_mb', 0.0):>13.1f}" if py_peak else ''))
+            for item in entry.get('top_functions', []):
+                print(f"{'':<4}{item['cumulative_seconds'] * 1000:>9.1f} ms  {item['function']}")
+
+    def close(self):
+        if self.profiler == 'tracemalloc':
+            tracemalloc.stop()
+
+def trace(name, rows=None):
+    """Context manager timing one stage; a no-op unless a tracer is active."""
+    if _active is None:
+        return _null_span()
+    return _active.span(name, rows)
+
+@contextmanager
+def _null_span():
+    yield _NullSpan()
+
+def record(name, seconds, rows=None):
+    """Record an externally measured stage on the active tracer, if any."""
+    if _active is not None:
+        _active.record(name, seconds, rows)
+
+def traced_chunks(chunks, name):
+    """Iterate over `chunks`, tracing the time spent producing each one (e.g. CSV parsing)."""
+    iterator = iter(chunks)
+    while True:
+        with trace(name) as span:
+            chunk = next(iterator, None)
+            if chunk is None:
+                # Reaching the end of the input is not a chunk
+                span.discard = True
+            else:
+                span.rows = len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+def start_tracing(profiler=None, profile_dir=None):
+    """Activate a tracer for the rest of the run and return it."""
+    global _active
+    _active = Tracer(profiler, profile_dir)
+    return _active
+
+def stop_tracing(json_file=None):
+    """Print the summary, optionally write it as JSON, and deactivate the tracer."""
+    global _active
+    if _active is None:
+        return None
+    tracer, _active = _active, None
+    tracer.close()
+    tracer.report()
+    summary = tracer.summary()
+    if json_file:
+        os.makedirs(os.path.dirname(os.path.abspath(json_file)), exist_ok=True)
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Trace summary written to {json_file}")
+    return summary
+
+def add_tracing_arguments(parser):
+    """The --trace / --trace-json / --profile flags shared by the pipeline scripts."""
+    parser.add_argument('--trace', action='store_true',
+                        help="Print wall time, rows and memory change per pipeline stage")
+    parser.add_argument('--trace-json', default=None,
+                        help="Also write the per-stage summary to this JSON file (implies --trace)")
+    parser.add_argument('--profile', choices=PROFILERS, default=None,
+                        help="Profile each stage with cProfile or tracemalloc (implies --trace)")
+    parser.add_argument('--profile-dir', default=None, help="Where to write per-stage cProfile .prof files")
+
+def tracing_from_args(args):
+    """Start tracing if any tracing flag was given; returns whether it did."""
+    if args.trace or args.trace_json or args.profile:
+        start_tracing(args.profile, args.profile_dir)
+        return True
+    return False
@@ -4,6 +4,16 @@
 -- Database: ecommerce.db
 -- Table: sales
 -- Purpose: Business intelligence queries for decision-making
+-- Filter: is_cancelled = 0 keeps completed orders. The flag is derived
+--         from status by load_to_sql.py and replaces the unindexable
+--         status NOT LIKE '%Cancelled%'
+-- Params: :date_from / :date_to (inclusive, YYYY-MM-DD) restrict every query
+--         to a date range; an unset (NULL) parameter disables its filter.
+--         Run them by name with scripts/query_library.py
+-- Cube:   Queries on sales_daily_cube read the daily summary that the loader
+--         maintains (non-cancelled rows only). Use SUM(orders) when grouping
+--         by category and SUM(primary_orders) otherwise. See
+--         scripts/summary_tables.py
 -- =============================================
 
 -- =============================================
@@ -12,13 +22,15 @@
 -- Business Question: What is our total revenue from completed orders?
 -- Insight: Overall business performance and revenue generation
 
+-- name: total_revenue
 SELECT 
-    COUNT(DISTINCT order_id) as total_orders,
-    SUM(qty) as total_units_sold,
-    ROUND(SUM(amount), 2) as total_revenue,
-    ROUND(AVG(amount), 2) as avg_order_value
-FROM sales
-WHERE status NOT LIKE '%Cancelled%';
+    SUM(primary_orders) as total_orders,
+    SUM(units) as total_units_sold,
+    ROUND(SUM(revenue), 2) as total_revenue,
+    ROUND(SUM(revenue) / SUM(amount_rows), 2) as avg_order_value
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to);
 
 
 -- =============================================
@@ -27,14 +39,16 @@ WHERE status NOT LIKE '%Cancelled%';
 -- Business Question: How are sales trending month over month?
 -- Insight: Identify seasonality and growth patterns
 
+-- name: monthly_trend
 SELECT 
     strftime('%Y-%m', date) as month,
-    COUNT(DISTINCT order_id) as orders,
-    SUM(qty) as units_sold,
-    ROUND(SUM(amount), 2) as revenue,
-    ROUND(AVG(amount), 2) as avg_order_value
-FROM sales
-WHERE status NOT LIKE '%Cancelled%'
+    SUM(primary_orders) as orders,
+    SUM(units) as units_sold,
+    ROUND(SUM(revenue), 2) as revenue,
+    ROUND(SUM(revenue) / SUM(amount_rows), 2) as avg_order_value
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
 GROUP BY month
 ORDER BY month DESC;
 
@@ -44,7 +58,9 @@ ORDER BY month DESC;
 -- =============================================
 -- Business Question: Which products drive the most revenue?
 -- Insight: Focus inventory and marketing on high-performing products
+-- Params: optional :category, and :limit (default 20)
 
+-- name: top_products
 SELECT 
     category,
     style,
@@ -53,10 +69,13 @@ SELECT
     ROUND(SUM(amount), 2) as total_revenue,
     ROUND(AVG(amount), 2) as avg_price
 FROM sales
-WHERE status NOT LIKE '%Cancelled%'
+WHERE is_cancelled = 0
+    AND (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:category IS NULL OR category = :category)
 GROUP BY category, style
 ORDER BY total_revenue DESC
-LIMIT 20;
+LIMIT COALESCE(:limit, 20);
 
 
 -- =============================================
@@ -65,15 +84,22 @@ LIMIT 20;
 -- Business Question: Which product categories perform best?
 -- Insight: Strategic decisions on product portfolio
 
+-- name: category_performance
 SELECT 
     category,
-    COUNT(DISTINCT order_id) as total_orders,
-    SUM(qty) as total_units,
-    ROUND(SUM(amount), 2) as total_revenue,
-    ROUND(AVG(amount), 2) as avg_revenue_per_order,
-    ROUND(SUM(amount) * 100.0 / (SELECT SUM(amount) FROM sales WHERE status NOT LIKE '%Cancelled%'), 2) as revenue_percentage
-FROM sales
-WHERE status NOT LIKE '%Cancelled%'
+    SUM(orders) as total_orders,
+    SUM(units) as total_units,
+    ROUND(SUM(revenue), 2) as total_revenue,
+    ROUND(SUM(revenue) / SUM(amount_rows), 2) as avg_revenue_per_order,
+    ROUND(SUM(revenue) * 100.0 / (
+        SELECT SUM(revenue)
+        FROM sales_daily_cube
+        WHERE (:date_from IS NULL OR date >= :date_from)
+            AND (:date_to IS NULL OR date <= :date_to)
+    ), 2) as revenue_percentage
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
 GROUP BY category
 ORDER BY total_revenue DESC;
 
@@ -84,6 +110,7 @@ ORDER BY total_revenue DESC;
 -- Business Question: Which regions generate the most sales?
 -- Insight: Regional expansion and logistics optimization
 
+-- name: regional_performance
 SELECT 
     "ship-state" as state,
     COUNT(DISTINCT order_id) as total_orders,
@@ -92,8 +119,10 @@ SELECT
     ROUND(AVG(amount), 2) as avg_order_value,
     COUNT(DISTINCT "ship-city") as cities_served
 FROM sales
-WHERE status NOT LIKE '%Cancelled%'
+WHERE is_cancelled = 0
     AND "ship-state" != 'Unknown'
+    AND (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
 GROUP BY state
 ORDER BY total_revenue DESC
 LIMIT 15;
@@ -104,17 +133,22 @@ LIMIT 15;
 -- =============================================
 
 -- Sales Channel Performance
+-- name: channel_performance
 SELECT 
     sales_channel,
-    COUNT(DISTINCT order_id) as orders,
-    ROUND(SUM(amount), 2) as revenue,
-    ROUND(AVG(amount), 2) as avg_order_value
-FROM sales
-WHERE status NOT LIKE '%Cancelled%'
+    SUM(primary_orders) as orders,
+    ROUND(SUM(revenue), 2) as revenue,
+    ROUND(SUM(revenue) / SUM(amount_rows), 2) as avg_order_value
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
 GROUP BY sales_channel
 ORDER BY revenue DESC;
 
 -- B2B vs B2C Analysis
+-- name: b2b_vs_b2c
+-- b2b is not in the cube; idx_sales_b2b covers every column read here, so the
+-- query scans that narrow index rather than the table
 SELECT 
     CASE 
         WHEN b2b = 1 THEN 'B2B'
@@ -125,5 +159,7 @@ SELECT
     ROUND(SUM(amount), 2) as revenue,
     ROUND(AVG(amount), 2) as avg_order_value
 FROM sales
-WHERE status NOT LIKE '%Cancelled%'
+WHERE is_cancelled = 0
+    AND (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
 GROUP BY business_type;
@@ -0,0 +1,154 @@
+-- =============================================
+-- E-COMMERCE SALES ANALYTICS - DASHBOARD QUERIES
+-- =============================================
+-- Database: ecommerce.db
+-- Loaded by: scripts/query_library.py (one statement per "-- name:" tag)
+-- Filters: every rollup takes the optional parameters :date_from, :date_to
+--          (inclusive, YYYY-MM-DD), :state and :category. An unset (NULL)
+--          parameter disables its filter.
+-- Cube:    SUM(primary_orders) counts each order once and is exact unless
+--          category is filtered or grouped on; then SUM(orders) is used. See
+--          scripts/summary_tables.py
+-- =============================================
+
+-- name: sales_scan
+-- One scan over the non-cancelled rows, keeping only the columns the rollups need.
+-- NOT INDEXED: nearly every row passes the filter, so a sequential table scan beats
+-- searching an index on is_cancelled and then looking up each row. (SQLite-only;
+-- DuckDBEngine drops the hint.)
+SELECT
+    order_id,
+    sku,
+    strftime('%Y-%m', date) as month,
+    category,
+    "ship-state" as state,
+    sales_channel,
+    qty,
+    amount
+FROM sales NOT INDEXED
+WHERE is_cancelled = 0;
+
+-- name: kpis
+-- The distinct SKU count comes from sales_daily_skus unless state or category is
+-- filtered; then it is counted on `sales`, answered from idx_sales_sku
+SELECT
+    SUM(CASE WHEN :category IS NULL THEN primary_orders ELSE orders END) as total_orders,
+    CASE
+        WHEN :state IS NULL AND :category IS NULL THEN (
+            SELECT COUNT(DISTINCT sku)
+            FROM sales_daily_skus
+            WHERE (:date_from IS NULL OR date >= :date_from)
+                AND (:date_to IS NULL OR date <= :date_to)
+        )
+        ELSE (
+            SELECT COUNT(DISTINCT sku)
+            FROM sales
+            WHERE is_cancelled = 0
+                AND (:date_from IS NULL OR date >= :date_from)
+                AND (:date_to IS NULL OR date <= :date_to)
+                AND (:state IS NULL OR "ship-state" = :state)
+                AND (:category IS NULL OR category = :category)
+        )
+    END as total_products,
+    SUM(units) as total_units,
+    ROUND(SUM(revenue), 2) as total_revenue,
+    ROUND(SUM(revenue) / SUM(amount_rows), 2) as avg_order_value
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category);
+
+-- name: monthly
+SELECT
+    strftime('%Y-%m', date) as month,
+    SUM(CASE WHEN :category IS NULL THEN primary_orders ELSE orders END) as orders,
+    ROUND(SUM(revenue), 2) as revenue
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category)
+GROUP BY month
+ORDER BY month;
+
+-- name: monthly_history
+-- Monthly revenue and orders per segment for scripts/period_metrics.py.
+-- :segment_by is 'category', 'state', 'channel' or NULL (overall totals).
+-- primary_orders stays exact when segmenting by state or channel, since an
+-- order's primary row carries its own state and channel.
+SELECT
+    strftime('%Y-%m', date) as month,
+    CASE :segment_by
+        WHEN 'category' THEN category
+        WHEN 'state' THEN state
+        WHEN 'channel' THEN sales_channel
+    END as segment,
+    SUM(CASE WHEN :category IS NULL AND (:segment_by IS NULL OR :segment_by <> 'category') THEN primary_orders ELSE orders END) as orders,
+    ROUND(SUM(revenue), 2) as revenue
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category)
+GROUP BY month, segment
+ORDER BY segment, month;
+
+-- name: cat_metrics
+SELECT
+    category,
+    SUM(orders) as orders,
+    ROUND(SUM(revenue), 2) as revenue,
+    ROUND(SUM(revenue) / SUM(amount_rows), 2) as avg_revenue
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category)
+GROUP BY category;
+
+-- name: regional
+SELECT
+    state,
+    SUM(CASE WHEN :category IS NULL THEN primary_orders ELSE orders END) as orders,
+    ROUND(SUM(revenue), 2) as revenue
+FROM sales_daily_cube
+WHERE state != 'Unknown'
+    AND (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category)
+GROUP BY state
+ORDER BY revenue DESC;
+
+-- name: categories
+SELECT
+    category,
+    ROUND(SUM(revenue), 2) as revenue
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category)
+GROUP BY category
+ORDER BY revenue DESC;
+
+-- name: channels
+SELECT
+    sales_channel,
+    ROUND(SUM(revenue), 2) as revenue
+FROM sales_daily_cube
+WHERE (:date_from IS NULL OR date >= :date_from)
+    AND (:date_to IS NULL OR date <= :date_to)
+    AND (:state IS NULL OR state = :state)
+    AND (:category IS NULL OR category = :category)
+GROUP BY sales_channel;
+
+-- name: filter_states
+SELECT DISTINCT state FROM sales_daily_cube WHERE state != 'Unknown' ORDER BY state;
+
+-- name: filter_categories
+SELECT DISTINCT category FROM sales_daily_cube ORDER BY category;
+
+-- name: filter_dates
+SELECT MIN(date) as date_from, MAX(date) as date_to FROM sales_daily_cube;
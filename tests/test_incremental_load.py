@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import load_to_sql
+from generate_synthetic_data import generate
+from summary_tables import CUBE_TABLE, SKU_TABLE, refresh_summary_tables
+
+CUBE_QUERY = f"SELECT * FROM {CUBE_TABLE} ORDER BY date, category, state, sales_channel"
+SKU_QUERY = f"SELECT * FROM {SKU_TABLE} ORDER BY date, sku"
+
+def _load(tmp_path, csv_file, **kwargs):
+    load_to_sql.CSV_FILE = str(csv_file)
+    load_to_sql.SQL_DIR = str(tmp_path)
+    load_to_sql.DB_FILE = str(tmp_path / 'ecommerce.db')
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        load_to_sql.load_data(**kwargs)
+    assert 'Error' not in output.getvalue(), output.getvalue()
+    return sqlite3.connect(load_to_sql.DB_FILE)
+
+def test_incremental_load_keeps_rows_of_keys_spanning_chunks(tmp_path):
+    csv_file = tmp_path / 'cleaned_data.csv'
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(str(csv_file), 2_000, raw=False, seed=7)
+    # The first incremental load falls back to a full load that records the row hashes
+    _load(tmp_path, csv_file, incremental=True, chunksize=500).close()
+
+    # A second row for row 5's (order_id, sku, date) key, in the last chunk: the key's
+    # first chunk still matches the stored hash, but the key as a whole has changed
+    df = pd.read_csv(csv_file, dtype=str)
+    extra = df.iloc[[5]].assign(qty='3')
+    pd.concat([df, extra]).to_csv(csv_file, index=False)
+
+    conn = _load(tmp_path, csv_file, incremental=True, chunksize=500)
+    try:
+        assert conn.execute("SELECT count(*) FROM sales").fetchone()[0] == len(df) + 1
+        key = tuple(df.loc[5, load_to_sql.KEY_COLUMNS])
+        assert conn.execute(
+            "SELECT count(*) FROM sales WHERE order_id = ? AND sku = ? AND date = ?", key,
+        ).fetchone()[0] == 2
+        incremental_cube = pd.read_sql_query(CUBE_QUERY, conn)
+        refresh_summary_tables(conn)
+        pd.testing.assert_frame_equal(incremental_cube, pd.read_sql_query(CUBE_QUERY, conn))
+    finally:
+        conn.close()
+
+def test_full_load_streams_the_same_summaries_as_a_refresh(tmp_path):
+    csv_file = tmp_path / 'cleaned_data.csv'
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(str(csv_file), 2_000, raw=False, seed=11)
+    conn = _load(tmp_path, csv_file, chunksize=500)
+    try:
+        assert not load_to_sql._table_exists(conn, load_to_sql.ROW_HASH_TABLE)
+        streamed_cube = pd.read_sql_query(CUBE_QUERY, conn)
+        streamed_skus = pd.read_sql_query(SKU_QUERY, conn)
+        refresh_summary_tables(conn)
+        pd.testing.assert_frame_equal(streamed_cube, pd.read_sql_query(CUBE_QUERY, conn))
+        pd.testing.assert_frame_equal(streamed_skus, pd.read_sql_query(SKU_QUERY, conn))
+    finally:
+        conn.close()
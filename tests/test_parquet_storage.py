@@ -0,0 +1,49 @@
+import contextlib
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+pytest.importorskip('pyarrow')
+
+from generate_synthetic_data import generate
+from load_to_sql import read_csv_chunks
+from storage import ParquetStorage
+
+def _csv(tmp_path, rows=1_000):
+    csv_file = tmp_path / 'cleaned_data.csv'
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(str(csv_file), rows, raw=False, seed=3)
+    return csv_file
+
+def test_write_types_columns_from_the_schema_not_the_first_chunk(tmp_path):
+    csv_file = _csv(tmp_path)
+    df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+    # All-NULL promotion ids in the first chunk, text in the second
+    df.loc[:499, 'promotion-ids'] = ''
+    df.loc[500:, 'promotion-ids'] = 'Free Shipping'
+    df.to_csv(csv_file, index=False)
+
+    storage = ParquetStorage(str(tmp_path / 'sales_parquet'))
+    assert storage.write(read_csv_chunks(str(csv_file), 500)) == len(df)
+    promotions = storage.read_columns(['promotion-ids'], active_only=False)['promotion-ids']
+    assert promotions.isna().sum() == 500
+    assert (promotions == 'Free Shipping').sum() == len(df) - 500
+
+def test_failed_write_keeps_the_previous_dataset(tmp_path):
+    csv_file = _csv(tmp_path)
+    storage = ParquetStorage(str(tmp_path / 'sales_parquet'))
+    written = storage.write(read_csv_chunks(str(csv_file), 500))
+
+    def failing_chunks():
+        yield next(read_csv_chunks(str(csv_file), 500))
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        storage.write(failing_chunks())
+    assert len(storage.read_columns(['date'], active_only=False)) == written
+    assert not os.path.exists(storage.path + '.staging')
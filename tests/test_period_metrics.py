@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from period_metrics import period_over_period
+
+def test_null_month_stays_out_of_the_grid():
+    history = pd.DataFrame({
+        'month': ['2022-03', None, '2022-05'],
+        'revenue': [100.0, 40.0, 150.0],
+        'orders': [2, 1, 3],
+    })
+    metrics = period_over_period(history)
+    dated = metrics[metrics['month'].notna()]
+    assert dated['month'].tolist() == ['2022-03', '2022-04', '2022-05']
+    assert dated['revenue_prev_month'].tolist()[1:] == [100.0, 0.0]
+    undated = metrics[metrics['month'].isna()]
+    assert undated['revenue'].tolist() == [40.0]
+    assert undated.filter(regex='_(prev_month|mom_pct|last_year|yoy_pct|rolling_3m)$').isna().all(axis=None)